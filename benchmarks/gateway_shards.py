@@ -0,0 +1,347 @@
+"""
+Startup load test for the single-connection and sharded Discord bot modes.
+
+A local fake Discord serves the REST calls made at login and a gateway that
+speaks the real protocol (HELLO, IDENTIFY, heartbeats, READY, then one
+GUILD_CREATE per guild and a stream of MESSAGE_CREATE when the intents ask
+for them), splitting guilds between shards by their ID like Discord does.
+Each mode then runs the production bot class in a fresh interpreter against
+it and reports the time to on_ready, event loop lag while the guild stream is
+parsed, the worst heartbeat latency seen per shard, and the steady-state RSS.
+
+The 5 seconds discord.py waits between shard IDENTIFYs (Discord's identify
+rate limit) are skipped, so real startups take that much longer per shard.
+
+Usage:
+    uv run benchmarks/gateway_shards.py --guilds 2000 --modes single,2,4,auto
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from memory import _guild, _message, _user
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Dummy credentials, the benchmark never leaves localhost
+os.environ.setdefault("DISCORD_TOKEN", "benchmark")
+os.environ.setdefault("TELEGRAM_API_ID", "1")
+os.environ.setdefault("TELEGRAM_API_HASH", "benchmark")
+
+BOT_ID = 1
+GUILD_MESSAGES_INTENT = 1 << 9
+
+
+def _guild_id(index: int) -> int:
+    # Discord picks a guild's shard from the timestamp bits of its ID
+    return (index + 1) << 22
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    from aiohttp import WSMsgType, web  # noqa: PLC0415
+
+    guilds = [
+        (
+            _guild_id(index),
+            json.dumps(
+                _guild(_guild_id(index), args.channels, args.members, BOT_ID),
+                separators=(",", ":"),
+            ),
+        )
+        for index in range(args.guilds)
+    ]
+    port = 0
+
+    def respond(data: dict) -> web.Response:
+        # discord.py only decodes an exact "application/json", without a charset
+        return web.Response(body=json.dumps(data), content_type="application/json")
+
+    async def users_me(_: web.Request) -> web.Response:
+        return respond({**_user(BOT_ID), "bot": True})
+
+    async def application(_: web.Request) -> web.Response:
+        return respond(
+            {
+                "id": str(BOT_ID),
+                "name": "benchmark",
+                "description": "",
+                "icon": None,
+                "bot_public": False,
+                "bot_require_code_grant": False,
+                "owner": _user(2),
+                "verify_key": "benchmark",
+                "flags": 0,
+            }
+        )
+
+    async def gateway_bot(_: web.Request) -> web.Response:
+        return respond(
+            {
+                "url": f"ws://127.0.0.1:{port}/gateway",
+                "shards": args.recommended_shards,
+                "session_start_limit": {
+                    "total": 1000,
+                    "remaining": 1000,
+                    "reset_after": 0,
+                    "max_concurrency": 1,
+                },
+            }
+        )
+
+    async def gateway(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        await ws.send_json({"op": 10, "d": {"heartbeat_interval": args.heartbeat}})
+        sequence = 0
+        acks: set[asyncio.Task[None]] = set()
+
+        async def acknowledge() -> None:
+            # Acking at localhost speed races discord.py's heartbeat bookkeeping,
+            # which then reports a whole interval as latency
+            await asyncio.sleep(args.rtt / 1000)
+            await ws.send_json({"op": 11})
+
+        async def dispatch(event: str, data: str) -> None:
+            nonlocal sequence
+            sequence += 1
+            await ws.send_str(f'{{"op":0,"t":"{event}","s":{sequence},"d":{data}}}')
+
+        async for frame in ws:
+            if frame.type is not WSMsgType.TEXT:
+                break
+            payload = json.loads(frame.data)
+            if payload["op"] == 1:
+                task = asyncio.create_task(acknowledge())
+                acks.add(task)
+                task.add_done_callback(acks.discard)
+            elif payload["op"] == 2:
+                shard_id, shard_count = payload["d"].get("shard", [0, 1])
+                owned = [
+                    (guild_id, data)
+                    for guild_id, data in guilds
+                    if (guild_id >> 22) % shard_count == shard_id
+                ]
+                ready = {
+                    "v": 10,
+                    "user": {**_user(BOT_ID), "bot": True},
+                    "guilds": [
+                        {"id": str(guild_id), "unavailable": True}
+                        for guild_id, _ in owned
+                    ],
+                    "session_id": f"session-{shard_id}",
+                    "resume_gateway_url": f"ws://127.0.0.1:{port}/gateway",
+                    "shard": [shard_id, shard_count],
+                    "application": {"id": str(BOT_ID), "flags": 0},
+                }
+                await dispatch("READY", json.dumps(ready))
+                for _, data in owned:
+                    await dispatch("GUILD_CREATE", data)
+                if owned and payload["d"]["intents"] & GUILD_MESSAGES_INTENT:
+                    # This shard's part of the message stream
+                    share = args.messages * len(owned) // max(1, args.guilds)
+                    for index in range(share):
+                        guild_id = owned[index % len(owned)][0]
+                        message = _message(
+                            10**9 + index,
+                            guild_id * 1000 + index % max(1, args.channels),
+                            guild_id,
+                            guild_id * 100_000 + index % max(1, args.members),
+                        )
+                        await dispatch("MESSAGE_CREATE", json.dumps(message))
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/api/v10/users/@me", users_me)
+    app.router.add_get("/api/v10/oauth2/applications/@me", application)
+    app.router.add_get("/api/v10/gateway/bot", gateway_bot)
+    app.router.add_get("/gateway", gateway)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    print(port, flush=True)
+    await asyncio.Event().wait()
+
+
+async def _measure(args: argparse.Namespace) -> dict:
+    # Imported here so the mode's environment is in place before config loads
+    import yarl  # noqa: PLC0415
+    from discord.gateway import DiscordWebSocket  # noqa: PLC0415
+    from discord.http import Route  # noqa: PLC0415
+
+    from src.config import config  # noqa: PLC0415
+    from src.services.discord.bot import Bot, ShardedBot  # noqa: PLC0415
+    from src.services.metrics.loop_monitor import LoopMonitor  # noqa: PLC0415
+    from src.shared.metrics import current_rss_bytes  # noqa: PLC0415
+
+    Route.BASE = f"http://127.0.0.1:{args.port}/api/v10"
+    DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"ws://127.0.0.1:{args.port}/gateway")
+
+    bot_class = ShardedBot if config.discord_sharded else Bot
+    ready = asyncio.Event()
+
+    class BenchmarkBot(bot_class):
+        async def setup_hook(self) -> None:
+            pass  # No cogs, the benchmark only measures the gateway
+
+        async def on_ready(self) -> None:
+            ready.set()
+
+        async def before_identify_hook(
+            self, shard_id: int | None, *, initial: bool = False
+        ) -> None:
+            pass  # The fake gateway has no identify rate limit
+
+    # Only the lag samples are used, stall reports would be noise here
+    monitor = await LoopMonitor.create_and_start(threshold=3600)
+    bot = BenchmarkBot()
+    await bot.login("benchmark")
+    bot._connection.guild_ready_timeout = args.ready_timeout
+
+    worst_heartbeat: dict[int, float] = {}
+
+    async def sample_heartbeats() -> None:
+        while True:
+            for shard_id, latency in bot.shard_latencies:
+                if latency != float("inf"):
+                    worst = worst_heartbeat.get(shard_id, 0.0)
+                    worst_heartbeat[shard_id] = max(worst, latency)
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_heartbeats())
+    started = time.perf_counter()
+    connection = asyncio.create_task(bot.connect())
+    await asyncio.wait_for(ready.wait(), timeout=args.timeout)
+    ready_after = time.perf_counter() - started
+    p50, p99, worst_lag = monitor.percentiles(0.5, 0.99, 1.0)
+
+    # A few more heartbeats once the stream has settled
+    await asyncio.sleep(args.heartbeat / 1000 * 3)
+    sampler.cancel()
+    result = {
+        "shards": len(bot.shard_latencies),
+        "guilds": len(bot.guilds),
+        "ready_s": ready_after,
+        "lag_p50_ms": p50 * 1000,
+        "lag_p99_ms": p99 * 1000,
+        "lag_max_ms": worst_lag * 1000,
+        "heartbeat_max_ms": max(worst_heartbeat.values(), default=0.0) * 1000,
+        "rss_mb": current_rss_bytes() / 1024 / 1024,
+    }
+    await bot.close()
+    await connection
+    await monitor.stop()
+    return result
+
+
+def _run_mode(mode: str, port: int, args: argparse.Namespace) -> dict:
+    env = dict(os.environ, DISCORD_SHARDS="" if mode == "single" else mode)
+    command = [
+        sys.executable,
+        __file__,
+        "--child",
+        f"--port={port}",
+        f"--heartbeat={args.heartbeat}",
+        f"--ready-timeout={args.ready_timeout}",
+        f"--timeout={args.timeout}",
+    ]
+    output = subprocess.run(
+        command, env=env, cwd=ROOT, check=True, capture_output=True, text=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--guilds", type=int, default=2000)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--members", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument(
+        "--modes",
+        default="single,2,4,auto",
+        help='comma-separated "single", shard counts, or "auto"',
+    )
+    parser.add_argument(
+        "--recommended-shards",
+        type=int,
+        default=4,
+        help='shard count the fake gateway recommends for "auto"',
+    )
+    parser.add_argument(
+        "--heartbeat", type=int, default=1000, help="heartbeat interval in ms"
+    )
+    parser.add_argument(
+        "--rtt", type=float, default=20, help="simulated round trip in ms"
+    )
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=0.5,
+        help="seconds discord.py waits for more guilds before on_ready",
+    )
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(_serve(args))
+        return
+    if args.child:
+        sys.path.insert(0, str(ROOT))
+        print(json.dumps(asyncio.run(_measure(args))))
+        return
+
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            __file__,
+            "--serve",
+            f"--guilds={args.guilds}",
+            f"--channels={args.channels}",
+            f"--members={args.members}",
+            f"--messages={args.messages}",
+            f"--heartbeat={args.heartbeat}",
+            f"--rtt={args.rtt}",
+            f"--recommended-shards={args.recommended_shards}",
+        ],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert server.stdout is not None
+        port = int(server.stdout.readline())
+        print(
+            f"{args.guilds} guilds x {args.channels} channels, "
+            f"{args.members} members/guild, {args.messages} messages, "
+            f"{args.rtt:g}ms round trip, on_ready after {args.ready_timeout:g}s without new guilds\n"
+        )
+        print(
+            f"{'mode':<8}{'shards':>8}{'guilds':>8}{'ready s':>9}{'lag p50':>9}"
+            f"{'lag p99':>9}{'lag max':>9}{'hb max':>9}{'RSS MB':>9}"
+        )
+        for mode in args.modes.split(","):
+            result = _run_mode(mode.strip(), port, args)
+            print(
+                f"{mode:<8}{result['shards']:>8}{result['guilds']:>8}"
+                f"{result['ready_s']:>9.2f}{result['lag_p50_ms']:>9.1f}"
+                f"{result['lag_p99_ms']:>9.1f}{result['lag_max_ms']:>9.1f}"
+                f"{result['heartbeat_max_ms']:>9.1f}{result['rss_mb']:>9.1f}"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
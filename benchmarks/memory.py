@@ -0,0 +1,208 @@
+"""
+Steady-state memory benchmark for the default and low-memory Discord bot modes.
+
+Each mode runs in a fresh interpreter. The bot is built exactly as in production
+(without logging in), then synthetic gateway payloads are fed to its connection
+state: N guilds with C text channels and M members each, followed by a stream
+of channel messages (only when the mode's intents would receive them).
+
+Usage:
+    uv run benchmarks/memory.py --guilds 100 --channels 50 --members 50 --messages 20000
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Dummy credentials, the benchmark never connects
+os.environ.setdefault("DISCORD_TOKEN", "benchmark")
+os.environ.setdefault("TELEGRAM_API_ID", "1")
+os.environ.setdefault("TELEGRAM_API_HASH", "benchmark")
+
+
+def _user(user_id: int) -> dict:
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id}",
+        "discriminator": "0",
+        "global_name": f"User {user_id}",
+        "avatar": None,
+    }
+
+
+def _guild(guild_id: int, channels: int, members: int, bot_id: int) -> dict:
+    channel_payloads = [
+        {
+            "id": str(guild_id * 1000 + index),
+            "type": 0,
+            "name": f"channel-{index}",
+            "position": index,
+            "guild_id": str(guild_id),
+            "permission_overwrites": [],
+        }
+        for index in range(channels)
+    ]
+    member_ids = [bot_id] + [guild_id * 100_000 + index for index in range(members)]
+    member_payloads = [
+        {
+            "user": _user(member_id),
+            "roles": [],
+            "joined_at": "2024-01-01T00:00:00+00:00",
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        }
+        for member_id in member_ids
+    ]
+    return {
+        "id": str(guild_id),
+        "name": f"Guild {guild_id}",
+        "owner_id": str(guild_id * 100_000),
+        "roles": [
+            {
+                "id": str(guild_id),
+                "name": "@everyone",
+                "permissions": "0",
+                "position": 0,
+                "color": 0,
+                "hoist": False,
+                "managed": False,
+                "mentionable": False,
+            }
+        ],
+        "channels": channel_payloads,
+        "members": member_payloads,
+        "member_count": len(member_payloads),
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "threads": [],
+        "voice_states": [],
+        "presences": [],
+    }
+
+
+def _message(message_id: int, channel_id: int, guild_id: int, author_id: int) -> dict:
+    return {
+        "id": str(message_id),
+        "channel_id": str(channel_id),
+        "guild_id": str(guild_id),
+        "author": _user(author_id),
+        "content": "Promoção imperdível! https://example.com/oferta " * 4,
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+async def _measure(args: argparse.Namespace) -> dict:
+    # Imported here so the mode's environment is in place before config loads
+    import discord  # noqa: PLC0415
+
+    from src.services.discord.bot import Bot  # noqa: PLC0415
+    from src.shared.metrics import current_rss_bytes  # noqa: PLC0415
+
+    gc.collect()
+    baseline = current_rss_bytes()
+
+    bot = Bot()
+    # Binds the bot to the running loop, as login() does, without any network I/O
+    await bot._async_setup_hook()
+    state = bot._connection
+    bot_id = 1
+    state.user = discord.ClientUser(state=state, data=_user(bot_id))
+
+    for guild_index in range(args.guilds):
+        guild_id = guild_index + 1
+        state._add_guild_from_data(
+            _guild(guild_id, args.channels, args.members, bot_id)  # type: ignore[arg-type]
+        )
+
+    receives_messages = bot.intents.guild_messages
+    if receives_messages:
+        for index in range(args.messages):
+            guild_id = index % args.guilds + 1
+            channel_id = guild_id * 1000 + index % args.channels
+            author_id = guild_id * 100_000 + index % max(1, args.members)
+            state.parse_message_create(
+                _message(10**9 + index, channel_id, guild_id, author_id)  # type: ignore[arg-type]
+            )
+
+    # Let dispatched on_message tasks run and settle
+    await asyncio.sleep(0.1)
+    gc.collect()
+    steady = current_rss_bytes()
+
+    return {
+        "guilds": len(bot.guilds),
+        "members": sum(len(guild.members) for guild in bot.guilds),
+        "users": len(bot.users),
+        "messages": len(bot.cached_messages),
+        "rss_mb": steady / 1024 / 1024,
+        "delta_mb": (steady - baseline) / 1024 / 1024,
+    }
+
+
+def _run_mode(mode: str, args: argparse.Namespace) -> dict:
+    env = dict(os.environ, LOW_MEMORY="true" if mode == "low" else "false")
+    command = [
+        sys.executable,
+        __file__,
+        "--child",
+        f"--guilds={args.guilds}",
+        f"--channels={args.channels}",
+        f"--members={args.members}",
+        f"--messages={args.messages}",
+    ]
+    output = subprocess.run(
+        command, env=env, cwd=ROOT, check=True, capture_output=True, text=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, str(ROOT))
+        print(json.dumps(asyncio.run(_measure(args))))
+        return
+
+    print(
+        f"{args.guilds} guilds x {args.channels} channels, "
+        f"{args.members} members/guild, {args.messages} messages\n"
+    )
+    print(
+        f"{'mode':<8}{'guilds':>8}{'members':>10}{'users':>8}{'messages':>10}"
+        f"{'RSS MB':>10}{'delta MB':>10}"
+    )
+    for mode in ("default", "low"):
+        result = _run_mode(mode, args)
+        print(
+            f"{mode:<8}{result['guilds']:>8}{result['members']:>10}{result['users']:>8}"
+            f"{result['messages']:>10}{result['rss_mb']:>10.1f}{result['delta_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Update-processing throughput benchmark for the file and memory session modes.
+
+Replays the session work Telethon does while handling updates: every batch of
+updates stores its users and chats with process_entities, update state is
+saved, and the file session commits once per keep-alive interval (the memory
+session flushes on its own interval instead, off the event loop). The
+benchmark reports updates per second and the longest single stall of the
+event loop caused by session work.
+
+Usage:
+    uv run benchmarks/session_throughput.py --updates 50000 --entities 2000
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Dummy credentials, the benchmark never connects
+os.environ.setdefault("DISCORD_TOKEN", "benchmark")
+os.environ.setdefault("TELEGRAM_API_ID", "1")
+os.environ.setdefault("TELEGRAM_API_HASH", "benchmark")
+
+
+def _batch(index: int, entities: int, batch_size: int) -> object:
+    from telethon.tl import types  # noqa: PLC0415
+
+    users = [
+        types.User(
+            id=(index * batch_size + offset) % entities + 1,
+            access_hash=index,
+            first_name=f"User {offset}",
+            username=f"user{(index * batch_size + offset) % entities}",
+        )
+        for offset in range(batch_size)
+    ]
+    chats = [
+        types.Channel(
+            id=10**9 + index % entities,
+            title="Promoções",
+            photo=types.ChatPhotoEmpty(),
+            date=None,
+            access_hash=index,
+            username=f"canal{index % entities}",
+        )
+    ]
+    return types.contacts.ResolvedPeer(None, users, chats)
+
+
+async def _measure(mode: str, args: argparse.Namespace, directory: Path) -> dict:
+    from telethon.sessions import SQLiteSession  # noqa: PLC0415
+    from telethon.tl import types  # noqa: PLC0415
+
+    from src.services.telegram.session import PersistentMemorySession  # noqa: PLC0415
+
+    name = str(directory / mode)
+    if mode == "file":
+        session = SQLiteSession(name)
+    else:
+        session = PersistentMemorySession(name)
+        session.start_flushing(args.interval)
+    session.set_dc(2, "149.154.167.51", 443)
+
+    batches = [_batch(i, args.entities, args.batch) for i in range(args.updates)]
+    state = types.updates.State(
+        pts=1, qts=0, date=datetime.datetime.now(datetime.UTC), seq=0, unread_count=0
+    )
+    worst_stall = 0.0
+    started = last_save = time.perf_counter()
+    for index, batch in enumerate(batches, start=1):
+        step = time.perf_counter()
+        session.process_entities(batch)
+        session.set_update_state(0, state)
+        if mode == "file" and step - last_save >= args.interval:
+            # What the client's keep-alive loop does for file sessions
+            session.save()
+            last_save = step
+        worst_stall = max(worst_stall, time.perf_counter() - step)
+        if index % 100 == 0:
+            # Yield so the memory session's flush task can run
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+
+    if isinstance(session, PersistentMemorySession):
+        await session.stop_flushing()
+    else:
+        session.save()
+        session.close()
+
+    return {
+        "updates_per_second": args.updates / elapsed,
+        "worst_stall_ms": worst_stall * 1000,
+        "file_kb": (directory / f"{mode}.session").stat().st_size / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--updates", type=int, default=50_000)
+    parser.add_argument("--entities", type=int, default=2_000)
+    parser.add_argument("--batch", type=int, default=3, help="users per update")
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="save/flush interval in seconds"
+    )
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    print(
+        f"{args.updates} updates, {args.entities} distinct entities, "
+        f"{args.batch} users/update, save every {args.interval:g}s\n"
+    )
+    print(f"{'mode':<8}{'updates/s':>12}{'worst stall ms':>16}{'file KB':>10}")
+    for mode in ("file", "memory"):
+        with tempfile.TemporaryDirectory() as directory:
+            result = asyncio.run(_measure(mode, args, Path(directory)))
+        print(
+            f"{mode:<8}{result['updates_per_second']:>12.0f}"
+            f"{result['worst_stall_ms']:>16.2f}{result['file_kb']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
 import asyncio
 import logging
+import signal
 import sys
 from contextlib import suppress
+from pathlib import Path
 
 import discord.utils
 
 from src.config import config
-from src.services.discord.bot import Bot
+from src.database import reminders
+from src.database.schema import init_database
+from src.services.discord.bot import Bot, ShardedBot
 from src.services.forwarder.forwarder import MessageForwarder
-from src.services.telegram.client import TelegramClient
-from src.shared.exceptions import ServiceNotInitializedError
+from src.services.ipc.link import DeliveryLink
+from src.services.ipc.server import DeliveryServer
+from src.services.ipc.supervisor import ProcessSupervisor
+from src.services.metrics.loop_monitor import LoopMonitor
+from src.services.metrics.server import MetricsServer
+from src.services.telegram.accounts import TelegramAccounts
+from src.shared.exceptions import ServiceNotInitializedError, StreamStalledError
 from src.shared.services import services
+from src.shared.timing import startup_timer
 
 # Configure logging based on environment
 log_level = logging.INFO if config.is_development else logging.WARNING
@@ -19,27 +29,113 @@ discord.utils.setup_logging(level=log_level)
 logger = logging.getLogger(__name__)
 
 
-async def initialize_services() -> None:
-    """Initialize all services: Discord bot, Telegram client, and message forwarder."""
-    bot, client = await asyncio.gather(
-        Bot.create_and_initialize(config.discord_token),
-        TelegramClient.create_and_connect(
-            api_id=config.telegram_api_id,
-            api_hash=config.telegram_api_hash,
-        ),
+async def initialize_services(
+    role: str = "", stop: asyncio.Event | None = None
+) -> None:
+    """
+    Initialize all services: Discord bot, Telegram accounts, and message forwarder.
+
+    Args:
+        role: "ingestion" or "delivery" to run only that side of the split
+            process mode, empty to run everything in this process
+        stop: Set by the ingestion process to shut down, since it has no bot
+    """
+    ingests = role != "delivery"
+    delivers = role != "ingestion"
+
+    # Start measuring the loop first so blocking startup work is also reported
+    services.loop_monitor = await LoopMonitor.create_and_start(
+        threshold=config.loop_stall_threshold
     )
-    services.bot = bot
-    services.client = client
 
-    # Setup forwarder (main application functionality)
-    forwarder = MessageForwarder()
-    forwarder.start()
+    async def connect_discord() -> None:
+        bot_class = ShardedBot if config.discord_sharded else Bot
+        services.bot = await startup_timer.track(
+            "discord_login", bot_class.create_and_initialize(config.discord_token)
+        )
+
+    async def connect_telegram() -> None:
+        accounts = await startup_timer.track(
+            "telegram_connect",
+            TelegramAccounts.create_and_connect(
+                names=config.telegram_sessions,
+                api_id=config.telegram_api_id,
+                api_hash=config.telegram_api_hash,
+                low_memory=config.low_memory,
+                session_mode=config.telegram_session_mode,
+                session_flush_interval=config.telegram_session_flush_interval,
+            ),
+        )
+        services.telegram_accounts = accounts
+        services.client = accounts.primary.client
+
+    steps = [startup_timer.track("database", asyncio.to_thread(init_database))]
+    if delivers:
+        steps.append(connect_discord())
+    if ingests:
+        steps.append(connect_telegram())
+    await asyncio.gather(*steps)
+
+    # Setup forwarder (main application functionality). Messages are buffered
+    # from here on and processed once the hot caches are loaded.
+    if role == "ingestion":
+        # Matched messages go to the delivery process; reminders changed there
+        # come back as reload requests
+        services.delivery_link = await DeliveryLink.create_and_start(
+            config.ipc_socket_path,
+            on_reload_reminders=reminders.invalidate_reminder_index,
+        )
+        forwarder = MessageForwarder(sink=services.delivery_link.send)
+    else:
+        forwarder = MessageForwarder()
     services.forwarder = forwarder
 
-    async def on_ready_handler() -> None:
-        await forwarder.on_bot_ready()
+    if role == "delivery":
+        services.delivery_server = await DeliveryServer.create_and_start(
+            config.ipc_socket_path, forwarder.deliver
+        )
+        reminders.add_invalidation_listener(
+            services.delivery_server.notify_reminders_changed
+        )
+
+    if ingests:
+        forwarder.start()
+        # Handlers are registered, so updates missed while offline can be replayed
+        await services.telegram_accounts.start_supervisors()
+    await startup_timer.track("forwarder_warm_up", forwarder.warm_up())
+
+    if ingests:
+        accounts = services.telegram_accounts
+
+        async def stop_ingestion() -> None:
+            assert stop is not None
+            stop.set()
+
+        # Restarts the process (by closing the bot) if an update stream stalls
+        await accounts.start_watchdogs(
+            forwarder.liveness,
+            on_stalled=services.bot.close if delivers else stop_ingestion,
+        )
 
-    services.bot.add_listener(on_ready_handler, "on_ready")
+        # Spread the channels over the logged-in accounts, in the background since
+        # moving channels joins them one by one
+        accounts.start_rebalancing(on_rebalanced=forwarder.reload_channels)
+
+    if delivers:
+
+        async def on_ready_handler() -> None:
+            startup_timer.mark("discord_ready")
+            await forwarder.on_bot_ready()
+
+        services.bot.add_listener(on_ready_handler, "on_ready")
+
+    # Optional metrics endpoint, only when a port is configured. In the split
+    # mode the ingestion process uses the next port.
+    if config.metrics_port is not None:
+        port = config.metrics_port + (1 if role == "ingestion" else 0)
+        services.metrics_server = await MetricsServer.create_and_start(
+            host=config.metrics_host, port=port
+        )
 
 
 async def cleanup_services() -> None:
@@ -50,24 +146,77 @@ async def cleanup_services() -> None:
             await services.bot.close()
 
     async def cleanup_client() -> None:
+        # Stop supervising first, or the disconnect would trigger a reconnect
+        with suppress(ServiceNotInitializedError):
+            await services.telegram_accounts.stop()
         with suppress(ServiceNotInitializedError, AssertionError):
-            await services.client.disconnect()
-
-    await asyncio.gather(cleanup_bot(), cleanup_client(), return_exceptions=True)
+            await services.telegram_accounts.disconnect()
+
+    async def cleanup_forwarder() -> None:
+        with suppress(ServiceNotInitializedError):
+            services.forwarder.matcher.stop()
+            await services.forwarder.stop_dms()
+
+    async def cleanup_ipc() -> None:
+        with suppress(ServiceNotInitializedError):
+            await services.delivery_link.stop()
+        with suppress(ServiceNotInitializedError):
+            await services.delivery_server.stop()
+
+    async def cleanup_metrics_server() -> None:
+        with suppress(ServiceNotInitializedError):
+            await services.metrics_server.stop()
+
+    async def cleanup_loop_monitor() -> None:
+        with suppress(ServiceNotInitializedError):
+            await services.loop_monitor.stop()
+
+    await asyncio.gather(
+        cleanup_bot(),
+        cleanup_client(),
+        cleanup_forwarder(),
+        cleanup_ipc(),
+        cleanup_metrics_server(),
+        cleanup_loop_monitor(),
+        return_exceptions=True,
+    )
 
 
-async def run_services() -> None:
+async def run_services(role: str = "") -> None:
+    stop = asyncio.Event()
+    if role:
+        # The process supervisor stops its children with SIGTERM
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
     try:
-        await initialize_services()
-        await services.bot.connect()  # Blocks until the bot is closed
+        await initialize_services(role, stop)
+        if role == "ingestion":
+            await stop.wait()
+        else:
+            if role:
+                stop_task = asyncio.create_task(stop.wait())
+                stop_task.add_done_callback(
+                    lambda _: asyncio.create_task(services.bot.close())
+                )
+            await services.bot.connect()  # Blocks until the bot is closed
+        if role != "delivery" and services.telegram_accounts.restart_requested:
+            # Exit non-zero so the platform's auto-restart kicks in
+            raise StreamStalledError("Telegram update stream stalled")
     finally:
         await cleanup_services()
 
 
 def main() -> None:
     try:
-        logger.info("Starting application...")
-        asyncio.run(run_services())
+        if config.process_mode == "split" and not config.process_role:
+            logger.info("Starting ingestion and delivery processes...")
+            asyncio.run(ProcessSupervisor(Path(__file__).resolve()).run())
+            return
+        logger.info(
+            f"Starting {config.process_role} process..."
+            if config.process_role
+            else "Starting application..."
+        )
+        asyncio.run(run_services(config.process_role))
     except KeyboardInterrupt:
         logger.info("Application stopped by user")
         sys.exit(0)
@@ -1,25 +1,51 @@
+import asyncio
 import logging
+import re
 import sqlite3
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from functools import partial
 
 import discord
 import telethon.errors
 from discord import app_commands
 from discord.ext import commands
-from telethon.tl.functions.channels import JoinChannelRequest, LeaveChannelRequest
 from telethon.tl.types import Channel as TelegramChannel
-from telethon.utils import get_input_channel
 
 from src.database import channels as channel_db
+from src.services.forwarder.health import BreakerState
+from src.services.telegram.resolver import ResolvedChannel
 from src.shared.exceptions import (
     ChannelAlreadyExistsError,
     ChannelNotFoundError,
+    NotAChannelError,
 )
-from src.shared.permissions import admin_only
+from src.shared.permissions import admin_only, telegram_required
 from src.shared.services import services
 from src.shared.utils import plural
 
 logger = logging.getLogger(__name__)
 
+# Channels resolved at the same time by the bulk commands. The scheduler
+# still paces the underlying Telegram requests.
+_BULK_CONCURRENCY = 5
+_BULK_MAX_CHANNELS = 500
+_BULK_FILE_MAX_BYTES = 64 * 1024
+_BULK_PROGRESS_EVERY = 10
+_MESSAGE_LIMIT = 2000
+
+
+@dataclass
+class _BulkItem:
+    canal: str
+    resolved: ResolvedChannel | None = None
+    # Full entity, only fetched for channels that still need to be added
+    channel: TelegramChannel | None = None
+    # Telegram account that joined the channel
+    account: str | None = None
+    error: str | None = None
+
 
 class Channels(commands.GroupCog, name="canais", description="Gerenciamento de canais"):
     def __init__(self) -> None:
@@ -29,6 +55,161 @@ class Channels(commands.GroupCog, name="canais", description="Gerenciamento de c
     def _escape_channel(channel: str | int) -> str:
         return discord.utils.escape_markdown(str(channel))
 
+    @staticmethod
+    async def _leave(channel: channel_db.TelegramChannel) -> None:
+        """Leave a stored channel with the account that joined it."""
+        accounts = services.telegram_accounts
+        account = accounts.get(channel.account)
+        if account is not None:
+            await accounts.leave(account, channel.username)
+
+    async def _resolve_channel(
+        self, interaction: discord.Interaction, canal: str
+    ) -> ResolvedChannel | None:
+        """Resolve a channel identifier through the resolver, reporting failures."""
+        try:
+            return await services.client.resolver.resolve(canal)
+        except NotAChannelError:
+            await interaction.followup.send(
+                f"**{self._escape_channel(canal)}** não é um canal",
+                suppress_embeds=True,
+            )
+        except ValueError:
+            await interaction.followup.send(
+                f"Não encontrei o canal **{self._escape_channel(canal)}**",
+                suppress_embeds=True,
+            )
+        except telethon.errors.FloodWaitError as e:
+            await interaction.followup.send(
+                f"O Telegram limitou as requisições. Tente novamente em {e.seconds} segundos."
+            )
+        except (telethon.errors.RPCError, ConnectionError, TimeoutError) as e:
+            logger.warning(f"Failed to resolve Telegram channel: {e}", exc_info=e)
+            await interaction.followup.send(
+                "Não foi possível buscar o canal, tente novamente mais tarde."
+            )
+        return None
+
+    @staticmethod
+    async def _read_channel_list(
+        interaction: discord.Interaction,
+        canais: str | None,
+        arquivo: discord.Attachment | None,
+    ) -> list[str] | None:
+        """Collect channel identifiers from the text option and the uploaded file."""
+        text = canais or ""
+        if arquivo is not None:
+            if arquivo.size > _BULK_FILE_MAX_BYTES:
+                await interaction.followup.send(
+                    f"O arquivo deve ter no máximo {_BULK_FILE_MAX_BYTES // 1024} KB"
+                )
+                return None
+            content = await arquivo.read()
+            text += "\n" + content.decode("utf-8", errors="replace")
+
+        # Deduplicate while keeping the order given by the user
+        items = list(dict.fromkeys(item for item in re.split(r"[\s,;]+", text) if item))
+        if not items:
+            await interaction.followup.send(
+                "Informe os canais no campo `canais` ou em um arquivo de texto"
+            )
+            return None
+        if len(items) > _BULK_MAX_CHANNELS:
+            await interaction.followup.send(
+                f"Envie no máximo {_BULK_MAX_CHANNELS} canais por vez"
+            )
+            return None
+        return items
+
+    async def _resolve_for_bulk(self, canal: str) -> _BulkItem:
+        try:
+            resolved = await services.client.resolver.resolve(canal)
+        except NotAChannelError:
+            return _BulkItem(canal, error="não é um canal")
+        except ValueError:
+            return _BulkItem(canal, error="não encontrado")
+        except telethon.errors.FloodWaitError as e:
+            return _BulkItem(canal, error=f"limite do Telegram, aguarde {e.seconds}s")
+        except (telethon.errors.RPCError, ConnectionError, TimeoutError) as e:
+            logger.warning(f"Failed to resolve Telegram channel {canal}: {e}")
+            return _BulkItem(canal, error="erro ao buscar")
+        return _BulkItem(canal, resolved=resolved)
+
+    async def _prepare_bulk_add(self, canal: str, existing: set[int]) -> _BulkItem:
+        item = await self._resolve_for_bulk(canal)
+        if item.resolved is None:
+            return item
+        if not item.resolved.username:
+            return _BulkItem(canal, error="canal privado")
+        if item.resolved.id in existing:
+            # Already configured, so already joined: no request needed
+            return item
+
+        # Joined by the account the channel is assigned to
+        accounts = services.telegram_accounts
+        owner = accounts.owner_of(item.resolved.id)
+        try:
+            channel = await accounts.join(owner, item.resolved.username)
+        except (ValueError, NotAChannelError):
+            return _BulkItem(canal, error="não encontrado")
+        except (telethon.errors.RPCError, ConnectionError, TimeoutError) as e:
+            logger.warning(f"Failed to join Telegram channel {canal}: {e}")
+            return _BulkItem(canal, error="erro ao entrar")
+        item.channel = channel
+        item.account = owner.name
+        return item
+
+    @staticmethod
+    async def _run_bulk(
+        interaction: discord.Interaction,
+        canais: list[str],
+        prepare: Callable[[str], Awaitable[_BulkItem]],
+    ) -> list[_BulkItem]:
+        """
+        Run `prepare` for every channel under a concurrency cap, reporting progress.
+
+        Returns:
+            One item per channel, in the order given by the user
+        """
+        total = len(canais)
+        progress = await interaction.followup.send(
+            f"Processando {total} {plural(total, 'canal', 'canais')}... 0/{total}",
+            wait=True,
+        )
+        semaphore = asyncio.Semaphore(_BULK_CONCURRENCY)
+
+        async def run_one(canal: str) -> _BulkItem:
+            async with semaphore:
+                return await prepare(canal)
+
+        results: dict[str, _BulkItem] = {}
+        tasks = [asyncio.create_task(run_one(canal)) for canal in canais]
+        for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+            item = await task
+            results[item.canal] = item
+            if done % _BULK_PROGRESS_EVERY == 0 and done < total:
+                # Progress is best effort, the summary is sent at the end anyway
+                with suppress(discord.HTTPException):
+                    await progress.edit(content=f"Processando... {done}/{total}")
+
+        with suppress(discord.HTTPException):
+            await progress.edit(content=f"Processados {total}/{total}")
+        return [results[canal] for canal in canais]
+
+    @staticmethod
+    async def _send_report(
+        interaction: discord.Interaction, header: str, lines: list[str]
+    ) -> None:
+        """Send a header and a list of lines, split across messages if needed."""
+        message = header
+        for line in lines:
+            if len(message) + len(line) + 1 > _MESSAGE_LIMIT:
+                await interaction.followup.send(message, suppress_embeds=True)
+                message = ""
+            message = f"{message}\n{line}" if message else line
+        if message:
+            await interaction.followup.send(message, suppress_embeds=True)
+
     discord_group = app_commands.Group(
         name="discord", description="Comandos para gerenciar canais do Discord"
     )
@@ -112,6 +293,52 @@ class Channels(commands.GroupCog, name="canais", description="Gerenciamento de c
 
         await interaction.followup.send(message)
 
+    @discord_group.command(
+        name="saude", description="Mostra o estado de entrega dos canais do Discord"
+    )
+    @admin_only()
+    async def health_discord(self, interaction: discord.Interaction) -> None:
+        statuses = services.forwarder.health.statuses()
+        if not statuses:
+            await interaction.response.send_message(
+                "Todos os canais do Discord estão saudáveis"
+            )
+            return
+
+        state_labels = {
+            BreakerState.CLOSED: "✅ normal",
+            BreakerState.OPEN: "⚠️ pausado",
+            BreakerState.HALF_OPEN: "🔄 testando",
+            BreakerState.DISABLED: "❌ desativado",
+        }
+        message_parts: list[str] = []
+        for status in statuses:
+            line = (
+                f"- <#{status.channel_id}>: {state_labels[status.state]}, "
+                f"{status.consecutive_failures} falha(s) seguida(s)"
+            )
+            if status.last_error:
+                error = discord.utils.escape_markdown(status.last_error[:100])
+                line += f" — {error}"
+            message_parts.append(line)
+
+        await interaction.response.send_message(
+            "Estado de entrega dos canais:\n\n" + "\n".join(message_parts)
+        )
+
+    @discord_group.command(
+        name="reativar", description="Reativa a entrega para um canal do Discord"
+    )
+    @app_commands.describe(canal="ID do canal do Discord")
+    @admin_only()
+    async def enable_discord(
+        self, interaction: discord.Interaction, canal: discord.abc.GuildChannel
+    ) -> None:
+        services.forwarder.health.enable(canal.id)
+        await interaction.response.send_message(
+            f"Reativei a entrega para o canal {canal.mention}"
+        )
+
     telegram_group = app_commands.Group(
         name="telegram", description="Comandos para gerenciar canais do Telegram"
     )
@@ -124,76 +351,93 @@ class Channels(commands.GroupCog, name="canais", description="Gerenciamento de c
         encaminhar="Se o canal deve encaminhar mensagens para o Discord (padrão: True)",
     )
     @admin_only()
+    @telegram_required()
     async def add_telegram(
         self, interaction: discord.Interaction, canal: str, encaminhar: bool = True
     ) -> None:
-        channel = await services.client.get_entity(canal)
-        if not isinstance(channel, TelegramChannel):
-            await interaction.response.send_message(
-                f"**{canal}** não é um canal", suppress_embeds=True
-            )
+        # Scheduled requests may wait on rate limits, so defer first
+        await interaction.response.defer()
+
+        resolved = await self._resolve_channel(interaction, canal)
+        if resolved is None:
             return
 
         # Check if channel is public
-        username = channel.username
+        username = resolved.username
         if not username:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 "Apenas canais públicos podem ser adicionados."
             )
             return
 
-        # Join channel if not already joined, archive it to keep it hidden
-        if channel.left:
-            input_channel = get_input_channel(channel)
-            try:
-                await services.client(JoinChannelRequest(input_channel))
-                await services.client.edit_folder(input_channel, 1)
-            except (
-                telethon.errors.RPCError,
-                ConnectionError,
-                TimeoutError,
-            ) as e:
-                logger.warning(f"Failed to join Telegram channel: {e}", exc_info=e)
-                await interaction.response.send_message(
-                    "Não foi possível entrar no canal, tente novamente mais tarde."
-                )
-                return
-
         channel_url = self._get_telegram_url_markdown(username)
 
+        # Already configured channels need no request to Telegram
+        if channel_db.get_telegram_channel(channel_id=resolved.id):
+            await interaction.followup.send(
+                f"O canal {channel_url} já está na lista",
+                suppress_embeds=True,
+            )
+            return
+
+        # Join channel with the account it's assigned to if not already joined,
+        # archive it to keep it hidden
+        accounts = services.telegram_accounts
+        owner = accounts.owner_of(resolved.id)
         try:
-            channel_db.add_telegram_channel(channel.id, username, encaminhar)
+            channel = await accounts.join(owner, username)
+        except (ValueError, NotAChannelError):
+            await interaction.followup.send(
+                f"Não encontrei o canal {channel_url}", suppress_embeds=True
+            )
+            return
+        except (
+            telethon.errors.RPCError,
+            ConnectionError,
+            TimeoutError,
+        ) as e:
+            logger.warning(f"Failed to join Telegram channel: {e}", exc_info=e)
+            await interaction.followup.send(
+                "Não foi possível entrar no canal, tente novamente mais tarde."
+            )
+            return
+
+        try:
+            channel_db.add_telegram_channel(
+                channel.id, channel.username, encaminhar, owner.name
+            )
             services.forwarder.reload_channels()
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"Adicionei o canal do Telegram {channel_url}",
                 suppress_embeds=True,
             )
         except ChannelAlreadyExistsError:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"O canal {channel_url} já está na lista",
                 suppress_embeds=True,
             )
         except sqlite3.DatabaseError as e:
             logger.error(f"Database error adding Telegram channel: {e}", exc_info=e)
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 "Erro ao adicionar o canal. Tente novamente.",
             )
 
     @telegram_group.command(name="remover", description="Remove um canal do Telegram")
     @app_commands.describe(canal="Link, Username ou ID do canal do Telegram")
     @admin_only()
+    @telegram_required()
     async def remove_telegram(
         self, interaction: discord.Interaction, canal: str
     ) -> None:
-        channel = await services.client.get_entity(canal)
-        if not isinstance(channel, TelegramChannel):
-            await interaction.response.send_message(
-                f"**{canal}** não é um canal", suppress_embeds=True
-            )
+        # Scheduled requests may wait on rate limits, so defer first
+        await interaction.response.defer()
+
+        resolved = await self._resolve_channel(interaction, canal)
+        if resolved is None:
             return
 
         # Use username if available, otherwise use escaped channel identifier
-        username = channel.username
+        username = resolved.username
         if username:
             channel_url = self._get_telegram_url_markdown(username)
         else:
@@ -201,36 +445,191 @@ class Channels(commands.GroupCog, name="canais", description="Gerenciamento de c
             channel_url = f"**{escaped_channel}**"
 
         try:
-            channel_db.remove_telegram_channel(channel.id)
+            stored = channel_db.get_telegram_channel(channel_id=resolved.id)
+            channel_db.remove_telegram_channel(resolved.id)
             services.forwarder.reload_channels()
 
-            # Leave channel if joined
-            if not channel.left:
-                input_channel = get_input_channel(channel)
-                try:
-                    await services.client(LeaveChannelRequest(input_channel))
-                except (
-                    telethon.errors.RPCError,
-                    ConnectionError,
-                    TimeoutError,
-                ) as e:
-                    logger.warning(f"Error leaving Telegram channel: {e}", exc_info=e)
+            try:
+                if stored is not None:
+                    await self._leave(stored)
+            except (
+                ValueError,
+                telethon.errors.RPCError,
+                ConnectionError,
+                TimeoutError,
+            ) as e:
+                logger.warning(f"Error leaving Telegram channel: {e}", exc_info=e)
 
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"Removi o canal do Telegram {channel_url}",
                 suppress_embeds=True,
             )
         except ChannelNotFoundError:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"O canal {channel_url} não está na lista", suppress_embeds=True
             )
         except sqlite3.DatabaseError as e:
             logger.error(f"Database error removing Telegram channel: {e}", exc_info=e)
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 "Erro ao remover o canal. Tente novamente.",
                 suppress_embeds=True,
             )
 
+    @telegram_group.command(
+        name="adicionar_varios", description="Adiciona vários canais do Telegram"
+    )
+    @app_commands.describe(
+        canais="Links, usernames ou IDs separados por vírgula ou espaço",
+        arquivo="Arquivo de texto com um canal por linha",
+        encaminhar="Se os canais devem encaminhar mensagens para o Discord (padrão: True)",
+    )
+    @admin_only()
+    @telegram_required()
+    async def add_telegram_bulk(
+        self,
+        interaction: discord.Interaction,
+        canais: str | None = None,
+        arquivo: discord.Attachment | None = None,
+        encaminhar: bool = True,
+    ) -> None:
+        await interaction.response.defer()
+
+        items = await self._read_channel_list(interaction, canais, arquivo)
+        if items is None:
+            return
+
+        try:
+            existing = {c.channel_id for c in channel_db.list_telegram_channels()}
+        except sqlite3.DatabaseError as e:
+            logger.error(f"Database error listing Telegram channels: {e}", exc_info=e)
+            await interaction.followup.send(
+                "Erro ao adicionar os canais. Tente novamente."
+            )
+            return
+
+        results = await self._run_bulk(
+            interaction, items, partial(self._prepare_bulk_add, existing=existing)
+        )
+
+        # Different identifiers may point to the same channel
+        already: set[int] = set()
+        new_channels: dict[int, _BulkItem] = {}
+        for item in results:
+            if item.channel is not None:
+                new_channels.setdefault(item.channel.id, item)
+            elif item.resolved is not None:
+                already.add(item.resolved.id)
+
+        try:
+            added = channel_db.add_telegram_channels(
+                [
+                    (i.channel.id, i.channel.username, encaminhar, i.account)
+                    for i in new_channels.values()
+                    if i.channel is not None
+                ]
+            )
+        except sqlite3.DatabaseError as e:
+            logger.error(f"Database error adding Telegram channels: {e}", exc_info=e)
+            await interaction.followup.send(
+                "Erro ao adicionar os canais. Tente novamente."
+            )
+            return
+
+        if added:
+            services.forwarder.reload_channels()
+
+        lines = [
+            f"- {self._get_telegram_url_markdown(i.channel.username)}"
+            for i in new_channels.values()
+            if i.channel is not None
+        ]
+        if already:
+            lines.append(
+                f"{len(already)} {plural(len(already), 'canal já estava', 'canais já estavam')} na lista"
+            )
+        lines.extend(
+            f"- ❌ **{self._escape_channel(item.canal)}**: {item.error}"
+            for item in results
+            if item.error
+        )
+        header = f"Adicionei {added} {plural(added, 'canal', 'canais')} do Telegram:"
+        await self._send_report(interaction, header, lines)
+
+    @telegram_group.command(
+        name="remover_varios", description="Remove vários canais do Telegram"
+    )
+    @app_commands.describe(
+        canais="Links, usernames ou IDs separados por vírgula ou espaço",
+        arquivo="Arquivo de texto com um canal por linha",
+    )
+    @admin_only()
+    @telegram_required()
+    async def remove_telegram_bulk(
+        self,
+        interaction: discord.Interaction,
+        canais: str | None = None,
+        arquivo: discord.Attachment | None = None,
+    ) -> None:
+        await interaction.response.defer()
+
+        items = await self._read_channel_list(interaction, canais, arquivo)
+        if items is None:
+            return
+
+        results = await self._run_bulk(interaction, items, self._resolve_for_bulk)
+
+        resolved: dict[int, ResolvedChannel] = {}
+        for item in results:
+            if item.resolved is not None:
+                resolved.setdefault(item.resolved.id, item.resolved)
+
+        try:
+            existing = {c.channel_id: c for c in channel_db.list_telegram_channels()}
+            to_remove = [existing[r.id] for r in resolved.values() if r.id in existing]
+            removed = channel_db.remove_telegram_channels(
+                [c.channel_id for c in to_remove]
+            )
+        except sqlite3.DatabaseError as e:
+            logger.error(f"Database error removing Telegram channels: {e}", exc_info=e)
+            await interaction.followup.send(
+                "Erro ao remover os canais. Tente novamente."
+            )
+            return
+
+        if removed:
+            services.forwarder.reload_channels()
+
+        # Leave the removed channels; the scheduler paces the requests
+        semaphore = asyncio.Semaphore(_BULK_CONCURRENCY)
+
+        async def leave(channel: channel_db.TelegramChannel) -> None:
+            async with semaphore:
+                try:
+                    await self._leave(channel)
+                except (
+                    ValueError,
+                    telethon.errors.RPCError,
+                    ConnectionError,
+                    TimeoutError,
+                ) as e:
+                    logger.warning(f"Error leaving Telegram channel: {e}", exc_info=e)
+
+        await asyncio.gather(*(leave(c) for c in to_remove))
+
+        lines = [f"- {self._get_telegram_url_markdown(c.username)}" for c in to_remove]
+        missing = len(resolved) - len(to_remove)
+        if missing:
+            lines.append(
+                f"{missing} {plural(missing, 'canal não estava', 'canais não estavam')} na lista"
+            )
+        lines.extend(
+            f"- ❌ **{self._escape_channel(item.canal)}**: {item.error}"
+            for item in results
+            if item.error
+        )
+        header = f"Removi {removed} {plural(removed, 'canal', 'canais')} do Telegram:"
+        await self._send_report(interaction, header, lines)
+
     @telegram_group.command(
         name="listar", description="Lista todos os canais do Telegram"
     )
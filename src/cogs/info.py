@@ -1,19 +1,114 @@
+import datetime
+import math
 import platform
 import sys
+import time
+from collections import Counter
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from src.database import channels as channel_db
+from src.services.metrics import profiler
+from src.services.telegram.accounts import TelegramAccount
 from src.services.telegram.exceptions import AUTH_ERRORS
-from src.shared.permissions import admin_only
+from src.services.telegram.watchdog import WatchdogLevel
+from src.shared.exceptions import CaptureInProgressError, ServiceNotInitializedError
+from src.shared.permissions import admin_only, telegram_required
 from src.shared.services import services
+from src.shared.timing import startup_timer
+from src.shared.utils import format_list_to_markdown, plural
+
+# Embed fields are limited to 1024 characters
+_MAX_SHARDS_SHOWN = 25
 
 
 class Info(commands.GroupCog, name="info", description="Bot information commands"):
     def __init__(self) -> None:
         self.start_time = discord.utils.utcnow()
 
+    @staticmethod
+    def _format_loop_lag() -> str:
+        try:
+            p50, p95, p99 = services.loop_monitor.percentiles(0.5, 0.95, 0.99)
+        except ServiceNotInitializedError:
+            return "Indisponível"
+        return (
+            f"p50 {p50 * 1000:.0f}ms · p95 {p95 * 1000:.0f}ms · p99 {p99 * 1000:.0f}ms"
+        )
+
+    @staticmethod
+    def _format_latency(seconds: float) -> str:
+        # Infinite until the first heartbeat is acknowledged
+        return f"{round(seconds * 1000)}ms" if math.isfinite(seconds) else "—"
+
+    @classmethod
+    def _format_shards(cls) -> str:
+        guilds = Counter(guild.shard_id for guild in services.bot.guilds)
+        latencies = services.bot.shard_latencies
+        lines = [
+            f"#{shard_id}: {cls._format_latency(latency)} · {guilds[shard_id]} "
+            f"{plural(guilds[shard_id], 'servidor', 'servidores')}"
+            for shard_id, latency in latencies[:_MAX_SHARDS_SHOWN]
+        ]
+        if len(latencies) > _MAX_SHARDS_SHOWN:
+            lines.append(f"e mais {len(latencies) - _MAX_SHARDS_SHOWN}")
+        return format_list_to_markdown(lines)
+
+    @staticmethod
+    def _format_connection_stats(account: TelegramAccount) -> str | None:
+        supervisor = account.supervisor
+        if supervisor is None:
+            return None
+
+        line = (
+            f"🔁 **Reconexões:** {supervisor.reconnects} · "
+            f"tempo offline {supervisor.downtime:.0f}s"
+        )
+        if supervisor.last_disconnect_at is not None:
+            last = discord.utils.format_dt(supervisor.last_disconnect_at, "R")
+            line += f" · última queda {last}"
+        return line
+
+    async def _format_account_status(self, account: TelegramAccount) -> list[str]:
+        """Status lines of a Telegram account: connection, login and limits."""
+        client = account.client
+        connection_stats = self._format_connection_stats(account)
+        if not client.is_connected():
+            lines = ["❌ **Telegram:** Desconectado"]
+            if connection_stats:
+                lines.append(connection_stats)
+            return lines
+
+        status_lines: list[str] = []
+        status_lines.append("✅ **Telegram:** Conectado")
+
+        # Check authentication
+        try:
+            me = await client.get_me()
+            if not me:
+                status_lines.append(
+                    "❌ **Autenticação:** Não autenticado (use `/telegram login`)"
+                )
+            else:
+                status_lines.append(
+                    f"✅ **Autenticação:** Logado como **{me.first_name}** (@{me.username})"
+                )
+        except AUTH_ERRORS as e:
+            status_lines.append(f"❌ **Autenticação:** Erro - {str(e)}")
+        except (ConnectionError, TimeoutError) as e:
+            status_lines.append(f"⚠️ **Autenticação:** Erro ao verificar - {str(e)}")
+
+        flood_wait = client.scheduler.flood_wait_remaining
+        if flood_wait > 0:
+            status_lines.append(
+                f"⏳ **Limite de requisições:** aguardando {flood_wait:.0f}s (FloodWait)"
+            )
+        if connection_stats:
+            status_lines.append(connection_stats)
+        return status_lines
+
     @app_commands.command(name="bot", description="Mostra informações sobre o bot")
     @admin_only()
     async def info(self, interaction: discord.Interaction) -> None:
@@ -31,7 +126,7 @@ class Info(commands.GroupCog, name="info", description="Bot information commands
         embed.add_field(name="ID do Bot", value=services.bot.user.id, inline=True)
         embed.add_field(
             name="Latência",
-            value=f"{round(services.bot.latency * 1000)}ms",
+            value=self._format_latency(services.bot.latency),
             inline=True,
         )
         embed.add_field(name="Servidores", value=len(services.bot.guilds), inline=True)
@@ -48,6 +143,15 @@ class Info(commands.GroupCog, name="info", description="Bot information commands
             name="Versão do discord.py", value=discord.__version__, inline=True
         )
         embed.add_field(name="Plataforma", value=platform.system(), inline=True)
+        embed.add_field(
+            name="Atraso do Loop", value=self._format_loop_lag(), inline=True
+        )
+        if isinstance(services.bot, commands.AutoShardedBot):
+            embed.add_field(
+                name=f"Shards ({services.bot.shard_count})",
+                value=self._format_shards(),
+                inline=False,
+            )
         embed.set_thumbnail(url=services.bot.user.display_avatar.url)
 
         await interaction.response.send_message(embed=embed)
@@ -56,38 +160,226 @@ class Info(commands.GroupCog, name="info", description="Bot information commands
         name="telegram", description="Mostra informações sobre o Telegram"
     )
     @admin_only()
+    @telegram_required()
     async def telegram(self, interaction: discord.Interaction) -> None:
         await interaction.response.defer(ephemeral=True)
 
-        # Telegram connection status
-        is_connected = services.client.is_connected()
-        if not is_connected:
+        accounts = services.telegram_accounts
+        if len(accounts) == 1:
+            lines = await self._format_account_status(accounts.primary)
+        else:
+            channel_counts: dict[str | None, int] = {}
+            for channel in channel_db.list_telegram_channels():
+                owner = accounts.get(channel.account)
+                name = owner.name if owner else None
+                channel_counts[name] = channel_counts.get(name, 0) + 1
+
+            lines = []
+            for account in accounts:
+                count = channel_counts.get(account.name, 0)
+                lines.append(
+                    f"**Conta `{account.name}`** · {count} "
+                    f"{plural(count, 'canal', 'canais')}"
+                )
+                lines.extend(await self._format_account_status(account))
+            if unassigned := channel_counts.get(None):
+                lines.append(
+                    f"⚠️ {unassigned} {plural(unassigned, 'canal', 'canais')} "
+                    "em contas removidas, aguardando redistribuição"
+                )
+
+        message = "\n".join(lines)
+        await interaction.followup.send(message[:2000], ephemeral=True)
+
+    @app_commands.command(
+        name="loop", description="Mostra os maiores bloqueios do event loop"
+    )
+    @admin_only()
+    async def loop(self, interaction: discord.Interaction) -> None:
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            monitor = services.loop_monitor
+        except ServiceNotInitializedError:
             await interaction.followup.send(
-                "❌ **Telegram:** Desconectado", ephemeral=True
+                "O monitor do event loop não está ativo", ephemeral=True
             )
             return
 
-        status_lines: list[str] = []
-        status_lines.append("✅ **Telegram:** Conectado")
+        p50, p95, p99, worst = monitor.percentiles(0.5, 0.95, 0.99, 1.0)
+        lines = [
+            f"**Atraso do loop:** p50 {p50 * 1000:.0f}ms · p95 {p95 * 1000:.0f}ms · "
+            f"p99 {p99 * 1000:.0f}ms · máx {worst * 1000:.0f}ms",
+        ]
+
+        stalls = monitor.stalls
+        if not stalls:
+            lines.append(
+                f"Nenhum bloqueio acima de {monitor.threshold * 1000:.0f}ms registrado"
+            )
+            await interaction.followup.send("\n".join(lines), ephemeral=True)
+            return
+
+        lines.append(
+            f"**Maiores bloqueios** (limite {monitor.threshold * 1000:.0f}ms):"
+        )
+        for stall in stalls:
+            started = datetime.datetime.fromtimestamp(stall.started_at, datetime.UTC)
+            timestamp = discord.utils.format_dt(started, "R")
+            # Innermost frame is where the loop was stuck
+            location = stall.stacks[0].strip().splitlines()[-2:] if stall.stacks else []
+            where = " ".join(line.strip() for line in location) or "desconhecido"
+            lines.append(
+                f"- {stall.duration * 1000:.0f}ms {timestamp}: `{where[:150]}`"
+            )
+
+        await interaction.followup.send("\n".join(lines)[:2000], ephemeral=True)
+
+    @app_commands.command(
+        name="fluxo", description="Mostra a saúde do fluxo de mensagens do Telegram"
+    )
+    @admin_only()
+    async def stream(self, interaction: discord.Interaction) -> None:
+        await interaction.response.defer(ephemeral=True)
 
-        # Check authentication
         try:
-            me = await services.client.get_me()
-            if not me:
-                status_lines.append(
-                    "❌ **Autenticação:** Não autenticado (use `/telegram login`)"
-                )
-            else:
-                status_lines.append(
-                    f"✅ **Autenticação:** Logado como **{me.first_name}** (@{me.username})"
+            accounts = services.telegram_accounts
+        except ServiceNotInitializedError:
+            accounts = None
+        watchdogs = [a.watchdog for a in accounts or () if a.watchdog is not None]
+        if not watchdogs:
+            await interaction.followup.send(
+                "O watchdog do Telegram não está ativo", ephemeral=True
+            )
+            return
+
+        level_labels = {
+            WatchdogLevel.OK: "✅ Normal",
+            WatchdogLevel.STALLED: "⚠️ Parado (buscando mensagens perdidas)",
+            WatchdogLevel.RECONNECTED: "🔁 Parado (reconectado)",
+            WatchdogLevel.RESTARTING: "❌ Parado (reiniciando)",
+        }
+        now = time.monotonic()
+        lines: list[str] = []
+        for watchdog in watchdogs:
+            tracker = watchdog.tracker
+            if len(watchdogs) > 1:
+                lines.append(f"**Conta `{watchdog.account}`**")
+            lines.extend(
+                [
+                    f"**Estado:** {level_labels[watchdog.level]}",
+                    f"**Silêncio:** {tracker.silence():.0f}s · "
+                    f"~{tracker.expected_posts():.1f} mensagens esperadas nesse período",
+                ]
+            )
+            if watchdog.last_probe:
+                lines.append(f"**Última verificação:** {watchdog.last_probe}")
+
+            overdue = [a for a in tracker.statuses() if a.overdue(now) >= 1][:10]
+            if overdue:
+                lines.append("**Canais atrasados** (em intervalos habituais):")
+                lines.extend(
+                    f"- `{a.channel_id}`: {a.overdue(now):.1f}x "
+                    f"(posta a cada ~{a.mean_interval / 60:.0f} min)"
+                    for a in overdue
+                    if a.mean_interval
                 )
-        except AUTH_ERRORS as e:
-            status_lines.append(f"❌ **Autenticação:** Erro - {str(e)}")
-        except (ConnectionError, TimeoutError) as e:
-            status_lines.append(f"⚠️ **Autenticação:** Erro ao verificar - {str(e)}")
 
-        message = "\n".join(status_lines)
-        await interaction.followup.send(message, ephemeral=True)
+        await interaction.followup.send("\n".join(lines)[:2000], ephemeral=True)
+
+    @app_commands.command(
+        name="inicializacao", description="Mostra o tempo de cada fase da inicialização"
+    )
+    @admin_only()
+    async def startup(self, interaction: discord.Interaction) -> None:
+        lines = startup_timer.report()
+        if not lines:
+            await interaction.response.send_message(
+                "Nenhuma fase de inicialização registrada", ephemeral=True
+            )
+            return
+
+        await interaction.response.send_message(
+            f"**Tempos de inicialização:**\n{format_list_to_markdown(lines)}",
+            ephemeral=True,
+        )
+
+    @app_commands.command(
+        name="sincronizar", description="Força a sincronização dos comandos slash"
+    )
+    @admin_only()
+    async def sync(self, interaction: discord.Interaction) -> None:
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            synced = await services.bot.sync_commands(force=True)
+        except discord.HTTPException as e:
+            await interaction.followup.send(
+                f"Erro ao sincronizar os comandos: {str(e)}", ephemeral=True
+            )
+            return
+
+        await interaction.followup.send(
+            f"Sincronizei {synced} comando(s)", ephemeral=True
+        )
+
+    @app_commands.command(
+        name="profile", description="Captura um perfil de CPU do processo em execução"
+    )
+    @app_commands.describe(segundos="Duração da captura em segundos (padrão: 30)")
+    @admin_only()
+    async def profile(
+        self,
+        interaction: discord.Interaction,
+        segundos: app_commands.Range[int, 1, 300] = 30,
+    ) -> None:
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            report = await profiler.profile_cpu(segundos)
+        except CaptureInProgressError:
+            await interaction.followup.send(
+                "Já existe uma captura em andamento. Tente novamente mais tarde.",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.followup.send(
+            f"Perfil de CPU de {segundos}s:",
+            file=discord.File(report, filename="cpu_profile.txt"),
+            ephemeral=True,
+        )
+
+    @app_commands.command(
+        name="memoria", description="Captura as maiores alocações de memória"
+    )
+    @app_commands.describe(
+        segundos="Duração da captura em segundos (padrão: 30)",
+        limite="Quantidade de alocações no relatório (padrão: 25)",
+    )
+    @admin_only()
+    async def memory(
+        self,
+        interaction: discord.Interaction,
+        segundos: app_commands.Range[int, 1, 300] = 30,
+        limite: app_commands.Range[int, 1, 100] = 25,
+    ) -> None:
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            report = await profiler.snapshot_allocations(segundos, limit=limite)
+        except CaptureInProgressError:
+            await interaction.followup.send(
+                "Já existe uma captura em andamento. Tente novamente mais tarde.",
+                ephemeral=True,
+            )
+            return
+
+        await interaction.followup.send(
+            f"Alocações de memória em {segundos}s:",
+            file=discord.File(report, filename="memory_snapshot.txt"),
+            ephemeral=True,
+        )
 
 
 async def setup(bot: commands.Bot) -> None:
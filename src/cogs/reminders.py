@@ -1,21 +1,50 @@
+import re
+from typing import Literal
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from src.database import reminders
-from src.database.reminders import MAX_GROUPS_PER_USER, MAX_TEXTS_PER_GROUP
+from src.config import config
+from src.database import channels as channel_db
+from src.database import dm_limits, reminders
+from src.database.reminder_expression import (
+    MatchMode,
+    Term,
+    format_expression,
+    parse_expression,
+)
+from src.database.reminders import (
+    MAX_CHANNELS_PER_GROUP,
+    MAX_GROUPS_PER_USER,
+    MAX_TEXTS_PER_GROUP,
+)
+from src.services.telegram.resolver import normalize_channel_key
 from src.shared.exceptions import (
+    ReminderExpressionError,
     ReminderGroupAlreadyExistsError,
     ReminderGroupNotFoundError,
     ReminderLimitReachedError,
     ReminderTextExistsError,
 )
+from src.shared.prices import format_price
+from src.shared.services import services
 from src.shared.utils import (
     format_list_to_markdown,
     plural,
     sanitize_text,
 )
 
+# Choices of the `modo` option
+_MATCH_MODES: dict[str, MatchMode] = {
+    "texto": "substring",
+    "palavra": "word",
+    "aproximado": "fuzzy",
+}
+
+# Separators between the channels of the `canais` option
+_CHANNEL_SEPARATORS = re.compile(r"[\s,;]+")
+
 
 class Reminders(
     commands.GroupCog,
@@ -44,17 +73,55 @@ class Reminders(
     @app_commands.describe(
         texto="Texto para adicionar ao grupo",
         grupo="Nome do grupo (opcional, se não especificado cria um grupo com o nome do texto)",
+        expressao=(
+            "Interpreta o texto como expressão: e, ou, nao, parênteses "
+            'e "frases exatas" (padrão: não)'
+        ),
+        modo=(
+            "texto: em qualquer parte (padrão), palavra: palavras inteiras, "
+            "aproximado: aceita erros de digitação"
+        ),
     )
     async def add_text(
         self,
         interaction: discord.Interaction,
         texto: str,
         grupo: str | None = None,
+        expressao: bool = False,
+        modo: Literal["texto", "palavra", "aproximado"] = "texto",
     ) -> None:
         # If no group specified, use the text name as group name (preserving casing)
         grupo = self._resolve_group_name(grupo, texto)
+        mode = _MATCH_MODES[modo]
 
-        escaped_text = self._sanitize_and_escape_text(texto)
+        if expressao and mode != "substring":
+            await interaction.response.send_message(
+                "Em expressões, o modo é escolhido em cada termo: use aspas para "
+                'palavras inteiras, como `"ps5"`, e `~` para aceitar erros de '
+                "digitação, como `~iphone`."
+            )
+            return
+
+        if expressao:
+            # Validated before the group is created, so a typo leaves nothing behind
+            try:
+                canonical = format_expression(parse_expression(texto))
+            except ReminderExpressionError:
+                await interaction.response.send_message(
+                    f"A expressão **{self._sanitize_and_escape_text(texto)}** é inválida. "
+                    "Combine termos com `e`, `ou` e `nao`, use parênteses para agrupar, "
+                    "aspas para frases exatas e `~` para aceitar erros de digitação, "
+                    'como `(rtx 4070 ou "4080") e nao usado`. '
+                    "A expressão precisa exigir pelo menos um termo."
+                )
+                return
+            escaped_text = discord.utils.escape_markdown(canonical)
+        elif mode != "substring":
+            escaped_text = discord.utils.escape_markdown(
+                format_expression(Term(sanitize_text(texto), mode))
+            )
+        else:
+            escaped_text = self._sanitize_and_escape_text(texto)
         escaped_group = self._escape_group(grupo)
 
         # Try to ensure group exists
@@ -72,7 +139,9 @@ class Reminders(
 
         # Add text to group
         try:
-            reminders.add_text_to_group(interaction.user.id, grupo, texto)
+            reminders.add_text_to_group(
+                interaction.user.id, grupo, texto, expression=expressao, mode=mode
+            )
         except ReminderLimitReachedError:
             await interaction.response.send_message(
                 f"O grupo **{escaped_group}** já tem {MAX_TEXTS_PER_GROUP} textos. "
@@ -133,6 +202,17 @@ class Reminders(
         message_parts: list[str] = []
         for group in groups:
             escaped_group = self._escape_group(group.group_name)
+            if group.max_price is not None:
+                escaped_group += f" (até {format_price(group.max_price)})"
+            if group.channels:
+                escaped_group += (
+                    " (só em "
+                    + ", ".join(
+                        discord.utils.escape_markdown(channel)
+                        for channel in group.channels
+                    )
+                    + ")"
+                )
             texts = group.texts
             if not texts:
                 message_parts.append(f"**{escaped_group}:** *(vazio)*")
@@ -154,6 +234,153 @@ class Reminders(
 
         await interaction.followup.send(message)
 
+    @app_commands.command(
+        name="preco",
+        description="Define o preço máximo de um grupo de lembretes",
+    )
+    @app_commands.describe(
+        grupo="Nome do grupo",
+        maximo="Preço máximo em reais (opcional, se não especificado remove o limite)",
+    )
+    async def set_max_price(
+        self,
+        interaction: discord.Interaction,
+        grupo: str,
+        maximo: app_commands.Range[float, 0.01] | None = None,
+    ) -> None:
+        escaped_group = self._escape_group(grupo)
+
+        try:
+            reminders.set_group_max_price(interaction.user.id, grupo, maximo)
+        except ReminderGroupNotFoundError:
+            await interaction.response.send_message(
+                f"O grupo **{escaped_group}** não existe"
+            )
+            return
+
+        if maximo is None:
+            await interaction.response.send_message(
+                f"O grupo **{escaped_group}** não tem mais limite de preço"
+            )
+            return
+
+        await interaction.response.send_message(
+            f"Vou te lembrar do grupo **{escaped_group}** só quando o preço "
+            f"da oferta for até **{format_price(maximo)}**"
+        )
+
+    @app_commands.command(
+        name="canais",
+        description="Limita um grupo de lembretes a alguns canais do Telegram",
+    )
+    @app_commands.describe(
+        grupo="Nome do grupo",
+        canais=(
+            "Links, usernames ou IDs separados por vírgula ou espaço "
+            "(opcional, se não especificado volta a valer para todos os canais)"
+        ),
+    )
+    async def set_channels(
+        self,
+        interaction: discord.Interaction,
+        grupo: str,
+        canais: str | None = None,
+    ) -> None:
+        escaped_group = self._escape_group(grupo)
+
+        # Only channels already monitored can be chosen, so they are looked up
+        # in the database without asking Telegram
+        channel_ids: list[int] = []
+        unknown: list[str] = []
+        for raw in _CHANNEL_SEPARATORS.split(canais or ""):
+            if not raw:
+                continue
+            key = normalize_channel_key(raw)
+            channel = None
+            if key is not None:
+                kind, value = key.split(":", 1)
+                channel = (
+                    channel_db.get_telegram_channel(channel_id=int(value))
+                    if kind == "id"
+                    else channel_db.get_telegram_channel(username=value)
+                )
+            if channel is None:
+                unknown.append(raw)
+            else:
+                channel_ids.append(channel.channel_id)
+
+        if unknown:
+            escaped_unknown = ", ".join(
+                f"**{discord.utils.escape_markdown(raw)}**" for raw in unknown
+            )
+            await interaction.response.send_message(
+                f"Não encontrei {plural(len(unknown), 'o canal', 'os canais')} "
+                f"{escaped_unknown} entre os canais monitorados"
+            )
+            return
+
+        try:
+            reminders.set_group_channels(interaction.user.id, grupo, channel_ids)
+        except ReminderGroupNotFoundError:
+            await interaction.response.send_message(
+                f"O grupo **{escaped_group}** não existe"
+            )
+            return
+        except ReminderLimitReachedError:
+            await interaction.response.send_message(
+                f"Um grupo pode ser limitado a no máximo {MAX_CHANNELS_PER_GROUP} canais"
+            )
+            return
+
+        if not channel_ids:
+            await interaction.response.send_message(
+                f"O grupo **{escaped_group}** voltou a valer para todos os canais"
+            )
+            return
+
+        channel_count = len(set(channel_ids))
+        await interaction.response.send_message(
+            f"Vou te lembrar do grupo **{escaped_group}** só em mensagens de "
+            f"{channel_count} {plural(channel_count, 'canal', 'canais')}"
+        )
+
+    @app_commands.command(
+        name="silencio",
+        description="Define um horário em que você não recebe lembretes",
+    )
+    @app_commands.describe(
+        inicio="Hora em que o silêncio começa (0 a 23)",
+        fim="Hora em que o silêncio termina (0 a 23)",
+    )
+    async def set_quiet_hours(
+        self,
+        interaction: discord.Interaction,
+        inicio: app_commands.Range[int, 0, 23] | None = None,
+        fim: app_commands.Range[int, 0, 23] | None = None,
+    ) -> None:
+        if inicio is None and fim is None:
+            dm_limits.clear_quiet_hours(interaction.user.id)
+            services.forwarder.throttle.set_quiet_hours(interaction.user.id, None)
+            await interaction.response.send_message(
+                "Você voltou a receber lembretes a qualquer hora"
+            )
+            return
+
+        if inicio is None or fim is None or inicio == fim:
+            await interaction.response.send_message(
+                "Informe o `inicio` e o `fim` do silêncio, em horas diferentes, "
+                "ou nenhum dos dois para receber lembretes a qualquer hora."
+            )
+            return
+
+        dm_limits.set_quiet_hours(interaction.user.id, inicio, fim)
+        services.forwarder.throttle.set_quiet_hours(interaction.user.id, (inicio, fim))
+        await interaction.response.send_message(
+            f"Não vou te mandar lembretes entre **{inicio}h** e **{fim}h** "
+            f"({config.quiet_hours_timezone.key}). Mensagens nesse horário não "
+            "são lembradas depois."
+        )
+
     @app_commands.command(
         name="remover",
         description="Remove um texto de um grupo de lembretes",
@@ -8,7 +8,7 @@ from discord.ext import commands
 
 from src.services.telegram import qr as telegram
 from src.services.telegram.exceptions import AUTH_ERRORS, PASSWORD_ERRORS
-from src.shared.permissions import admin_only
+from src.shared.permissions import admin_only, telegram_required
 from src.shared.services import services
 
 
@@ -22,15 +22,29 @@ class Telegram(
 
     @app_commands.command(name="login", description="Faz login no Telegram via QR code")
     @app_commands.describe(
-        senha="Senha 2FA (opcional, apenas se sua conta tiver autenticação de dois fatores)"
+        senha="Senha 2FA (opcional, apenas se sua conta tiver autenticação de dois fatores)",
+        conta="Nome da sessão da conta (opcional, padrão: a conta principal)",
     )
     @admin_only()
+    @telegram_required()
     async def login(
-        self, interaction: discord.Interaction, senha: str | None = None
+        self,
+        interaction: discord.Interaction,
+        senha: str | None = None,
+        conta: str | None = None,
     ) -> None:
         # Defer interaction immediately to prevent timeout
         await interaction.response.defer(ephemeral=True)
 
+        account = services.telegram_accounts.get(conta)
+        if account is None:
+            names = ", ".join(f"`{a.name}`" for a in services.telegram_accounts)
+            await interaction.followup.send(
+                f"Conta desconhecida. Contas configuradas: {names}", ephemeral=True
+            )
+            return
+        client = account.client
+
         # Delete any previously pending QR code message for this user
         user_id = interaction.user.id
         if user_id in self.pending_qr_messages:
@@ -40,10 +54,10 @@ class Telegram(
             del self.pending_qr_messages[user_id]
 
         try:
-            if not services.client.is_connected():
-                await services.client.connect()
+            if not client.is_connected():
+                await client.connect()
 
-            me = await services.client.get_me()
+            me = await client.get_me()
             if me:
                 await interaction.followup.send(
                     f"Já está logado como **{me.first_name}** (@{me.username})",
@@ -108,7 +122,7 @@ class Telegram(
 
         async def send_success() -> None:
             await cleanup_qr_message()
-            me = await services.client.get_me()
+            me = await client.get_me()
             await interaction.followup.send(
                 f"Login realizado com sucesso! Logado como **{me.first_name}**",
                 ephemeral=True,
@@ -129,7 +143,7 @@ class Telegram(
         async def run_login() -> None:
             try:
                 await telegram.login(
-                    services.client,
+                    client,
                     qr_callback=send_qr_url,
                     success_callback=send_success,
                     expired_callback=on_qr_expired,
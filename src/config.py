@@ -1,5 +1,7 @@
 import os
 from dataclasses import dataclass
+from pathlib import Path
+from zoneinfo import ZoneInfo
 
 from dotenv import load_dotenv
 
@@ -14,6 +16,27 @@ class Config:
     telegram_api_id: int
     telegram_api_hash: str
     environment: str
+    metrics_host: str
+    metrics_port: int | None
+    loop_stall_threshold: float
+    low_memory: bool
+    health_check_concurrency: int
+    health_check_mode: str
+    telegram_session_mode: str
+    telegram_session_flush_interval: float
+    telegram_sessions: list[str]
+    process_mode: str
+    process_role: str
+    ipc_socket_path: Path
+    discord_sharded: bool
+    discord_shard_count: int | None
+    match_offload_threshold: float
+    match_workers: int
+    dm_user_rate: float
+    dm_user_burst: int
+    dm_global_rate: float
+    dm_state_flush_interval: float
+    quiet_hours_timezone: ZoneInfo
 
     @classmethod
     def from_env(cls) -> Config:
@@ -30,11 +53,93 @@ class Config:
         def get_optional_env(var_name: str, default: str) -> str:
             return os.getenv(var_name, default)
 
+        def get_positive_float_env(var_name: str, default: str) -> float:
+            value = float(get_optional_env(var_name, default))
+            if value <= 0:
+                raise ValueError(
+                    f"{var_name} must be greater than zero, got '{value:g}'."
+                )
+            return value
+
+        metrics_port = get_optional_env("METRICS_PORT", "")
+        # Empty for a single gateway connection, "auto" for Discord's recommended
+        # shard count, or a fixed number of shards
+        discord_shards = get_optional_env("DISCORD_SHARDS", "").strip().lower()
+        if (
+            discord_shards
+            and discord_shards != "auto"
+            and (not discord_shards.isdigit() or int(discord_shards) < 1)
+        ):
+            raise ValueError(
+                "DISCORD_SHARDS must be empty, 'auto' or a positive number of shards, "
+                f"got '{discord_shards}'."
+            )
+        loop_stall_threshold_ms = int(
+            get_optional_env("LOOP_STALL_THRESHOLD_MS", "500")
+        )
+        low_memory = get_optional_env("LOW_MEMORY", "false").lower() in (
+            "true",
+            "1",
+            "yes",
+        )
+
         return cls(
             discord_token=get_required_env("DISCORD_TOKEN"),
             telegram_api_id=int(get_required_env("TELEGRAM_API_ID")),
             telegram_api_hash=get_required_env("TELEGRAM_API_HASH"),
             environment=get_optional_env("ENVIRONMENT", "production"),
+            metrics_host=get_optional_env("METRICS_HOST", "127.0.0.1"),
+            metrics_port=int(metrics_port) if metrics_port else None,
+            loop_stall_threshold=loop_stall_threshold_ms / 1000,
+            low_memory=low_memory,
+            health_check_concurrency=int(
+                get_optional_env("HEALTH_CHECK_CONCURRENCY", "10")
+            ),
+            health_check_mode=get_optional_env("HEALTH_CHECK_MODE", "message").lower(),
+            telegram_session_mode=get_optional_env(
+                "TELEGRAM_SESSION_MODE", "file"
+            ).lower(),
+            telegram_session_flush_interval=float(
+                get_optional_env("TELEGRAM_SESSION_FLUSH_INTERVAL", "60")
+            ),
+            # The first session is the primary account
+            telegram_sessions=list(
+                dict.fromkeys(
+                    name.strip()
+                    for name in get_optional_env("TELEGRAM_SESSIONS", "telegram").split(
+                        ","
+                    )
+                    if name.strip()
+                )
+            )
+            or ["telegram"],
+            process_mode=get_optional_env("PROCESS_MODE", "single").lower(),
+            # Set by the process supervisor on its children in split mode
+            process_role=get_optional_env("PROCESS_ROLE", "").lower(),
+            ipc_socket_path=Path(get_optional_env("IPC_SOCKET_PATH", "forwarder.sock")),
+            discord_sharded=bool(discord_shards),
+            discord_shard_count=None
+            if discord_shards in ("", "auto")
+            else int(discord_shards),
+            match_offload_threshold=float(
+                get_optional_env("MATCH_OFFLOAD_THRESHOLD_MS", "2")
+            )
+            / 1000,
+            # Each worker is a full interpreter, too much for low-memory hosts
+            match_workers=int(
+                get_optional_env("MATCH_WORKERS", "0" if low_memory else "2")
+            ),
+            dm_user_rate=get_positive_float_env("DM_USER_RATE_PER_HOUR", "30") / 3600,
+            dm_user_burst=int(get_optional_env("DM_USER_BURST", "10")),
+            # Well below Discord's global limit of 50 requests per second, which
+            # channel sends and commands share
+            dm_global_rate=get_positive_float_env("DM_GLOBAL_RATE", "5"),
+            dm_state_flush_interval=float(
+                get_optional_env("DM_STATE_FLUSH_INTERVAL", "60")
+            ),
+            quiet_hours_timezone=ZoneInfo(
+                get_optional_env("QUIET_HOURS_TIMEZONE", "America/Sao_Paulo")
+            ),
         )
 
     @property
@@ -0,0 +1,53 @@
+from src.shared.services import services
+
+
+def init_bot_state_table() -> None:
+    """Create the bot_state table if missing."""
+    db = services.database
+
+    # Create bot_state table (generic key/value store for runtime state)
+    if not db.table_exists("bot_state"):
+        create_state_table = """
+            CREATE TABLE bot_state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        db.create_table_if_not_exists(create_state_table)
+
+
+def get_value(key: str) -> str | None:
+    """
+    Get a stored state value.
+
+    Args:
+        key: State key
+
+    Returns:
+        The stored value, or None if the key is not set
+    """
+    db = services.database
+    row = db.fetch_one("SELECT value FROM bot_state WHERE key = ?", (key,))
+    return row["value"] if row else None
+
+
+def set_value(key: str, value: str) -> None:
+    """
+    Store a state value, replacing any previous value.
+
+    Args:
+        key: State key
+        value: Value to store
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    db.execute(
+        """
+        INSERT INTO bot_state (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP
+        """,
+        (key, value),
+    )
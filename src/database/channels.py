@@ -20,9 +20,12 @@ class TelegramChannel:
     username: str
     added_at: str
     forward: bool
+    # Telegram account joined to the channel, None for the primary account
+    account: str | None = None
 
 
-def _init_channel_tables() -> None:
+def init_channel_tables() -> None:
+    """Create the Discord and Telegram channel tables if missing."""
     db = services.database
 
     # Create discord_channels table
@@ -44,14 +47,15 @@ def _init_channel_tables() -> None:
                 channel_id INTEGER NOT NULL UNIQUE,
                 username TEXT NOT NULL UNIQUE,
                 forward BOOLEAN DEFAULT 1,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                account TEXT
             )
         """
         db.create_table_if_not_exists(create_telegram_table)
-
-
-# Initialize tables on module import
-_init_channel_tables()
+    elif not db.column_exists("telegram_channels", "account"):
+        # Channels added before sharding were joined by the primary account,
+        # which NULL stands for
+        db.execute("ALTER TABLE telegram_channels ADD COLUMN account TEXT")
 
 
 def add_discord_channel(channel_id: int) -> None:
@@ -99,6 +103,26 @@ def remove_discord_channel(channel_id: int) -> None:
     db.execute("DELETE FROM discord_channels WHERE channel_id = ?", (channel_id,))
 
 
+def remove_discord_channels(channel_ids: list[int]) -> int:
+    """
+    Remove several Discord channels from the database in a single transaction.
+
+    Args:
+        channel_ids: Discord channel IDs. Unknown IDs are ignored.
+
+    Returns:
+        Number of channels removed
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    return db.execute_many(
+        "DELETE FROM discord_channels WHERE channel_id = ?",
+        [(channel_id,) for channel_id in channel_ids],
+    )
+
+
 def list_discord_channels() -> list[DiscordChannel]:
     """
     Returns:
@@ -112,7 +136,9 @@ def list_discord_channels() -> list[DiscordChannel]:
     return [DiscordChannel(**dict(row)) for row in rows]
 
 
-def add_telegram_channel(channel_id: int, username: str, forward: bool = True) -> None:
+def add_telegram_channel(
+    channel_id: int, username: str, forward: bool = True, account: str | None = None
+) -> None:
     """
     Add a Telegram channel to the database.
 
@@ -120,6 +146,7 @@ def add_telegram_channel(channel_id: int, username: str, forward: bool = True) -
         channel_id: Telegram channel ID
         username: Telegram channel username
         forward: Whether to forward messages from this channel to Discord (default: True)
+        account: Telegram account joined to the channel (default: the primary account)
 
     Raises:
         ChannelAlreadyExistsError: If channel already exists
@@ -129,8 +156,8 @@ def add_telegram_channel(channel_id: int, username: str, forward: bool = True) -
     num_forward = 1 if forward else 0
     try:
         db.execute(
-            "INSERT INTO telegram_channels (channel_id, username, forward) VALUES (?, ?, ?)",
-            (channel_id, username, num_forward),
+            "INSERT INTO telegram_channels (channel_id, username, forward, account) VALUES (?, ?, ?, ?)",
+            (channel_id, username, num_forward, account),
         )
     except sqlite3.IntegrityError:
         raise ChannelAlreadyExistsError(
@@ -138,6 +165,30 @@ def add_telegram_channel(channel_id: int, username: str, forward: bool = True) -
         ) from None
 
 
+def add_telegram_channels(channels: list[tuple[int, str, bool, str | None]]) -> int:
+    """
+    Add several Telegram channels to the database in a single transaction.
+
+    Args:
+        channels: (channel_id, username, forward, account) for each channel.
+            Channels that already exist are skipped.
+
+    Returns:
+        Number of channels added
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    return db.execute_many(
+        "INSERT OR IGNORE INTO telegram_channels (channel_id, username, forward, account) VALUES (?, ?, ?, ?)",
+        [
+            (channel_id, username, 1 if forward else 0, account)
+            for channel_id, username, forward, account in channels
+        ],
+    )
+
+
 def remove_telegram_channel(channel_id: int) -> None:
     """
     Remove a Telegram channel from the database.
@@ -163,6 +214,73 @@ def remove_telegram_channel(channel_id: int) -> None:
     )
 
 
+def remove_telegram_channels(channel_ids: list[int]) -> int:
+    """
+    Remove several Telegram channels from the database in a single transaction.
+
+    Args:
+        channel_ids: Telegram channel IDs. Unknown IDs are ignored.
+
+    Returns:
+        Number of channels removed
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    return db.execute_many(
+        "DELETE FROM telegram_channels WHERE channel_id = ?",
+        [(channel_id,) for channel_id in channel_ids],
+    )
+
+
+def set_telegram_channel_account(channel_id: int, account: str) -> None:
+    """
+    Record which Telegram account is joined to a channel.
+
+    Args:
+        channel_id: Telegram channel ID
+        account: Telegram account (session) name
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    db.execute(
+        "UPDATE telegram_channels SET account = ? WHERE channel_id = ?",
+        (account, channel_id),
+    )
+
+
+def get_telegram_channel(
+    channel_id: int | None = None, username: str | None = None
+) -> TelegramChannel | None:
+    """
+    Find a stored Telegram channel by ID or username (case-insensitive).
+
+    Args:
+        channel_id: Telegram channel ID
+        username: Telegram channel username, used when no ID is given
+
+    Returns:
+        The stored channel, or None if not found
+    """
+    db = services.database
+    query = (
+        "SELECT channel_id, username, added_at, forward, account FROM telegram_channels"
+    )
+    if channel_id is not None:
+        row = db.fetch_one(f"{query} WHERE channel_id = ?", (channel_id,))
+    else:
+        row = db.fetch_one(f"{query} WHERE username = ? COLLATE NOCASE", (username,))
+    if not row:
+        return None
+
+    row_dict = dict(row)
+    row_dict["forward"] = bool(row_dict["forward"])
+    return TelegramChannel(**row_dict)
+
+
 def list_telegram_channels() -> list[TelegramChannel]:
     """
     Returns:
@@ -170,7 +288,7 @@ def list_telegram_channels() -> list[TelegramChannel]:
     """
     db = services.database
     rows = db.fetch_all(
-        "SELECT channel_id, username, added_at, forward FROM telegram_channels ORDER BY added_at DESC"
+        "SELECT channel_id, username, added_at, forward, account FROM telegram_channels ORDER BY added_at DESC"
     )
 
     # SQLite stores BOOLEAN as INTEGER (0/1), convert to bool
@@ -1,8 +1,16 @@
 import sqlite3
-from collections.abc import Generator
+import time
+from collections.abc import Generator, Iterable
 from contextlib import contextmanager
 from pathlib import Path
 
+from src.shared.metrics import metrics
+
+_execute_timings = metrics.db_query_seconds.labels("execute")
+_execute_many_timings = metrics.db_query_seconds.labels("execute_many")
+_fetch_all_timings = metrics.db_query_seconds.labels("fetch_all")
+_fetch_one_timings = metrics.db_query_seconds.labels("fetch_one")
+
 
 class Database:
     """Database management class with proper connection handling."""
@@ -23,17 +31,41 @@ class Database:
         finally:
             conn.close()
 
-    def execute(self, query: str, params: tuple = ()) -> None:
+    def execute(self, query: str, params: tuple = ()) -> int:
         """
         Execute a query that modifies the database.
 
         Args:
             query: SQL query to execute
             params: Query parameters
+
+        Returns:
+            Number of rows modified
+        """
+        started = time.perf_counter()
+        with self.get_connection() as conn:
+            cursor = conn.execute(query, params)
+            conn.commit()
+        _execute_timings.observe(time.perf_counter() - started)
+        return cursor.rowcount
+
+    def execute_many(self, query: str, params_seq: Iterable[tuple]) -> int:
+        """
+        Execute a modifying query once per parameter set, in a single transaction.
+
+        Args:
+            query: SQL query to execute
+            params_seq: Parameters for each execution
+
+        Returns:
+            Total number of rows modified
         """
+        started = time.perf_counter()
         with self.get_connection() as conn:
-            conn.execute(query, params)
+            cursor = conn.executemany(query, params_seq)
             conn.commit()
+        _execute_many_timings.observe(time.perf_counter() - started)
+        return cursor.rowcount
 
     def fetch_all(self, query: str, params: tuple = ()) -> list[sqlite3.Row]:
         """
@@ -46,9 +78,12 @@ class Database:
         Returns:
             List of rows from the query
         """
+        started = time.perf_counter()
         with self.get_connection() as conn:
             cursor = conn.execute(query, params)
-            return cursor.fetchall()
+            rows = cursor.fetchall()
+        _fetch_all_timings.observe(time.perf_counter() - started)
+        return rows
 
     def fetch_one(self, query: str, params: tuple = ()) -> sqlite3.Row | None:
         """
@@ -61,9 +96,12 @@ class Database:
         Returns:
             Single row from the query, or None if no results
         """
+        started = time.perf_counter()
         with self.get_connection() as conn:
             cursor = conn.execute(query, params)
-            return cursor.fetchone()
+            row = cursor.fetchone()
+        _fetch_one_timings.observe(time.perf_counter() - started)
+        return row
 
     def table_exists(self, table_name: str) -> bool:
         """
@@ -82,6 +120,21 @@ class Database:
         result = self.fetch_one(query, (table_name,))
         return result is not None
 
+    def column_exists(self, table_name: str, column_name: str) -> bool:
+        """
+        Check if a table has a column.
+
+        Args:
+            table_name: Name of the table to check
+            column_name: Name of the column to look for
+
+        Returns:
+            True if the column exists, False otherwise
+        """
+        query = "SELECT name FROM pragma_table_info(?) WHERE name=?"
+        result = self.fetch_one(query, (table_name, column_name))
+        return result is not None
+
     def create_table_if_not_exists(self, query: str) -> None:
         """
         Create a table if it doesn't exist.
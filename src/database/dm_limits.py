@@ -0,0 +1,124 @@
+from src.shared.services import services
+
+
+def init_dm_limit_tables() -> None:
+    """Create the reminder DM rate limiting tables if missing."""
+    db = services.database
+
+    # Hours, in the configured time zone, when a user gets no reminder DMs
+    if not db.table_exists("dm_quiet_hours"):
+        create_quiet_hours_table = """
+            CREATE TABLE dm_quiet_hours (
+                user_id INTEGER PRIMARY KEY,
+                start_hour INTEGER NOT NULL,
+                end_hour INTEGER NOT NULL
+            )
+        """
+        db.create_table_if_not_exists(create_quiet_hours_table)
+
+    # Token buckets of users who recently received reminder DMs. Users without
+    # a row have a full bucket.
+    if not db.table_exists("dm_buckets"):
+        create_buckets_table = """
+            CREATE TABLE dm_buckets (
+                user_id INTEGER PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """
+        db.create_table_if_not_exists(create_buckets_table)
+
+
+def set_quiet_hours(user_id: int, start_hour: int, end_hour: int) -> None:
+    """
+    Set the hours when a user gets no reminder DMs, replacing any previous ones.
+
+    Args:
+        user_id: Discord user ID
+        start_hour: First quiet hour (0-23)
+        end_hour: First hour after the quiet hours (0-23), may be before start_hour
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    db.execute(
+        """
+        INSERT INTO dm_quiet_hours (user_id, start_hour, end_hour) VALUES (?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            start_hour = excluded.start_hour,
+            end_hour = excluded.end_hour
+        """,
+        (user_id, start_hour, end_hour),
+    )
+
+
+def clear_quiet_hours(user_id: int) -> bool:
+    """
+    Remove a user's quiet hours.
+
+    Args:
+        user_id: Discord user ID
+
+    Returns:
+        True if the user had quiet hours
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    return db.execute("DELETE FROM dm_quiet_hours WHERE user_id = ?", (user_id,)) > 0
+
+
+def list_quiet_hours() -> dict[int, tuple[int, int]]:
+    """
+    Get the quiet hours of every user who has them.
+
+    Returns:
+        Dictionary mapping user IDs to their (start_hour, end_hour)
+    """
+    db = services.database
+    rows = db.fetch_all("SELECT user_id, start_hour, end_hour FROM dm_quiet_hours")
+    return {row["user_id"]: (row["start_hour"], row["end_hour"]) for row in rows}
+
+
+def load_dm_buckets() -> dict[int, tuple[float, float]]:
+    """
+    Get the stored token buckets.
+
+    Returns:
+        Dictionary mapping user IDs to their (tokens, updated_at) with
+        updated_at as a Unix timestamp
+    """
+    db = services.database
+    rows = db.fetch_all("SELECT user_id, tokens, updated_at FROM dm_buckets")
+    return {row["user_id"]: (row["tokens"], row["updated_at"]) for row in rows}
+
+
+def save_dm_buckets(
+    buckets: list[tuple[int, float, float]], full_user_ids: list[int]
+) -> None:
+    """
+    Store changed token buckets and drop those that refilled.
+
+    Args:
+        buckets: (user_id, tokens, updated_at) of each changed bucket
+        full_user_ids: Users whose bucket is full again
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    db.execute_many(
+        """
+        INSERT INTO dm_buckets (user_id, tokens, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            tokens = excluded.tokens,
+            updated_at = excluded.updated_at
+        """,
+        buckets,
+    )
+    db.execute_many(
+        "DELETE FROM dm_buckets WHERE user_id = ?",
+        [(user_id,) for user_id in full_user_ids],
+    )
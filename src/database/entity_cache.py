@@ -0,0 +1,95 @@
+import time
+from dataclasses import dataclass
+
+from src.shared.services import services
+
+
+@dataclass
+class CachedEntity:
+    entity_id: int
+    access_hash: int
+    username: str | None
+
+
+def init_entity_cache_table() -> None:
+    """Create the telegram_entity_cache table if missing."""
+    db = services.database
+
+    # Resolved Telegram entities, keyed by normalized username or ID
+    if not db.table_exists("telegram_entity_cache"):
+        create_cache_table = """
+            CREATE TABLE telegram_entity_cache (
+                key TEXT PRIMARY KEY,
+                entity_id INTEGER NOT NULL,
+                access_hash INTEGER NOT NULL,
+                username TEXT,
+                resolved_at REAL NOT NULL
+            )
+        """
+        db.create_table_if_not_exists(create_cache_table)
+
+
+def get_cached_entity(key: str, max_age: float) -> CachedEntity | None:
+    """
+    Get a cached entity that was resolved recently enough.
+
+    Args:
+        key: Normalized lookup key
+        max_age: Maximum age of the entry in seconds
+
+    Returns:
+        The cached entity, or None if missing or expired
+    """
+    db = services.database
+    row = db.fetch_one(
+        """
+        SELECT entity_id, access_hash, username FROM telegram_entity_cache
+        WHERE key = ? AND resolved_at >= ?
+        """,
+        (key, time.time() - max_age),
+    )
+    return CachedEntity(**dict(row)) if row else None
+
+
+def store_cached_entity(keys: list[str], entity: CachedEntity) -> None:
+    """
+    Store a resolved entity under every key it can be looked up by.
+
+    Args:
+        keys: Normalized lookup keys
+        entity: Resolved entity
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    resolved_at = time.time()
+    db.execute_many(
+        """
+        INSERT INTO telegram_entity_cache (key, entity_id, access_hash, username, resolved_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            entity_id = excluded.entity_id,
+            access_hash = excluded.access_hash,
+            username = excluded.username,
+            resolved_at = excluded.resolved_at
+        """,
+        [
+            (key, entity.entity_id, entity.access_hash, entity.username, resolved_at)
+            for key in keys
+        ],
+    )
+
+
+def delete_cached_entity(entity_id: int) -> None:
+    """
+    Drop every cached key that resolves to an entity.
+
+    Args:
+        entity_id: Telegram entity ID
+
+    Raises:
+        sqlite3.DatabaseError: If database operation fails
+    """
+    db = services.database
+    db.execute("DELETE FROM telegram_entity_cache WHERE entity_id = ?", (entity_id,))
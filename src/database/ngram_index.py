@@ -0,0 +1,150 @@
+import re
+from collections import Counter
+from collections.abc import Iterable
+from itertools import chain
+
+# Letters and digits, so "iphone," and "iphone" are the same word
+_WORD = re.compile(r"[^\W_]+")
+
+# Trigrams are more selective, bigrams still rule out candidates for short
+# terms, where a few typos can break every trigram
+_GRAM_SIZES = (3, 2)
+
+
+def max_distance(term: str) -> int:
+    """Typos allowed in a fuzzy term: none up to 3 characters, 1 up to 7, then 2."""
+    if len(term) <= 3:
+        return 0
+    return 1 if len(term) <= 7 else 2
+
+
+def _grams(text: str, size: int) -> set[str]:
+    padded = f" {text} "
+    return {padded[start : start + size] for start in range(len(padded) - size + 1)}
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    """
+    Whether a and b are at most `limit` typos apart.
+
+    Typos are insertions, deletions, substitutions and swaps of adjacent
+    characters (optimal string alignment distance).
+    """
+    if abs(len(a) - len(b)) > limit:
+        return False
+    before: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        # Later rows build on these two, so the limit can't be met anymore
+        if min(current) > limit and min(previous) > limit:
+            return False
+        before, previous = previous, current
+    return previous[-1] <= limit
+
+
+class NGramIndex:
+    """
+    Finds fuzzy terms within a few typos of the words of a text.
+
+    A term of N words is compared with every run of N words of the text.
+    Candidates come from an inverted index of the terms' character n-grams:
+    each typo breaks at most n + 1 of them, so a term within k typos of a
+    run shares all but (n + 1)k of its n-grams with it. Each term is indexed
+    by trigrams, or bigrams if that bound leaves no trigram to share. Only
+    candidates passing that count get their edit distance computed, so the
+    cost of a text depends on the terms sharing its n-grams, not on the
+    number of terms.
+    """
+
+    __slots__ = ("_postings", "_unfiltered", "_needed", "_terms", "_limits")
+
+    def __init__(self, terms: Iterable[tuple[int, str]]) -> None:
+        """
+        Args:
+            terms: (term_id, text) for each fuzzy term. Texts are compared by
+                their words only, ignoring punctuation.
+        """
+        # N-gram postings of the terms of each word count, by n
+        self._postings: dict[int, dict[int, dict[str, list[int]]]] = {}
+        # Terms too repetitive for any n-gram count to rule anything out,
+        # e.g. "aaaa", compared with every run of their word count
+        self._unfiltered: dict[int, list[int]] = {}
+        self._needed: dict[int, int] = {}
+        self._terms: dict[int, str] = {}
+        self._limits: dict[int, int] = {}
+
+        for term_id, text in terms:
+            words = _WORD.findall(text)
+            if not words:
+                continue
+            normalized = " ".join(words)
+            self._terms[term_id] = normalized
+            self._limits[term_id] = limit = max_distance(normalized)
+            by_size = self._postings.setdefault(len(words), {})
+            for size in _GRAM_SIZES:
+                grams = _grams(normalized, size)
+                needed = len(grams) - (size + 1) * limit
+                if needed >= 1:
+                    self._needed[term_id] = needed
+                    postings = by_size.setdefault(size, {})
+                    for gram in grams:
+                        postings.setdefault(gram, []).append(term_id)
+                    break
+            else:
+                self._unfiltered.setdefault(len(words), []).append(term_id)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def find(self, text: str) -> set[int]:
+        """
+        Find the terms within their allowed typos of some words of a text.
+
+        Returns:
+            IDs of the terms found
+        """
+        found: set[int] = set()
+        if not self._terms:
+            return found
+
+        words = _WORD.findall(text)
+        checked: set[str] = set()
+        for count, by_size in self._postings.items():
+            unfiltered = self._unfiltered.get(count, [])
+            for start in range(len(words) - count + 1):
+                window = " ".join(words[start : start + count])
+                if window in checked:
+                    continue
+                checked.add(window)
+
+                shared = Counter(
+                    chain.from_iterable(
+                        postings.get(gram, ())
+                        for size, postings in by_size.items()
+                        for gram in _grams(window, size)
+                    )
+                )
+                # Lengths further apart than the typos allowed can't match
+                candidates = [
+                    term_id
+                    for term_id, hits in shared.items()
+                    if hits >= self._needed[term_id]
+                    and abs(len(self._terms[term_id]) - len(window))
+                    <= self._limits[term_id]
+                ]
+                for term_id in chain(candidates, unfiltered):
+                    if term_id not in found and _within_distance(
+                        self._terms[term_id], window, self._limits[term_id]
+                    ):
+                        found.add(term_id)
+        return found
@@ -0,0 +1,293 @@
+"""
+Boolean expressions for reminder texts.
+
+An expression combines terms with AND, OR and NOT, in Portuguese or English
+(`e`/`and`/`&`/`,`, `ou`/`or`/`|`, `nao`/`not`/`!`), with parentheses for
+grouping. Consecutive words form one substring term, like a plain reminder
+text; a "quoted phrase" only matches whole words, and a term after `~`
+also matches words a few typos away. NOT binds tightest, then AND, then
+OR, and operands written next to each other are ANDed:
+
+    (rtx 4070 ou rtx 4080), nao usado
+    ("ps5" | playstation 5) & !controle
+    ~iphone 15 & !capinha
+
+Expressions are parsed once, when added, and stored as JSON. The reminder
+index turns the stored form into a predicate over its own term IDs.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Literal
+
+from src.shared.exceptions import ReminderExpressionError
+from src.shared.utils import sanitize_text
+
+MAX_EXPRESSION_TERMS = 25
+
+_OR_WORDS = frozenset({"ou", "or", "|"})
+_AND_WORDS = frozenset({"e", "and", "&", ","})
+_NOT_WORDS = frozenset({"nao", "not", "!"})
+_SYMBOLS = "()|&,!~"
+
+# Anywhere in the message, whole words only, or words within a few typos
+type MatchMode = Literal["substring", "word", "fuzzy"]
+
+
+@dataclass(frozen=True, slots=True)
+class Term:
+    text: str
+    mode: MatchMode = "substring"
+
+
+@dataclass(frozen=True, slots=True)
+class Not:
+    operand: Expression
+
+
+@dataclass(frozen=True, slots=True)
+class And:
+    operands: tuple[Expression, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Or:
+    operands: tuple[Expression, ...]
+
+
+type Expression = Term | Not | And | Or
+
+
+def _tokenize(source: str) -> list[tuple[str, str]]:
+    """Split a sanitized source into (kind, value) tokens."""
+    tokens: list[tuple[str, str]] = []
+    position = 0
+    while position < len(source):
+        char = source[position]
+        if char == " ":
+            position += 1
+        elif char == '"':
+            end = source.find('"', position + 1)
+            if end == -1:
+                raise ReminderExpressionError("Unterminated quoted phrase")
+            phrase = source[position + 1 : end].strip()
+            if not phrase:
+                raise ReminderExpressionError("Empty quoted phrase")
+            tokens.append(("phrase", phrase))
+            position = end + 1
+        elif char in _SYMBOLS:
+            tokens.append(("symbol", char))
+            position += 1
+        else:
+            end = position
+            while end < len(source) and source[end] not in _SYMBOLS + ' "':
+                end += 1
+            tokens.append(("word", source[position:end]))
+            position = end
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: list[tuple[str, str]]) -> None:
+        self._tokens = tokens
+        self._position = 0
+
+    def _peek(self) -> tuple[str, str] | None:
+        if self._position < len(self._tokens):
+            return self._tokens[self._position]
+        return None
+
+    def _is_operator(self, words: frozenset[str]) -> bool:
+        token = self._peek()
+        return token is not None and token[0] != "phrase" and token[1] in words
+
+    def _starts_operand(self) -> bool:
+        token = self._peek()
+        if token is None or token == ("symbol", ")"):
+            return False
+        return not (self._is_operator(_OR_WORDS) or self._is_operator(_AND_WORDS))
+
+    def parse(self) -> Expression:
+        expression = self._parse_or()
+        token = self._peek()
+        if token is not None:
+            raise ReminderExpressionError(f"Unexpected '{token[1]}'")
+        return expression
+
+    def _parse_or(self) -> Expression:
+        operands = [self._parse_and()]
+        while self._is_operator(_OR_WORDS):
+            self._position += 1
+            operands.append(self._parse_and())
+        return _combine(Or, operands)
+
+    def _parse_and(self) -> Expression:
+        operands = [self._parse_unary()]
+        while True:
+            if self._is_operator(_AND_WORDS):
+                self._position += 1
+            elif not self._starts_operand():
+                break
+            operands.append(self._parse_unary())
+        return _combine(And, operands)
+
+    def _parse_unary(self) -> Expression:
+        if self._is_operator(_NOT_WORDS):
+            self._position += 1
+            return Not(self._parse_unary())
+        return self._parse_atom()
+
+    def _parse_atom(self) -> Expression:
+        token = self._peek()
+        if token is None:
+            raise ReminderExpressionError("Expression ends where a term was expected")
+        kind, value = token
+        if kind == "phrase":
+            self._position += 1
+            return Term(value, "word")
+        if token == ("symbol", "~"):
+            self._position += 1
+            term = self._parse_atom()
+            if not isinstance(term, Term) or term.mode == "fuzzy":
+                raise ReminderExpressionError("'~' must come before a single term")
+            return Term(term.text, "fuzzy")
+        if token == ("symbol", "("):
+            self._position += 1
+            expression = self._parse_or()
+            if self._peek() != ("symbol", ")"):
+                raise ReminderExpressionError("Missing ')'")
+            self._position += 1
+            return expression
+        if kind == "symbol" or value in _OR_WORDS | _AND_WORDS | _NOT_WORDS:
+            raise ReminderExpressionError(f"Expected a term, found '{value}'")
+
+        # Consecutive words are a single substring term
+        words = [value]
+        self._position += 1
+        while (token := self._peek()) is not None and token[0] == "word":
+            if token[1] in _OR_WORDS | _AND_WORDS | _NOT_WORDS:
+                break
+            words.append(token[1])
+            self._position += 1
+        return Term(" ".join(words))
+
+
+def _combine(node: type[And] | type[Or], operands: list[Expression]) -> Expression:
+    if len(operands) == 1:
+        return operands[0]
+    flat: list[Expression] = []
+    for operand in operands:
+        flat.extend(operand.operands if isinstance(operand, node) else [operand])
+    return node(tuple(flat))
+
+
+def evaluate(expression: Expression, present: Callable[[Term], bool]) -> bool:
+    """Evaluate an expression given which of its terms are present."""
+    match expression:
+        case Term():
+            return present(expression)
+        case Not(operand):
+            return not evaluate(operand, present)
+        case And(operands):
+            return all(evaluate(operand, present) for operand in operands)
+        case Or(operands):
+            return any(evaluate(operand, present) for operand in operands)
+
+
+def terms(expression: Expression) -> list[Term]:
+    """All terms of an expression, in order, with repeats."""
+    match expression:
+        case Term():
+            return [expression]
+        case Not(operand):
+            return terms(operand)
+        case And(operands) | Or(operands):
+            return [term for operand in operands for term in terms(operand)]
+
+
+def parse_expression(source: str) -> Expression:
+    """
+    Parse and validate a reminder expression.
+
+    Raises:
+        ReminderExpressionError: If the expression is malformed, has too many
+            terms, or would match messages containing none of its terms
+    """
+    tokens = _tokenize(sanitize_text(source))
+    if not tokens:
+        raise ReminderExpressionError("Empty expression")
+    expression = _Parser(tokens).parse()
+    if len(terms(expression)) > MAX_EXPRESSION_TERMS:
+        raise ReminderExpressionError(
+            f"Expression has more than {MAX_EXPRESSION_TERMS} terms"
+        )
+    # Otherwise it would match (almost) every message, e.g. "nao usado"
+    if evaluate(expression, lambda _: False):
+        raise ReminderExpressionError(
+            "Expression matches messages without any of its terms"
+        )
+    return expression
+
+
+def format_expression(expression: Expression) -> str:
+    """Canonical text of an expression, which parses back to the same expression."""
+    match expression:
+        case Term(text, "word"):
+            return f'"{text}"'
+        case Term(text, "fuzzy"):
+            return f'~"{text}"' if " " in text else f"~{text}"
+        case Term(text):
+            return text
+        case Not(operand):
+            inner = format_expression(operand)
+            return f"!{inner}" if isinstance(operand, (Term, Not)) else f"!({inner})"
+        case And(operands):
+            return " & ".join(
+                f"({format_expression(operand)})"
+                if isinstance(operand, Or)
+                else format_expression(operand)
+                for operand in operands
+            )
+        case Or(operands):
+            return " | ".join(format_expression(operand) for operand in operands)
+
+
+_DATA_KINDS: dict[MatchMode, str] = {
+    "substring": "text",
+    "word": "phrase",
+    "fuzzy": "fuzzy",
+}
+_DATA_MODES = {kind: mode for mode, kind in _DATA_KINDS.items()}
+
+
+def _to_data(expression: Expression) -> list:
+    match expression:
+        case Term(text, mode):
+            return [_DATA_KINDS[mode], text]
+        case Not(operand):
+            return ["not", _to_data(operand)]
+        case And(operands):
+            return ["and", [_to_data(operand) for operand in operands]]
+        case Or(operands):
+            return ["or", [_to_data(operand) for operand in operands]]
+
+
+def _from_data(data: list) -> Expression:
+    kind, value = data
+    if kind in _DATA_MODES:
+        return Term(value, _DATA_MODES[kind])
+    if kind == "not":
+        return Not(_from_data(value))
+    operands = tuple(_from_data(operand) for operand in value)
+    return And(operands) if kind == "and" else Or(operands)
+
+
+def dump_expression(expression: Expression) -> str:
+    """Serialize an expression for the database."""
+    return json.dumps(_to_data(expression), ensure_ascii=False, separators=(",", ":"))
+
+
+def load_expression(stored: str) -> Expression:
+    """Deserialize an expression stored with `dump_expression`."""
+    return _from_data(json.loads(stored))
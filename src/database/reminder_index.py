@@ -0,0 +1,272 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from src.database.ngram_index import NGramIndex
+from src.database.reminder_expression import (
+    And,
+    Expression,
+    MatchMode,
+    Not,
+    Or,
+    Term,
+    load_expression,
+)
+from src.database.term_scanner import TermScanner
+from src.shared.prices import offer_price
+
+# A term ID, or an operator ("&", "|" or "!") over other predicates
+type Predicate = int | tuple[str, tuple[Predicate, ...]]
+
+
+@dataclass(frozen=True, slots=True)
+class ReminderText:
+    # Sanitized text, or the canonical form of an expression
+    text: str
+    # Serialized expression, None for a text that must appear as is
+    expression: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class GroupSource:
+    user_id: int
+    group_name: str
+    texts: tuple[ReminderText, ...]
+    # Only match messages mentioning a price up to this one
+    max_price: float | None = None
+    # Only match messages from these Telegram channels, any channel if empty
+    channel_ids: tuple[int, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedGroup:
+    user_id: int
+    group_name: str
+    predicate: Predicate
+    max_price: float | None
+
+
+def _evaluate(predicate: Predicate, found: set[int]) -> bool:
+    if isinstance(predicate, int):
+        return predicate in found
+    operator, operands = predicate
+    if operator == "&":
+        return all(_evaluate(operand, found) for operand in operands)
+    if operator == "|":
+        return any(_evaluate(operand, found) for operand in operands)
+    return not _evaluate(operands[0], found)
+
+
+def _term_ids(predicate: Predicate) -> Iterable[int]:
+    if isinstance(predicate, int):
+        yield predicate
+    else:
+        for operand in predicate[1]:
+            yield from _term_ids(operand)
+
+
+class _Partition:
+    """Groups matched against the same messages, with scanners over their terms only."""
+
+    __slots__ = ("_scanner", "_fuzzy", "_groups_by_term")
+
+    def __init__(
+        self,
+        terms: list[tuple[str, MatchMode]],
+        groups_by_term: dict[int, list[int]],
+    ) -> None:
+        """
+        Args:
+            terms: (text, mode) of every term, by term ID
+            groups_by_term: Groups of the partition using each of its terms
+        """
+        self._groups_by_term = groups_by_term
+        self._scanner = TermScanner(
+            (term_id, terms[term_id][0], terms[term_id][1] == "word")
+            for term_id in groups_by_term
+            if terms[term_id][1] != "fuzzy"
+        )
+        self._fuzzy = NGramIndex(
+            (term_id, terms[term_id][0])
+            for term_id in groups_by_term
+            if terms[term_id][1] == "fuzzy"
+        )
+
+    def find(self, text_sanitized: str) -> tuple[set[int], set[int]]:
+        """
+        Returns:
+            The terms found in the text, and the groups using any of them
+        """
+        found = self._scanner.find(text_sanitized)
+        found |= self._fuzzy.find(text_sanitized)
+        # A group can only match with one of its terms present: expressions
+        # that match without any are rejected when added
+        candidates: set[int] = set()
+        for term_id in found:
+            candidates.update(self._groups_by_term[term_id])
+        return found, candidates
+
+
+class ReminderIndex:
+    """
+    In-memory snapshot of all reminder groups, built once and reused per message.
+
+    Every distinct substring or whole-word term, from plain texts and
+    expressions alike, goes into one scanner that finds all of them present
+    in a message in a single pass; fuzzy terms go into an n-gram index. Only
+    groups using one of the terms found are then evaluated, so the cost of a
+    message doesn't grow with the number of groups that can't match it.
+
+    Groups for any channel form the global partition, and groups limited to
+    some channels are in a partition per channel instead. A message from a
+    channel is only scanned for the terms of the global partition and of
+    that channel's partition.
+    """
+
+    __slots__ = ("sources", "groups", "_global", "_channels", "user_ids")
+
+    def __init__(self, sources: Iterable[GroupSource]) -> None:
+        """
+        Args:
+            sources: Groups in the order results should be reported. Groups
+                without texts are ignored.
+        """
+        self.sources: list[GroupSource] = []
+        self.groups: list[IndexedGroup] = []
+        term_ids: dict[tuple[str, MatchMode], int] = {}
+        # Groups using each term, for the global partition (None) and for
+        # each channel's partition
+        partitions: dict[int | None, dict[int, list[int]]] = {None: {}}
+
+        def intern(term: Term) -> int:
+            key = (term.text, term.mode)
+            term_id = term_ids.get(key)
+            if term_id is None:
+                term_id = term_ids[key] = len(term_ids)
+            return term_id
+
+        def compile_expression(expression: Expression) -> Predicate:
+            match expression:
+                case Term():
+                    return intern(expression)
+                case Not(operand):
+                    return ("!", (compile_expression(operand),))
+                case And(operands):
+                    return ("&", tuple(map(compile_expression, operands)))
+                case Or(operands):
+                    return ("|", tuple(map(compile_expression, operands)))
+
+        for source in sources:
+            if not source.texts:
+                continue
+            used: set[int] = set()
+            predicates: list[Predicate] = []
+            for text in dict.fromkeys(source.texts):
+                if text.expression is None:
+                    predicate = intern(Term(text.text))
+                else:
+                    predicate = compile_expression(load_expression(text.expression))
+                predicates.append(predicate)
+                used.update(_term_ids(predicate))
+
+            group_index = len(self.groups)
+            self.sources.append(source)
+            self.groups.append(
+                IndexedGroup(
+                    source.user_id,
+                    source.group_name,
+                    predicates[0] if len(predicates) == 1 else ("&", tuple(predicates)),
+                    source.max_price,
+                )
+            )
+            for channel_id in source.channel_ids or (None,):
+                groups_by_term = partitions.setdefault(channel_id, {})
+                for used_id in used:
+                    groups_by_term.setdefault(used_id, []).append(group_index)
+
+        terms = list(term_ids)
+        self._global = _Partition(terms, partitions.pop(None))
+        self._channels = {
+            channel_id: _Partition(terms, groups_by_term)
+            for channel_id, groups_by_term in partitions.items()
+        }
+        self.user_ids: frozenset[int] = frozenset(g.user_id for g in self.groups)
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def match(
+        self, text_sanitized: str, channel_id: int | None = None
+    ) -> dict[int, list[str]]:
+        """
+        Find groups whose texts all match an already sanitized text.
+
+        Groups with a maximum price also need the offer price in the text to
+        be within it. The price is extracted once, and only if such a group
+        matched.
+
+        Args:
+            text_sanitized: Message text, already sanitized
+            channel_id: Telegram channel the message comes from. Groups
+                limited to some channels only match messages from them.
+
+        Returns:
+            Dictionary mapping user IDs to lists of matching group names
+        """
+        partitions = [self._global]
+        if channel_id is not None and channel_id in self._channels:
+            partitions.append(self._channels[channel_id])
+
+        # Each group is in the global partition or in channel partitions, so
+        # it is evaluated at most once
+        matched: list[int] = []
+        for partition in partitions:
+            found, candidates = partition.find(text_sanitized)
+            matched.extend(
+                group_index
+                for group_index in candidates
+                if _evaluate(self.groups[group_index].predicate, found)
+            )
+
+        reminder_by_user: dict[int, list[str]] = {}
+        price: float | None = None
+        price_extracted = False
+        for group_index in sorted(matched):
+            group = self.groups[group_index]
+            if group.max_price is not None:
+                if not price_extracted:
+                    price = offer_price(text_sanitized)
+                    price_extracted = True
+                if price is None or price > group.max_price:
+                    continue
+            reminder_by_user.setdefault(group.user_id, []).append(group.group_name)
+        return reminder_by_user
+
+    def match_many(
+        self,
+        texts_sanitized: list[str],
+        channel_ids: list[int | None] | None = None,
+    ) -> list[dict[int, list[str]]]:
+        """
+        Match several already sanitized texts, matching each distinct text once.
+
+        Args:
+            texts_sanitized: Message texts, already sanitized
+            channel_ids: Channel each message comes from, None for none
+
+        Returns:
+            The matches of each text, in order. Repeated texts get their own copy.
+        """
+        if channel_ids is None:
+            channel_ids = [None] * len(texts_sanitized)
+        seen: dict[tuple[str, int | None], dict[int, list[str]]] = {}
+        results: list[dict[int, list[str]]] = []
+        for key in zip(texts_sanitized, channel_ids, strict=True):
+            matches = seen.get(key)
+            if matches is None:
+                matches = seen[key] = self.match(*key)
+                results.append(matches)
+            else:
+                results.append(
+                    {user_id: list(names) for user_id, names in matches.items()}
+                )
+        return results
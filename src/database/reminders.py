@@ -1,7 +1,18 @@
 import sqlite3
-from dataclasses import dataclass
-
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from src.database.reminder_expression import (
+    MatchMode,
+    Term,
+    dump_expression,
+    format_expression,
+    parse_expression,
+)
+from src.database.reminder_index import GroupSource, ReminderIndex, ReminderText
 from src.shared.exceptions import (
+    ReminderExpressionError,
     ReminderGroupAlreadyExistsError,
     ReminderGroupNotFoundError,
     ReminderLimitReachedError,
@@ -15,15 +26,30 @@ from src.shared.utils import sanitize_text
 class ReminderGroup:
     group_name: str
     texts: list[str]
+    max_price: float | None = None
+    # Usernames of the Telegram channels the group is limited to, or their
+    # IDs if no longer stored. Empty for every channel.
+    channels: list[str] = field(default_factory=list)
 
 
 # Constants
 DEFAULT_GROUP_NAME = "Padrão"
 MAX_GROUPS_PER_USER = 25
 MAX_TEXTS_PER_GROUP = 25
+MAX_CHANNELS_PER_GROUP = 25
 
+# Cached matcher, rebuilt lazily after any change to reminder texts
+_reminder_index: ReminderIndex | None = None
+# Bumped on every invalidation, so an index loaded on a worker thread while
+# reminders changed is used once but never cached
+_index_generation = 0
+_index_lock = threading.Lock()
+# Called on every invalidation, e.g. to tell another process to reload
+_invalidation_listeners: list[Callable[[], None]] = []
 
-def _init_reminders_tables() -> None:
+
+def init_reminders_tables() -> None:
+    """Create reminder tables and triggers, migrating the legacy table if present."""
     db = services.database
 
     # Create reminder_groups table
@@ -35,10 +61,14 @@ def _init_reminders_tables() -> None:
                 group_name TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                max_price REAL,
                 UNIQUE(user_id, group_name)
             )
         """
         db.create_table_if_not_exists(create_groups_table)
+    elif not db.column_exists("reminder_groups", "max_price"):
+        # NULL means no price limit
+        db.execute("ALTER TABLE reminder_groups ADD COLUMN max_price REAL")
 
     # Create reminder_texts table
     if not db.table_exists("reminder_texts"):
@@ -47,11 +77,27 @@ def _init_reminders_tables() -> None:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 group_id INTEGER NOT NULL,
                 text TEXT NOT NULL,
+                expression TEXT,
                 FOREIGN KEY (group_id) REFERENCES reminder_groups(id) ON DELETE CASCADE,
                 UNIQUE(group_id, text)
             )
         """
         db.create_table_if_not_exists(create_texts_table)
+    elif not db.column_exists("reminder_texts", "expression"):
+        # Texts added before expressions are all plain texts, which NULL stands for
+        db.execute("ALTER TABLE reminder_texts ADD COLUMN expression TEXT")
+
+    # Create reminder_group_channels table, groups without rows match every channel
+    if not db.table_exists("reminder_group_channels"):
+        create_group_channels_table = """
+            CREATE TABLE reminder_group_channels (
+                group_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                FOREIGN KEY (group_id) REFERENCES reminder_groups(id) ON DELETE CASCADE,
+                PRIMARY KEY (group_id, channel_id)
+            )
+        """
+        db.create_table_if_not_exists(create_group_channels_table)
 
     # Create triggers to auto-update updated_at when texts are added/removed
     _create_update_triggers()
@@ -145,10 +191,6 @@ def _migrate_old_reminders() -> None:
         pass
 
 
-# Initialize tables on module import
-_init_reminders_tables()
-
-
 def _get_group_id(user_id: int, group_name: str) -> int | None:
     """
     Get group ID by user_id and group_name.
@@ -211,7 +253,13 @@ def create_group(user_id: int, group_name: str) -> None:
         ) from None
 
 
-def add_text_to_group(user_id: int, group_name: str, text: str) -> None:
+def add_text_to_group(
+    user_id: int,
+    group_name: str,
+    text: str,
+    expression: bool = False,
+    mode: MatchMode = "substring",
+) -> str:
     """
     Add a text to a reminder group.
 
@@ -219,13 +267,35 @@ def add_text_to_group(user_id: int, group_name: str, text: str) -> None:
         user_id: Discord user ID
         group_name: Name of the group
         text: Text to add to the group
+        expression: Whether the text is an expression combining terms with
+            AND, OR and NOT (see `reminder_expression`)
+        mode: How a plain text matches: anywhere in the message, as whole
+            words, or within a few typos. Expressions set it per term.
+
+    Returns:
+        The text as stored: sanitized, or the canonical form of the expression
 
     Raises:
+        ReminderExpressionError: If the expression is invalid
         ReminderGroupNotFoundError: If group doesn't exist
         ReminderTextExistsError: If text already exists in group
         ReminderLimitReachedError: If group has reached max texts
         sqlite3.DatabaseError: If database operation fails
     """
+    # Parse before touching the database, invalid expressions are never stored
+    stored_expression: str | None = None
+    if expression:
+        parsed = parse_expression(text)
+        stored_text = format_expression(parsed)
+        stored_expression = dump_expression(parsed)
+    elif mode != "substring":
+        # Stored as a single-term expression, shown as `"text"` or `~text`
+        term = Term(sanitize_text(text), mode)
+        stored_text = format_expression(term)
+        stored_expression = dump_expression(term)
+    else:
+        stored_text = sanitize_text(text)
+
     group_id = _get_group_id(user_id, group_name)
     if not group_id:
         raise ReminderGroupNotFoundError(
@@ -244,17 +314,17 @@ def add_text_to_group(user_id: int, group_name: str, text: str) -> None:
             f"Reminder group '{group_name}' has reached the maximum of {MAX_TEXTS_PER_GROUP} texts"
         )
 
-    # Sanitize text before saving
-    sanitized = sanitize_text(text)
     try:
         db.execute(
-            "INSERT INTO reminder_texts (group_id, text) VALUES (?, ?)",
-            (group_id, sanitized),
+            "INSERT INTO reminder_texts (group_id, text, expression) VALUES (?, ?, ?)",
+            (group_id, stored_text, stored_expression),
         )
     except sqlite3.IntegrityError:
         raise ReminderTextExistsError(
             f"Text already exists in reminder group '{group_name}'"
         ) from None
+    invalidate_reminder_index()
+    return stored_text
 
 
 def remove_text_from_group(user_id: int, group_name: str, text: str) -> bool:
@@ -283,10 +353,28 @@ def remove_text_from_group(user_id: int, group_name: str, text: str) -> bool:
 
     # Sanitize text for matching
     sanitized = sanitize_text(text)
-    db.execute(
+    deleted = db.execute(
         "DELETE FROM reminder_texts WHERE group_id = ? AND text = ?",
         (group_id, sanitized),
     )
+    if not deleted:
+        # Expressions can also be given in any form that parses to the stored
+        # one, and texts with a match mode without their `"` or `~`
+        candidates = [
+            format_expression(Term(sanitized, "word")),
+            format_expression(Term(sanitized, "fuzzy")),
+        ]
+        try:
+            candidates.insert(0, format_expression(parse_expression(text)))
+        except ReminderExpressionError:
+            pass
+        for candidate in dict.fromkeys(candidates):
+            if candidate != sanitized and db.execute(
+                "DELETE FROM reminder_texts WHERE group_id = ? AND text = ?",
+                (group_id, candidate),
+            ):
+                break
+    invalidate_reminder_index()
 
     # Check if group is now empty
     remaining_texts = db.fetch_one(
@@ -296,11 +384,91 @@ def remove_text_from_group(user_id: int, group_name: str, text: str) -> bool:
 
     if remaining_texts and remaining_texts["count"] == 0:
         # Group is empty, delete it
-        db.execute("DELETE FROM reminder_groups WHERE id = ?", (group_id,))
+        _delete_group_rows(group_id)
         return True
     return False
 
 
+def _delete_group_rows(group_id: int) -> None:
+    db = services.database
+    # Foreign keys aren't enforced on our connections, so no cascade
+    with db.get_connection() as conn:
+        conn.execute("DELETE FROM reminder_texts WHERE group_id = ?", (group_id,))
+        conn.execute(
+            "DELETE FROM reminder_group_channels WHERE group_id = ?", (group_id,)
+        )
+        conn.execute("DELETE FROM reminder_groups WHERE id = ?", (group_id,))
+        conn.commit()
+
+
+def set_group_max_price(user_id: int, group_name: str, max_price: float | None) -> None:
+    """
+    Set the maximum price of a reminder group.
+
+    Args:
+        user_id: Discord user ID
+        group_name: Name of the group
+        max_price: Highest price, in reais, a message may mention for the
+            group to match, or None to match regardless of price
+
+    Raises:
+        ReminderGroupNotFoundError: If group doesn't exist
+        sqlite3.DatabaseError: If database operation fails
+    """
+    group_id = _get_group_id(user_id, group_name)
+    if not group_id:
+        raise ReminderGroupNotFoundError(
+            f"Reminder group '{group_name}' not found for user {user_id}"
+        )
+
+    db = services.database
+    db.execute(
+        "UPDATE reminder_groups SET max_price = ? WHERE id = ?",
+        (max_price, group_id),
+    )
+    invalidate_reminder_index()
+
+
+def set_group_channels(user_id: int, group_name: str, channel_ids: list[int]) -> None:
+    """
+    Limit a reminder group to messages from some Telegram channels.
+
+    Args:
+        user_id: Discord user ID
+        group_name: Name of the group
+        channel_ids: Telegram channel IDs, or an empty list to match messages
+            from every channel again
+
+    Raises:
+        ReminderGroupNotFoundError: If group doesn't exist
+        ReminderLimitReachedError: If there are more than MAX_CHANNELS_PER_GROUP channels
+        sqlite3.DatabaseError: If database operation fails
+    """
+    group_id = _get_group_id(user_id, group_name)
+    if not group_id:
+        raise ReminderGroupNotFoundError(
+            f"Reminder group '{group_name}' not found for user {user_id}"
+        )
+    channel_ids = list(dict.fromkeys(channel_ids))
+    if len(channel_ids) > MAX_CHANNELS_PER_GROUP:
+        raise ReminderLimitReachedError(
+            f"Reminder groups can be limited to at most {MAX_CHANNELS_PER_GROUP} channels"
+        )
+
+    db = services.database
+    # One transaction, so a failed insert doesn't leave the group unlimited
+    with db.get_connection() as conn:
+        conn.execute(
+            "DELETE FROM reminder_group_channels WHERE group_id = ?", (group_id,)
+        )
+        conn.executemany(
+            "INSERT INTO reminder_group_channels (group_id, channel_id) VALUES (?, ?)",
+            [(group_id, channel_id) for channel_id in channel_ids],
+        )
+        conn.commit()
+    invalidate_reminder_index()
+
+
 def list_groups_by_user(
     user_id: int, group_name: str | None = None
 ) -> list[ReminderGroup]:
@@ -312,13 +480,13 @@ def list_groups_by_user(
         group_name: Optional group name to filter by. If None, returns all groups.
 
     Returns:
-        List of dictionaries with group_name (str) and texts (list[str])
+        List of groups with their group_name, texts, max_price and channels
     """
     db = services.database
     if group_name is not None:
         rows = db.fetch_all(
             """
-            SELECT rg.group_name, rt.text
+            SELECT rg.group_name, rg.max_price, rt.text
             FROM reminder_groups rg
             LEFT JOIN reminder_texts rt ON rg.id = rt.group_id
             WHERE rg.user_id = ? AND rg.group_name = ?
@@ -329,7 +497,7 @@ def list_groups_by_user(
     else:
         rows = db.fetch_all(
             """
-            SELECT rg.group_name, rt.text
+            SELECT rg.group_name, rg.max_price, rt.text
             FROM reminder_groups rg
             LEFT JOIN reminder_texts rt ON rg.id = rt.group_id
             WHERE rg.user_id = ?
@@ -338,19 +506,33 @@ def list_groups_by_user(
             (user_id,),
         )
 
-    groups: dict[str, list[str]] = {}
+    groups: dict[str, ReminderGroup] = {}
     for row in rows:
         group_name = row["group_name"]
         text = row["text"]
         if group_name not in groups:
-            groups[group_name] = []
+            groups[group_name] = ReminderGroup(
+                group_name=group_name, texts=[], max_price=row["max_price"]
+            )
         if text:
-            groups[group_name].append(text)
+            groups[group_name].texts.append(text)
+
+    channel_rows = db.fetch_all(
+        """
+        SELECT rg.group_name, COALESCE(tc.username, rgc.channel_id) AS channel
+        FROM reminder_group_channels rgc
+        JOIN reminder_groups rg ON rg.id = rgc.group_id
+        LEFT JOIN telegram_channels tc ON tc.channel_id = rgc.channel_id
+        WHERE rg.user_id = ?
+        ORDER BY channel
+    """,
+        (user_id,),
+    )
+    for row in channel_rows:
+        if row["group_name"] in groups:
+            groups[row["group_name"]].channels.append(str(row["channel"]))
 
-    result: list[ReminderGroup] = []
-    for name, texts in groups.items():
-        result.append(ReminderGroup(group_name=name, texts=texts))
-    return result
+    return list(groups.values())
 
 
 def delete_group(user_id: int, group_name: str) -> None:
@@ -371,55 +553,119 @@ def delete_group(user_id: int, group_name: str) -> None:
             f"Reminder group '{group_name}' not found for user {user_id}"
         )
 
+    _delete_group_rows(group_id)
+    invalidate_reminder_index()
+
+
+def _load_reminder_index() -> ReminderIndex:
     db = services.database
-    db.execute("DELETE FROM reminder_groups WHERE id = ?", (group_id,))
+    # Single query with JOIN to get all groups with their texts
+    groups_with_texts = db.fetch_all(
+        """
+        SELECT rg.id, rg.user_id, rg.group_name, rg.max_price, rt.text, rt.expression
+        FROM reminder_groups rg
+        LEFT JOIN reminder_texts rt ON rg.id = rt.group_id
+        ORDER BY rg.user_id, rg.id
+    """
+    )
+    channels_by_group: dict[int, list[int]] = {}
+    for row in db.fetch_all(
+        "SELECT group_id, channel_id FROM reminder_group_channels ORDER BY channel_id"
+    ):
+        channels_by_group.setdefault(row["group_id"], []).append(row["channel_id"])
+
+    # Group by group ID, collecting texts
+    groups: dict[int, tuple[sqlite3.Row, list[ReminderText]]] = {}
+    for row in groups_with_texts:
+        _, texts = groups.setdefault(row["id"], (row, []))
+        if row["text"]:
+            texts.append(ReminderText(row["text"], row["expression"]))
+
+    return ReminderIndex(
+        GroupSource(
+            row["user_id"],
+            row["group_name"],
+            tuple(texts),
+            row["max_price"],
+            tuple(channels_by_group.get(group_id, ())),
+        )
+        for group_id, (row, texts) in groups.items()
+    )
 
 
-def find_matching_reminders(text: str) -> dict[int, list[str]]:
+def get_reminder_index() -> ReminderIndex:
+    """
+    Get the reminder matcher, loading it from the database if needed.
+
+    Returns:
+        The current reminder index
+    """
+    global _reminder_index
+    index = _reminder_index
+    if index is None:
+        generation = _index_generation
+        index = _load_reminder_index()
+        with _index_lock:
+            if generation == _index_generation:
+                _reminder_index = index
+    return index
+
+
+def invalidate_reminder_index() -> None:
+    """Drop the cached reminder matcher so the next match reloads it."""
+    global _reminder_index, _index_generation
+    with _index_lock:
+        _index_generation += 1
+        _reminder_index = None
+    for listener in _invalidation_listeners:
+        listener()
+
+
+def add_invalidation_listener(listener: Callable[[], None]) -> None:
+    """
+    Call `listener` whenever the reminder index is invalidated.
+
+    Args:
+        listener: Callback, may be called from a worker thread
+    """
+    _invalidation_listeners.append(listener)
+
+
+def find_matching_reminders(
+    text: str, channel_id: int | None = None
+) -> dict[int, list[str]]:
     """
     Find users whose reminder groups match the given text (all texts in group must match).
 
     Args:
         text: Text to search for reminders in (will be sanitized internally)
+        channel_id: Telegram channel the text comes from, for groups limited
+            to some channels
 
     Returns:
         Dictionary mapping user IDs to lists of matching group names
     """
-    db = services.database
     # Sanitize input text for matching (stored texts are already sanitized)
-    text_sanitized = sanitize_text(text)
+    return get_reminder_index().match(sanitize_text(text), channel_id)
 
-    # Single query with JOIN to get all groups with their texts
-    groups_with_texts = db.fetch_all(
-        """
-        SELECT rg.user_id, rg.group_name, rt.text
-        FROM reminder_groups rg
-        LEFT JOIN reminder_texts rt ON rg.id = rt.group_id
-        ORDER BY rg.user_id, rg.id
+
+def find_matching_reminders_batch(
+    texts: list[str], channel_ids: list[int | None] | None = None
+) -> list[dict[int, list[str]]]:
     """
-    )
+    Find matching reminders for many texts at once, e.g. when catching up.
 
-    # Group by user_id and group_name, collecting texts
-    groups_by_user: dict[int, dict[str, list[str]]] = {}
-    for row in groups_with_texts:
-        user_id = row["user_id"]
-        group_name = row["group_name"]
-        text_val = row["text"]
-
-        if user_id not in groups_by_user:
-            groups_by_user[user_id] = {}
-        if group_name not in groups_by_user[user_id]:
-            groups_by_user[user_id][group_name] = []
-        if text_val:
-            groups_by_user[user_id][group_name].append(text_val)
-
-    # Check which groups have all texts matching
-    reminder_by_user: dict[int, list[str]] = {}
-    for user_id, groups in groups_by_user.items():
-        for group_name, texts in groups.items():
-            if texts and all(text_val in text_sanitized for text_val in texts):
-                if user_id not in reminder_by_user:
-                    reminder_by_user[user_id] = []
-                reminder_by_user[user_id].append(group_name)
-
-    return reminder_by_user
+    The index is loaded once, each distinct text is sanitized once, and each
+    distinct sanitized text is matched once.
+
+    Args:
+        texts: Texts to search for reminders in (will be sanitized internally)
+        channel_ids: Telegram channel each text comes from
+
+    Returns:
+        For each text, in order, a dictionary mapping user IDs to lists of
+        matching group names
+    """
+    index = get_reminder_index()
+    sanitized = {text: sanitize_text(text) for text in dict.fromkeys(texts)}
+    return index.match_many([sanitized[text] for text in texts], channel_ids)
@@ -0,0 +1,19 @@
+from src.database.bot_state import init_bot_state_table
+from src.database.channels import init_channel_tables
+from src.database.dm_limits import init_dm_limit_tables
+from src.database.entity_cache import init_entity_cache_table
+from src.database.reminders import init_reminders_tables
+
+
+def init_database() -> None:
+    """
+    Create and migrate all tables.
+
+    Must run once at startup, before any other database access. Kept out of
+    module import so importing a module never touches the disk.
+    """
+    init_channel_tables()
+    init_reminders_tables()
+    init_bot_state_table()
+    init_entity_cache_table()
+    init_dm_limit_tables()
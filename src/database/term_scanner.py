@@ -0,0 +1,85 @@
+from collections import deque
+from collections.abc import Iterable
+
+
+class TermScanner:
+    """
+    Aho-Corasick automaton finding which of many terms occur in a text.
+
+    The text is read once, character by character, whatever the number of
+    terms. Bounded terms only count where they are whole words, i.e. not
+    preceded or followed by a letter or digit.
+    """
+
+    __slots__ = ("_goto", "_fail", "_outputs", "_lengths", "_bounded", "_empty")
+
+    def __init__(self, terms: Iterable[tuple[int, str, bool]]) -> None:
+        """
+        Args:
+            terms: (term_id, text, bounded) for each term
+        """
+        self._goto: list[dict[str, int]] = [{}]
+        outputs: list[list[int]] = [[]]
+        self._lengths: dict[int, int] = {}
+        self._bounded: dict[int, bool] = {}
+        self._empty: set[int] = set()
+
+        for term_id, text, bounded in terms:
+            self._lengths[term_id] = len(text)
+            self._bounded[term_id] = bounded
+            if not text:
+                # Appears in every text, like `"" in text`
+                self._empty.add(term_id)
+                continue
+            state = 0
+            for char in text:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(term_id)
+
+        # Breadth-first, so every fail target is complete before it is used
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state].extend(outputs[self._fail[next_state]])
+                queue.append(next_state)
+        self._outputs = [tuple(output) for output in outputs]
+
+    def find(self, text: str) -> set[int]:
+        """
+        Find the terms occurring in a text.
+
+        Returns:
+            IDs of the terms found
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        lengths, bounded = self._lengths, self._bounded
+        found = set(self._empty)
+        state = 0
+        last = len(text) - 1
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term_id in outputs[state]:
+                if term_id in found:
+                    continue
+                if bounded[term_id]:
+                    start = position - lengths[term_id] + 1
+                    if (start > 0 and text[start - 1].isalnum()) or (
+                        position < last and text[position + 1].isalnum()
+                    ):
+                        continue
+                found.add(term_id)
+        return found
@@ -1,25 +1,46 @@
+import hashlib
+import json
 import logging
 from contextlib import suppress
+from typing import Any
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.utils import MISSING
 from src.config import config
+from src.database import bot_state
 from src.services.discord.cog_loader import CogLoader
+from src.shared.metrics import metrics
+from src.shared.permissions import TelegramUnavailableError
 
 # Disable warnings about PyNaCl, we don't use it
 discord.VoiceClient.warn_nacl = False
 
 
 class Bot(commands.Bot):
-    def __init__(self) -> None:
-        intents = discord.Intents.default()
-        intents.message_content = True
+    def __init__(self, shard_count: int | None = None) -> None:
+        if config.low_memory:
+            # We only send to channels and DMs and receive slash commands, which
+            # arrive as interactions regardless of intents. Guilds are kept so
+            # channel options and guild counts still resolve from the cache.
+            intents = discord.Intents.none()
+            intents.guilds = True
+            cache_options: dict[str, Any] = {
+                "max_messages": None,
+                "member_cache_flags": discord.MemberCacheFlags.none(),
+                "chunk_guilds_at_startup": False,
+            }
+        else:
+            intents = discord.Intents.default()
+            intents.message_content = True
+            cache_options = {}
 
         super().__init__(
             command_prefix="🝍",
             intents=intents,
+            shard_count=shard_count,
+            **cache_options,
         )
 
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -40,9 +61,25 @@ class Bot(commands.Bot):
         bot = cls()
         await bot.login(token)
         bot._logged_in = True
-        bot.logger.info("Discord bot initialized and logged in")
+        bot.logger.info(
+            "Discord bot initialized and logged in"
+            + (" (low-memory mode)" if config.low_memory else "")
+        )
         return bot
 
+    @property
+    def shard_latencies(self) -> list[tuple[int, float]]:
+        """Heartbeat latency in seconds of each gateway connection, by shard ID."""
+        return [(self.shard_id or 0, self.latency)]
+
+    def _track_shard_latencies(self) -> None:
+        for shard_id, _ in self.shard_latencies:
+            metrics.gateway_latency.labels(shard_id).set_callback(
+                lambda shard_id=shard_id: dict(self.shard_latencies).get(
+                    shard_id, float("inf")
+                )
+            )
+
     async def _send_interaction_message(
         self, interaction: discord.Interaction, message: str, ephemeral: bool = True
     ) -> None:
@@ -73,13 +110,41 @@ class Bot(commands.Bot):
         self._loader = CogLoader(bot=self, hot_reload=config.is_development)
         await self._loader.start()
 
+    def _command_tree_hash(self) -> str:
+        """Stable hash of the payload `tree.sync()` would send to Discord."""
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands()]
+        payload.sort(key=lambda command: (command["type"], command["name"]))
+        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    async def sync_commands(self, force: bool = False) -> int | None:
+        """
+        Sync the command tree with Discord if it changed since the last sync.
+
+        Args:
+            force: Sync even if the stored hash matches the current tree
+
+        Returns:
+            Number of synced commands, or None if the sync was skipped
+        """
+        state_key = f"command_tree_hash:{self.application_id}"
+        tree_hash = self._command_tree_hash()
+        if not force and bot_state.get_value(state_key) == tree_hash:
+            self.logger.info("Command tree unchanged, skipping sync")
+            return None
+
+        synced = await self.tree.sync()
+        bot_state.set_value(state_key, tree_hash)
+        self.logger.info(f"Synced {len(synced)} command(s)")
+        return len(synced)
+
     async def on_ready(self) -> None:
         """Called when the bot is ready."""
         self.logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
         self.logger.info(f"Connected to {len(self.guilds)} guild(s)")
+        self._track_shard_latencies()
 
-        synced = await self.tree.sync()
-        self.logger.info(f"Synced {len(synced)} command(s)")
+        await self.sync_commands()
 
     async def on_command_error(
         self, ctx: commands.Context, error: commands.CommandError
@@ -99,7 +164,13 @@ class Bot(commands.Bot):
         self, interaction: discord.Interaction, error: app_commands.AppCommandError
     ) -> None:
         """Global error handler for slash commands."""
-        if isinstance(
+        if isinstance(error, TelegramUnavailableError):
+            await self._send_interaction_message(
+                interaction,
+                "Comandos do Telegram não estão disponíveis com os processos separados "
+                "(`PROCESS_MODE=split`).",
+            )
+        elif isinstance(
             error, (app_commands.MissingPermissions, app_commands.CheckFailure)
         ):
             await self._send_interaction_message(
@@ -138,3 +209,27 @@ class Bot(commands.Bot):
             reconnect=reconnect,
             log_handler=None,
         )
+
+
+class ShardedBot(Bot, commands.AutoShardedBot):
+    """
+    Bot with one gateway connection per shard, for large guild counts.
+
+    Each shard receives its own part of the guild stream and heartbeats on its
+    own, while the cache, the command tree and sends are shared. Sends go
+    through the HTTP API, so they never depend on which shard owns a channel.
+    """
+
+    def __init__(self) -> None:
+        # None lets Discord recommend the shard count when connecting
+        super().__init__(shard_count=config.discord_shard_count)
+
+    @property
+    def shard_latencies(self) -> list[tuple[int, float]]:
+        return sorted(self.latencies)
+
+    async def on_shard_ready(self, shard_id: int) -> None:
+        guilds = sum(1 for guild in self.guilds if guild.shard_id == shard_id)
+        self.logger.info(
+            f"Shard {shard_id}/{self.shard_count} ready with {guilds} guild(s)"
+        )
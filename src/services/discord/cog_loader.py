@@ -5,6 +5,7 @@ from pathlib import Path
 from watchfiles import Change, awatch
 
 from discord.ext import commands
+from src.shared.timing import startup_timer
 
 
 class CogLoader:
@@ -49,14 +50,19 @@ class CogLoader:
             self.logger.warning(f"Extension directory {dir_name} does not exist")
             return
 
-        self.logger.info("Loading extensions...")
-        for file in self.ext_dir.rglob("*.py"):
-            if file.stem.startswith("_"):
-                continue
-            extension_name = self._get_path_as_extension_name(file)
+        async def load(extension_name: str) -> None:
             await self._load_extension(extension_name)
             self.logger.info(f"Loaded {extension_name}")
 
+        self.logger.info("Loading extensions...")
+        extension_names = [
+            self._get_path_as_extension_name(file)
+            for file in self.ext_dir.rglob("*.py")
+            if not file.stem.startswith("_")
+        ]
+        with startup_timer.phase("cogs"):
+            await asyncio.gather(*(load(name) for name in extension_names))
+
     async def _watch(self) -> None:
         dir_name = self._get_path_as_extension_name(self.ext_dir)
         if not self.ext_dir.is_dir():
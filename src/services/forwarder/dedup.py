@@ -0,0 +1,32 @@
+from collections import OrderedDict
+
+
+class RecentMessages:
+    """
+    Bounded set of the Telegram messages processed most recently.
+
+    With several accounts, two of them are briefly joined to the same channel
+    while it moves between them, and both deliver its messages. Only the first
+    delivery of each (channel, message) pair gets through.
+    """
+
+    CAPACITY: int = 10_000
+
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        self._capacity = capacity
+        self._seen: OrderedDict[tuple[int, int], None] = OrderedDict()
+
+    def add(self, channel_id: int, message_id: int) -> bool:
+        """
+        Remember a message.
+
+        Returns:
+            True if the message is new, False if it was already seen
+        """
+        key = (channel_id, message_id)
+        if key in self._seen:
+            return False
+        self._seen[key] = None
+        if len(self._seen) > self._capacity:
+            self._seen.popitem(last=False)
+        return True
@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class Delivery:
+    """A filtered and matched Telegram message, ready to be sent to Discord."""
+
+    channel_id: int
+    text: str
+    # Whether to send it to the Discord channels, not only to reminder DMs
+    forward: bool
+    # Matched reminder group names, by Discord user ID
+    reminders: dict[int, list[str]] = field(default_factory=dict)
@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import StrEnum
+from zoneinfo import ZoneInfo
+
+from src.database import dm_limits
+from src.services.telegram.scheduler import BucketConfig, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class Verdict(StrEnum):
+    SEND = "send"  # Within the user's budget
+    THROTTLED = "throttled"  # Over budget, the user should be told once
+    RATE_LIMITED = "rate_limited"  # Over budget, the user was already told
+    QUIET_HOURS = "quiet_hours"  # Within the user's quiet hours
+
+
+@dataclass(slots=True)
+class UserBucket:
+    tokens: float
+    # Unix timestamp, so the bucket keeps refilling across restarts
+    updated_at: float
+    # Whether the user was told about the current throttling
+    notified: bool = False
+
+
+def is_quiet(hour: int, start_hour: int, end_hour: int) -> bool:
+    """Whether an hour is within quiet hours, which may wrap around midnight."""
+    if start_hour <= end_hour:
+        return start_hour <= hour < end_hour
+    return hour >= start_hour or hour < end_hour
+
+
+class DMThrottle:
+    """
+    Per-user token buckets and quiet hours for reminder DMs.
+
+    Every user gets `burst` DMs up front and `rate` more per second after
+    that. Checking a DM is a dict lookup and some arithmetic, with no I/O:
+    buckets live in memory and changed ones are written to the database every
+    flush, so a restart doesn't hand every user a full bucket. Users with a
+    full bucket have no entry at all.
+    """
+
+    def __init__(self, rate: float, burst: int, timezone: ZoneInfo) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.timezone = timezone
+        self._buckets: dict[int, UserBucket] = {}
+        self._dirty: set[int] = set()
+        self._quiet_hours: dict[int, tuple[int, int]] = {}
+        # Local hour, recomputed when the next one starts
+        self._hour = 0
+        self._hour_ends_at = 0.0
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+
+    def load(self) -> None:
+        """Load quiet hours and stored buckets. Runs on a thread at warm-up."""
+        self._quiet_hours = dm_limits.list_quiet_hours()
+        for user_id, (tokens, updated_at) in dm_limits.load_dm_buckets().items():
+            # Buckets used since startup are newer
+            self._buckets.setdefault(user_id, UserBucket(tokens, updated_at))
+
+    def set_quiet_hours(self, user_id: int, hours: tuple[int, int] | None) -> None:
+        """Update the in-memory quiet hours of a user after storing them."""
+        if hours is None:
+            self._quiet_hours.pop(user_id, None)
+        else:
+            self._quiet_hours[user_id] = hours
+
+    def _local_hour(self, now: float) -> int:
+        if now >= self._hour_ends_at:
+            local = datetime.fromtimestamp(now, self.timezone)
+            self._hour = local.hour
+            start = local.replace(minute=0, second=0, microsecond=0)
+            self._hour_ends_at = (start + timedelta(hours=1)).timestamp()
+        return self._hour
+
+    def _refill(self, bucket: UserBucket, now: float) -> None:
+        bucket.tokens = min(
+            self.burst, bucket.tokens + max(0.0, now - bucket.updated_at) * self.rate
+        )
+        bucket.updated_at = now
+
+    def admit(self, user_id: int, now: float | None = None) -> Verdict:
+        """
+        Decide whether a user gets a reminder DM, taking a token if so.
+
+        Args:
+            user_id: Discord user ID
+            now: Unix timestamp, defaults to the current time
+
+        Returns:
+            SEND if the DM should be sent. THROTTLED the first time a DM is
+            refused for lack of tokens, so the user can be told, then
+            RATE_LIMITED until a DM goes through again.
+        """
+        now = time.time() if now is None else now
+        hours = self._quiet_hours.get(user_id)
+        if hours is not None and is_quiet(self._local_hour(now), *hours):
+            return Verdict.QUIET_HOURS
+
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = UserBucket(float(self.burst), now)
+        else:
+            self._refill(bucket, now)
+        self._dirty.add(user_id)
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            bucket.notified = False
+            return Verdict.SEND
+        if bucket.notified:
+            return Verdict.RATE_LIMITED
+        bucket.notified = True
+        return Verdict.THROTTLED
+
+    def retry_after(self, user_id: int, now: float | None = None) -> float:
+        """Seconds until a user has a token again, 0 if they have one."""
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            return 0.0
+        now = time.time() if now is None else now
+        tokens = min(
+            self.burst, bucket.tokens + max(0.0, now - bucket.updated_at) * self.rate
+        )
+        return max(0.0, (1 - tokens) / self.rate)
+
+    async def flush(self) -> None:
+        """Store changed buckets, dropping those that refilled in the meantime."""
+        async with self._flush_lock:
+            now = time.time()
+            changed: list[tuple[int, float, float]] = []
+            full: list[int] = []
+            # Snapshot on the loop, write on a thread
+            for user_id, bucket in list(self._buckets.items()):
+                self._refill(bucket, now)
+                if bucket.tokens >= self.burst:
+                    del self._buckets[user_id]
+                    full.append(user_id)
+                elif user_id in self._dirty:
+                    changed.append((user_id, bucket.tokens, bucket.updated_at))
+            dirty, self._dirty = self._dirty, set()
+            if not changed and not full:
+                return
+            try:
+                await asyncio.to_thread(dm_limits.save_dm_buckets, changed, full)
+            except Exception as e:
+                # Retried on the next flush
+                self._dirty |= dirty
+                logger.error(f"Failed to store DM rate limits: {e}", exc_info=e)
+
+    async def _flush_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                # Persistence must go on after an unexpected error
+                logger.error(f"Failed to flush DM rate limits: {e}", exc_info=e)
+
+    def start_flushing(self, interval: float) -> None:
+        """Flush the buckets every `interval` seconds in the background."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically(interval))
+
+    async def stop_flushing(self) -> None:
+        """Stop the periodic flush and write any pending changes."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+
+class FairDMQueue:
+    """
+    Shares the global DM budget fairly among users.
+
+    Each user's DMs wait in their own queue, and users with DMs waiting take
+    turns, one DM each per round, within a global token bucket. A user with a
+    backlog only delays their own DMs: a user with a single DM waits at most
+    one round. Sends run concurrently so a slow one doesn't hold the others.
+    """
+
+    MAX_QUEUED_PER_USER: int = 20
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        send: Callable[[int, str], Awaitable[None]],
+    ) -> None:
+        """
+        Args:
+            rate: DMs per second across all users
+            burst: DMs that can be sent at once after an idle period
+            send: Sends a DM to a user, errors are logged
+        """
+        self._budget = TokenBucket(BucketConfig(rate=rate, burst=burst))
+        self._send = send
+        self._queues: dict[int, deque[str]] = {}
+        self._turns: deque[int] = deque()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._sends: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def put(self, user_id: int, message: str) -> bool:
+        """
+        Queue a DM for a user.
+
+        Returns:
+            False if the user already has MAX_QUEUED_PER_USER DMs waiting and
+            this one was dropped
+        """
+        queue = self._queues.get(user_id)
+        if queue is None:
+            queue = self._queues[user_id] = deque()
+            self._turns.append(user_id)
+        elif len(queue) >= self.MAX_QUEUED_PER_USER:
+            return False
+        queue.append(message)
+        self._wake.set()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            if not self._turns:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            # The next user is picked once the budget allows a send, so users
+            # queued in the meantime get their turn in this round
+            await self._budget.acquire()
+            user_id = self._turns.popleft()
+            queue = self._queues[user_id]
+            message = queue.popleft()
+            if queue:
+                self._turns.append(user_id)
+            else:
+                del self._queues[user_id]
+
+            task = asyncio.create_task(self._send_logged(user_id, message))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _send_logged(self, user_id: int, message: str) -> None:
+        try:
+            await self._send(user_id, message)
+        except Exception as e:
+            logger.warning(f"Failed to send DM to user '{user_id}': {e}")
+
+    def start(self) -> None:
+        """Start sending queued DMs in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sending, dropping queued DMs and cancelling sends in flight."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for task in list(self._sends):
+            task.cancel()
+        self._queues.clear()
+        self._turns.clear()
@@ -1,114 +1,331 @@
 import asyncio
 import logging
+import math
 import re
 import sqlite3
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
 from types import CoroutineType
 
 import discord.errors
-from discord.channel import PartialMessageable
+from discord.channel import DMChannel, PartialMessageable
 from telethon import utils
 from telethon.events import NewMessage
 from telethon.tl.types import Message
 
+from src.config import config
 from src.database import channels as channel_db
 from src.database import reminders
 from src.database.channels import TelegramChannel
-from src.shared.exceptions import ChannelNotFoundError
+from src.services.forwarder.dedup import RecentMessages
+from src.services.forwarder.delivery import Delivery
+from src.services.forwarder.dm_throttle import DMThrottle, FairDMQueue, Verdict
+from src.services.forwarder.health import BreakerState, DestinationHealthTracker
+from src.services.forwarder.liveness import LivenessTracker
+from src.services.forwarder.matching import ReminderMatcher
+from src.shared.metrics import metrics
 from src.shared.services import services
+from src.shared.timing import startup_timer
 from src.shared.utils import format_list_to_markdown
 
 logger = logging.getLogger(__name__)
 
 
 class MessageForwarder:
-    """Service that forwards messages from Telegram to Discord channels."""
+    """
+    Service that forwards messages from Telegram to Discord channels.
 
-    def __init__(self) -> None:
+    Incoming messages are filtered and matched against reminders, then handed
+    to `sink` as a Delivery. By default the sink is `deliver()`, which sends
+    them to Discord in this process; in the split process mode, the ingestion
+    process passes the IPC link instead and the delivery process calls
+    `deliver()` for every delivery it receives.
+    """
+
+    _DM_WARM_UP_CONCURRENCY: int = 10
+    _WARM_UP_BUFFER_SIZE: int = 1000
+
+    def __init__(
+        self, sink: Callable[[Delivery], Awaitable[None]] | None = None
+    ) -> None:
+        self._sink = sink or self.deliver
+        # Without a local sink there's no Discord bot in this process
+        self._delivers_locally = sink is None
         self._discord_channels: set[PartialMessageable] = set()
         self._telegram_channels: dict[int, TelegramChannel] = {}
+        self._dm_channels: dict[int, DMChannel] = {}
         self._event_handlers_registered = False
+        self.health = DestinationHealthTracker()
+        self.matcher = ReminderMatcher(
+            threshold=config.match_offload_threshold, workers=config.match_workers
+        )
+        # Reminder DMs go through the user's bucket, then wait their turn for
+        # the global budget
+        self.throttle = DMThrottle(
+            rate=config.dm_user_rate,
+            burst=config.dm_user_burst,
+            timezone=config.quiet_hours_timezone,
+        )
+        self._dm_queue = FairDMQueue(
+            rate=config.dm_global_rate,
+            burst=max(1, math.ceil(config.dm_global_rate)),
+            send=self._send_dm,
+        )
+        metrics.dm_queued.set_callback(lambda: len(self._dm_queue))
+        metrics.destinations_open.set_callback(
+            lambda: self.health.count(BreakerState.OPEN)
+        )
+        metrics.destinations_disabled.set_callback(
+            lambda: self.health.count(BreakerState.DISABLED)
+        )
+
+        # One tracker per Telegram account, over the channels it's joined to.
+        # Created by start(), only processes receiving from Telegram have them.
+        self.liveness: dict[str, LivenessTracker] = {}
+        # Channels moving between accounts are briefly delivered twice
+        self._recent = RecentMessages()
 
-    def _load_telegram_channels(self) -> None:
-        channels = channel_db.list_telegram_channels()
+        # Messages received before warm-up finishes wait here, in arrival order
+        self._ready = False
+        self._pending_events: deque[NewMessage.Event] = deque()
+        self._dm_warm_up_task: asyncio.Task[None] | None = None
+        metrics.warm_up_buffer.set_callback(lambda: len(self._pending_events))
+
+    def _load_telegram_channels(
+        self, channels: list[TelegramChannel] | None = None
+    ) -> None:
+        if channels is None:
+            channels = channel_db.list_telegram_channels()
         self._telegram_channels.clear()
+        assigned: dict[str, list[int]] = {name: [] for name in self.liveness}
         for channel in channels:
             self._telegram_channels[channel.channel_id] = channel
+            # Only ingesting processes have Telegram accounts and liveness
+            # trackers, the delivery process never sets telegram_accounts
+            if not self.liveness:
+                continue
+            account = services.telegram_accounts.get(channel.account)
+            if account is not None:
+                assigned[account.name].append(channel.channel_id)
+        for name, tracker in self.liveness.items():
+            tracker.track(assigned[name])
 
-    def _load_discord_channels(self) -> None:
+    def _load_discord_channels(
+        self, channels: list[channel_db.DiscordChannel] | None = None
+    ) -> None:
         self._discord_channels.clear()
-        channels = channel_db.list_discord_channels()
+        if channels is None:
+            channels = channel_db.list_discord_channels()
+        # Partial messageables send over HTTP without the guild cache, so they
+        # work the same whichever gateway shard the channel's guild is on
         for channel in channels:
             channel = services.bot.get_partial_messageable(channel.channel_id)
             if channel:
                 self._discord_channels.add(channel)
+        self.health.forget({channel.id for channel in self._discord_channels})
 
     def _filter_message_event(self, event: NewMessage.Event) -> bool:
         message: Message = event.message
+        channel_id, _ = utils.resolve_id(event.chat_id)
+        metrics.messages_received.labels(channel_id).inc()
+        # Recorded before the link filter and deduplication: the watchdog probe
+        # compares with the channel's latest message, whatever it contains,
+        # and every account's stream is alive
+        tracker = self.liveness.get(event.client.account)
+        if tracker is not None:
+            tracker.record(channel_id, message.id, message.date.timestamp())
         if re.search(r"https://", message.message):
             return True
+        metrics.messages_filtered.inc()
         return False
 
     def _format_message(self, message: Message) -> str:
         text = re.sub(r"\n+", "\n", message.message)
         return text
 
-    async def _send_dm_to_user(self, message: str, user_id: int) -> None:
+    async def _send_to_channel(self, channel: PartialMessageable, message: str) -> None:
+        """Send a message to a Discord channel, recording the outcome."""
+        metrics.pending_sends.inc()
+        try:
+            await channel.send(message)
+        except Exception as e:
+            # Connection errors and timeouts count too, or a failed probe
+            # would leave the breaker half-open
+            metrics.send_errors.labels(type(e).__name__).inc()
+            state = self.health.record_failure(channel.id, e)
+            if state is BreakerState.DISABLED:
+                logger.error(
+                    f"Disabled Discord channel '{channel.id}' after repeated failures: {e}"
+                )
+            else:
+                logger.warning(f"Failed to forward to channel '{channel.id}': {e}")
+        else:
+            metrics.channel_messages_sent.inc()
+            self.health.record_success(channel.id)
+        finally:
+            metrics.pending_sends.dec()
+
+    async def _get_dm_channel(self, user_id: int) -> DMChannel:
+        """Get the DM channel for a user, creating and caching it on first use."""
+        channel = self._dm_channels.get(user_id)
+        if channel is None:
+            user = services.bot.get_user(user_id) or await services.bot.fetch_user(
+                user_id
+            )
+            channel = user.dm_channel or await user.create_dm()
+            self._dm_channels[user_id] = channel
+        return channel
+
+    async def _send_dm(self, user_id: int, message: str) -> None:
         """Send a direct message to a Discord user."""
-        user = await services.bot.fetch_user(user_id)
-        await user.send(message)
+        metrics.pending_sends.inc()
+        try:
+            channel = await self._get_dm_channel(user_id)
+            await channel.send(message)
+            metrics.dm_sent.inc()
+        except discord.errors.HTTPException as e:
+            metrics.send_errors.labels(type(e).__name__).inc()
+            raise
+        finally:
+            metrics.pending_sends.dec()
 
     async def _forward_message_handler(self, event: NewMessage.Event) -> None:
         """Handler function for forwarding messages from Telegram to Discord."""
+        channel_id, _ = utils.resolve_id(event.chat_id)
+        if not self._recent.add(channel_id, event.message.id):
+            metrics.messages_duplicate.inc()
+            return
+
+        if not self._ready:
+            # Hot caches aren't loaded yet, hold the message until warm-up finishes
+            if len(self._pending_events) >= self._WARM_UP_BUFFER_SIZE:
+                metrics.warm_up_dropped.inc()
+                logger.warning("Warm-up buffer is full, dropping Telegram message")
+                return
+            self._pending_events.append(event)
+            return
+
+        await self._process_message(event)
+
+    async def _process_message(
+        self, event: NewMessage.Event, matches: dict[int, list[str]] | None = None
+    ) -> None:
+        """
+        Args:
+            event: Incoming Telegram message
+            matches: Reminder matches when already computed, e.g. for a batch
+        """
         message: Message = event.message
-        text_to_channel = self._format_message(message)
 
         # event.chat_id returns a marked ID (e.g., -100123456789), convert to real channel ID
         channel_id, _ = utils.resolve_id(event.chat_id)
-        tasks: list[CoroutineType] = []
 
-        # Check if this channel should forward to Discord
+        # Only forward to Discord channels if channel is in our list and forward is enabled
         telegram_channel = self._telegram_channels.get(channel_id)
-        if telegram_channel and telegram_channel.forward:
-            # Only forward to Discord channels if channel is in our list and forward is enabled
+        delivery = Delivery(
+            channel_id=channel_id,
+            text=self._format_message(message),
+            forward=bool(telegram_channel and telegram_channel.forward),
+            # Always send reminders regardless of forward setting or channel presence
+            reminders=(
+                matches
+                if matches is not None
+                else await self.matcher.match(message.message, channel_id)
+            ),
+        )
+        await self._sink(delivery)
+
+    async def deliver(self, delivery: Delivery) -> None:
+        """Send a delivery to the Discord channels and the users it matched."""
+        tasks: list[CoroutineType] = []
+
+        if delivery.forward:
             for discord_channel in self._discord_channels:
-                if discord_channel:
-                    tasks.append(discord_channel.send(text_to_channel))
+                if not self.health.allow(discord_channel.id):
+                    metrics.destination_skipped.inc()
+                    continue
+                tasks.append(self._send_to_channel(discord_channel, delivery.text))
+            metrics.messages_forwarded.labels(delivery.channel_id).inc()
+            startup_timer.mark("first_forward")
+
+        for user_id, group_names in delivery.reminders.items():
+            metrics.reminder_matches.inc(len(group_names))
+            self._queue_reminder(delivery, user_id, group_names)
+
+        # A failing send must not abort its siblings
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to deliver message: {result}")
 
-        # Always send reminders regardless of forward setting or channel presence
-        reminder_by_user = reminders.find_matching_reminders(message.message)
-        for user_id, group_names in reminder_by_user.items():
+    def _queue_reminder(
+        self, delivery: Delivery, user_id: int, group_names: list[str]
+    ) -> None:
+        """Queue a reminder DM for a user, if their rate limit and quiet hours allow."""
+        verdict = self.throttle.admit(user_id)
+        if verdict is Verdict.SEND:
             markdown_list = format_list_to_markdown(group_names)
-            text_to_user = (
-                text_to_channel
+            message = (
+                delivery.text
                 + f"\n\nVocê me pediu para te lembrar dos grupos:\n{markdown_list}"
             )
-            tasks.append(self._send_dm_to_user(text_to_user, user_id))
+        elif verdict is Verdict.THROTTLED:
+            # Told once per throttling, in place of the reminder
+            metrics.dm_suppressed.labels(Verdict.RATE_LIMITED).inc()
+            minutes = math.ceil(self.throttle.retry_after(user_id) / 60)
+            message = (
+                "Você recebeu muitos lembretes em pouco tempo, então vou pausar "
+                f"seus lembretes por cerca de {minutes} min. Grupos mais "
+                "específicos, com mais textos, geram menos lembretes."
+            )
+        else:
+            metrics.dm_suppressed.labels(verdict).inc()
+            return
 
-        await asyncio.gather(*tasks)
+        if not self._dm_queue.put(user_id, message):
+            metrics.dm_suppressed.labels("queue_full").inc()
 
     def _register_handlers(self) -> None:
-        """Register event handlers for all Telegram channels."""
-        # Get set of channel IDs for event handler
+        """Register event handlers for all Telegram channels on every account."""
+        # Get set of channel IDs for event handler. Every account listens for
+        # all of them: Telegram only sends an account the channels it joined.
         channel_ids = set(self._telegram_channels.keys())
-        event_builder = NewMessage(chats=channel_ids, func=self._filter_message_event)
-        services.client.add_event_handler(self._forward_message_handler, event_builder)
+        for account in services.telegram_accounts:
+            event_builder = NewMessage(
+                chats=channel_ids, func=self._filter_message_event
+            )
+            account.client.add_event_handler(
+                self._forward_message_handler, event_builder
+            )
 
     def _unregister_handlers(self) -> None:
         """Unregister all event handlers for the forwarder."""
-        # Find all handlers registered for our handler function
-        # Since we use the same handler for all channels, we can remove all at once
-        registered_handlers = services.client.list_event_handlers()
+        for account in services.telegram_accounts:
+            client = account.client
+            # Find all handlers registered for our handler function
+            # Since we use the same handler for all channels, we can remove all at once
+            registered_handlers = client.list_event_handlers()
 
-        # Remove all handlers that use our forward_message_handler
-        for callback, event_builder in registered_handlers:
-            if callback == self._forward_message_handler:
-                services.client.remove_event_handler(callback, event_builder)
+            # Remove all handlers that use our forward_message_handler
+            for callback, event_builder in registered_handlers:
+                if callback == self._forward_message_handler:
+                    client.remove_event_handler(callback, event_builder)
 
     def start(self) -> None:
-        """Start forwarding messages."""
+        """
+        Start receiving messages from the monitored Telegram channels.
+
+        Messages are buffered until `warm_up()` finishes loading the hot caches.
+        """
         if self._event_handlers_registered:
             return
 
+        self.liveness = {
+            account.name: LivenessTracker() for account in services.telegram_accounts
+        }
+        # The event filter needs the channel IDs up front
+        self._load_telegram_channels()
         self._register_handlers()
         self._event_handlers_registered = True
 
@@ -116,12 +333,22 @@ class MessageForwarder:
         """Stop forwarding messages."""
         self._unregister_handlers()
         self._event_handlers_registered = False
+        if self._dm_warm_up_task:
+            self._dm_warm_up_task.cancel()
+            self._dm_warm_up_task = None
+
+    async def stop_dms(self) -> None:
+        """Stop sending reminder DMs and store the users' rate limits."""
+        await self._dm_queue.stop()
+        if self._delivers_locally:
+            await self.throttle.stop_flushing()
 
     def reload_channels(self) -> None:
         """Reload channels from database and update event handlers."""
         old_channel_ids = set(self._telegram_channels.keys())
 
-        self._load_discord_channels()
+        if self._delivers_locally:
+            self._load_discord_channels()
         self._load_telegram_channels()
 
         # If handlers are registered and Telegram channels changed, reload handlers
@@ -131,27 +358,177 @@ class MessageForwarder:
             self._unregister_handlers()
             self._register_handlers()
 
-    async def on_bot_ready(self) -> None:
-        self._load_discord_channels()
-        self._load_telegram_channels()
+    async def _warm_up_dm_channels(self, user_ids: frozenset[int]) -> None:
+        semaphore = asyncio.Semaphore(self._DM_WARM_UP_CONCURRENCY)
+
+        async def warm_up(user_id: int) -> None:
+            async with semaphore:
+                try:
+                    await self._get_dm_channel(user_id)
+                except discord.errors.HTTPException as e:
+                    logger.warning(f"Failed to open DM channel with '{user_id}': {e}")
+
+        await asyncio.gather(*(warm_up(user_id) for user_id in user_ids))
 
-        for channel in self._discord_channels:
+    async def _drain_pending_events(self) -> int:
+        """Process buffered messages in arrival order, then open the gate."""
+        drained = 0
+        # Messages arriving while draining are appended and processed in turn
+        while self._pending_events:
+            events = list(self._pending_events)
+            self._pending_events.clear()
             try:
-                await channel.send("Bot online")
-            except discord.errors.Forbidden:
-                logger.warning(
-                    f"Lost access to channel '{channel.id}'. Removing from database."
+                # The whole backlog is matched in one pass, off the loop
+                batch_matches: list[dict[int, list[str]] | None] = list(
+                    await asyncio.to_thread(
+                        reminders.find_matching_reminders_batch,
+                        [event.message.message for event in events],
+                        [utils.resolve_id(event.chat_id)[0] for event in events],
+                    )
                 )
+            except sqlite3.DatabaseError as e:
+                logger.error(f"Failed to match buffered messages: {e}", exc_info=e)
+                batch_matches = [None] * len(events)
+
+            for event, matches in zip(events, batch_matches, strict=True):
                 try:
-                    channel_db.remove_discord_channel(channel.id)
-                except (sqlite3.DatabaseError, ChannelNotFoundError) as e:
-                    logger.error(
-                        f"Failed to remove channel '{channel.id}' from database: {e}",
+                    await self._process_message(event, matches)
+                except Exception as e:
+                    logger.error(f"Failed to process buffered message: {e}", exc_info=e)
+                drained += 1
+        self._ready = True
+        return drained
+
+    async def warm_up(self) -> None:
+        """
+        Load all hot caches, then start processing messages.
+
+        Must be called after `start()`. Channel maps and the reminder matcher are
+        loaded concurrently while incoming messages are buffered. Once they're
+        ready, the buffer is drained in order. DM channels are opened in the
+        background afterwards since DMs can open them lazily.
+        """
+        started = time.perf_counter()
+
+        async def load_discord_channels() -> None:
+            if not self._delivers_locally:
+                return
+            with startup_timer.phase("discord_channel_map"):
+                channels = await asyncio.to_thread(channel_db.list_discord_channels)
+                self._load_discord_channels(channels)
+
+        async def load_reminder_index() -> None:
+            with startup_timer.phase("reminder_index"):
+                await asyncio.to_thread(reminders.get_reminder_index)
+
+        async def load_dm_limits() -> None:
+            if not self._delivers_locally:
+                return
+            with startup_timer.phase("dm_limits"):
+                await asyncio.to_thread(self.throttle.load)
+            self.throttle.start_flushing(config.dm_state_flush_interval)
+            self._dm_queue.start()
+
+        await asyncio.gather(
+            load_discord_channels(), load_reminder_index(), load_dm_limits()
+        )
+
+        buffered = len(self._pending_events)
+        drained = await self._drain_pending_events()
+        duration = time.perf_counter() - started
+        logger.info(
+            f"Forwarder ready after {duration * 1000:.0f}ms warm-up, "
+            f"drained {drained} buffered message(s) ({buffered} at gate opening)"
+        )
+
+        if not self._delivers_locally:
+            return
+        user_ids = reminders.get_reminder_index().user_ids
+        self._dm_warm_up_task = asyncio.create_task(
+            startup_timer.track("dm_channels", self._warm_up_dm_channels(user_ids))
+        )
+
+    def _has_cached_send_permission(self, channel: PartialMessageable) -> bool | None:
+        """
+        Check send permission from cached guild data.
+
+        Returns None when the channel isn't cached and a real send is needed.
+        """
+        guild_channel = services.bot.get_channel(channel.id)
+        if not isinstance(guild_channel, discord.abc.GuildChannel):
+            return None
+        me = guild_channel.guild.me
+        if me is None:
+            return None
+        permissions = guild_channel.permissions_for(me)
+        return permissions.view_channel and permissions.send_messages
+
+    async def _check_channel_health(self, channel: PartialMessageable) -> bool:
+        """
+        Check whether the bot can still post in a channel.
+
+        Returns:
+            False if access was lost and the channel should be removed
+        """
+        if config.health_check_mode == "permissions":
+            can_send = self._has_cached_send_permission(channel)
+            if can_send is not None:
+                return can_send
+
+        try:
+            await channel.send("Bot online")
+        except discord.errors.Forbidden:
+            return False
+        except discord.errors.HTTPException as e:
+            logger.warning(
+                f"Failed to send ready message to channel '{channel.id}': {e}"
+            )
+        return True
+
+    async def _health_sweep(self) -> list[int]:
+        """
+        Check every Discord channel concurrently, bounded by the configured cap.
+
+        Returns:
+            IDs of channels the bot lost access to
+        """
+        semaphore = asyncio.Semaphore(max(1, config.health_check_concurrency))
+
+        async def check(channel: PartialMessageable) -> int | None:
+            async with semaphore:
+                try:
+                    healthy = await self._check_channel_health(channel)
+                except Exception as e:
+                    # Unknown, not lost: keep the channel and finish the sweep
+                    logger.warning(
+                        f"Failed to check health of channel '{channel.id}': {e}",
                         exc_info=e,
                     )
-            except (discord.errors.HTTPException, discord.errors.NotFound) as e:
-                logger.warning(
-                    f"Failed to send ready message to channel '{channel.id}': {e}"
-                )
+                    return None
+            return None if healthy else channel.id
+
+        results = await asyncio.gather(
+            *(check(channel) for channel in self._discord_channels)
+        )
+        return [channel_id for channel_id in results if channel_id is not None]
+
+    async def on_bot_ready(self) -> None:
+        self._load_discord_channels()
+        self._load_telegram_channels()
+
+        with startup_timer.phase("health_sweep"):
+            lost_channel_ids = await self._health_sweep()
+        if not lost_channel_ids:
+            return
+
+        logger.warning(
+            f"Lost access to channel(s) {lost_channel_ids}. Removing from database."
+        )
+        try:
+            await asyncio.to_thread(
+                channel_db.remove_discord_channels, lost_channel_ids
+            )
+        except sqlite3.DatabaseError as e:
+            logger.error(f"Failed to remove channels from database: {e}", exc_info=e)
 
         self._load_discord_channels()
@@ -0,0 +1,122 @@
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+
+
+class BreakerState(StrEnum):
+    CLOSED = "closed"  # Healthy, sends go through
+    OPEN = "open"  # Failing, sends are skipped until the next probe
+    HALF_OPEN = "half_open"  # A single probe send is in flight
+    DISABLED = "disabled"  # Too many failures, skipped until re-enabled
+
+
+@dataclass(slots=True)
+class DestinationHealth:
+    channel_id: int
+    state: BreakerState = BreakerState.CLOSED
+    consecutive_failures: int = 0
+    total_failures: int = 0
+    last_error: str | None = None
+    last_failure_at: float | None = None
+    opened_at: float = 0.0
+    probe_started_at: float = 0.0
+
+
+class DestinationHealthTracker:
+    """
+    Per-destination circuit breakers for Discord channel sends.
+
+    After a few consecutive failures a destination is skipped (open). Once the
+    probe interval passes, the next message is let through as a probe
+    (half-open): success closes the breaker, failure opens it again with a
+    longer interval. Destinations that keep failing are disabled. A probe
+    whose outcome never gets recorded, e.g. because it was cancelled, stops
+    counting after PROBE_TIMEOUT and the next message probes again.
+    """
+
+    OPEN_AFTER_FAILURES: int = 3
+    DISABLE_AFTER_FAILURES: int = 10
+    PROBE_INTERVAL: float = 60.0
+    MAX_PROBE_INTERVAL: float = 1800.0
+    PROBE_TIMEOUT: float = 120.0
+
+    def __init__(self) -> None:
+        self._destinations: dict[int, DestinationHealth] = {}
+
+    def _get(self, channel_id: int) -> DestinationHealth:
+        health = self._destinations.get(channel_id)
+        if health is None:
+            health = self._destinations[channel_id] = DestinationHealth(channel_id)
+        return health
+
+    def _probe_interval(self, health: DestinationHealth) -> float:
+        # Back off exponentially with each failure past the opening threshold
+        exponent = max(0, health.consecutive_failures - self.OPEN_AFTER_FAILURES)
+        return min(self.MAX_PROBE_INTERVAL, self.PROBE_INTERVAL * 2**exponent)
+
+    def allow(self, channel_id: int) -> bool:
+        """Whether a send to this destination should be attempted now."""
+        health = self._destinations.get(channel_id)
+        if health is None or health.state is BreakerState.CLOSED:
+            return True
+        now = time.monotonic()
+        if (
+            health.state is BreakerState.OPEN
+            and now - health.opened_at >= self._probe_interval(health)
+        ) or (
+            health.state is BreakerState.HALF_OPEN
+            and now - health.probe_started_at >= self.PROBE_TIMEOUT
+        ):
+            health.state = BreakerState.HALF_OPEN
+            health.probe_started_at = now
+            return True
+        return False
+
+    def record_success(self, channel_id: int) -> None:
+        health = self._destinations.get(channel_id)
+        if health is not None:
+            health.state = BreakerState.CLOSED
+            health.consecutive_failures = 0
+
+    def record_failure(self, channel_id: int, error: Exception) -> BreakerState:
+        """
+        Record a failed send.
+
+        Returns:
+            The destination's state after the failure
+        """
+        health = self._get(channel_id)
+        health.consecutive_failures += 1
+        health.total_failures += 1
+        health.last_error = f"{type(error).__name__}: {error}"
+        health.last_failure_at = time.time()
+
+        if health.consecutive_failures >= self.DISABLE_AFTER_FAILURES:
+            health.state = BreakerState.DISABLED
+        elif (
+            health.state is BreakerState.HALF_OPEN
+            or health.consecutive_failures >= self.OPEN_AFTER_FAILURES
+        ):
+            health.state = BreakerState.OPEN
+            health.opened_at = time.monotonic()
+        return health.state
+
+    def enable(self, channel_id: int) -> None:
+        """Reset a destination to healthy, e.g. after an admin fixed permissions."""
+        self._destinations.pop(channel_id, None)
+
+    def forget(self, channel_ids: set[int]) -> None:
+        """Drop state for destinations that are no longer configured."""
+        for channel_id in list(self._destinations):
+            if channel_id not in channel_ids:
+                del self._destinations[channel_id]
+
+    def count(self, state: BreakerState) -> int:
+        return sum(1 for h in self._destinations.values() if h.state is state)
+
+    def statuses(self) -> list[DestinationHealth]:
+        """Destinations that failed since startup or re-enabling, unhealthiest first."""
+        return sorted(
+            (h for h in self._destinations.values() if h.total_failures),
+            key=lambda h: (h.state is BreakerState.CLOSED, -h.consecutive_failures),
+        )
@@ -0,0 +1,108 @@
+import heapq
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class ChannelActivity:
+    channel_id: int
+    last_seen: float | None = None  # Monotonic time the last message arrived
+    last_posted_at: float | None = None  # Telegram's timestamp for that message
+    last_message_id: int = 0
+    mean_interval: float | None = None  # Smoothed seconds between posts
+    posts: int = 0
+
+    @property
+    def rate(self) -> float:
+        """Posts per second, 0 until there is an interval to go by."""
+        return 1 / self.mean_interval if self.mean_interval else 0.0
+
+    def overdue(self, now: float) -> float:
+        """How many usual posting intervals have passed since the last message."""
+        if self.last_seen is None or not self.mean_interval:
+            return 0.0
+        return (now - self.last_seen) / self.mean_interval
+
+
+class LivenessTracker:
+    """
+    Posting rate of each monitored channel, to tell a quiet stream from a stalled one.
+
+    Each channel keeps an exponentially weighted mean of the time between its
+    posts, measured with Telegram's timestamps so a burst of caught-up messages
+    doesn't skew it. If every channel is healthy, the number of posts expected
+    during the current silence is the silence times the sum of the channel
+    rates; when that gets high while nothing arrives, the stream is suspect.
+    Recording a message is O(1) and assessing the stream is O(channels).
+    """
+
+    SMOOTHING: float = 0.1
+    MIN_POSTS: int = 5  # Posts seen before a channel's rate is trusted
+    MIN_SILENCE: float = 300.0
+    EXPECTED_POSTS: float = 10.0
+
+    def __init__(self) -> None:
+        self._channels: dict[int, ChannelActivity] = {}
+        self.last_message_at = time.monotonic()
+
+    def track(self, channel_ids: Iterable[int]) -> None:
+        """Set the monitored channels, keeping the history of those still monitored."""
+        channels = {}
+        for channel_id in channel_ids:
+            channels[channel_id] = self._channels.get(channel_id) or ChannelActivity(
+                channel_id
+            )
+        self._channels = channels
+
+    def record(self, channel_id: int, message_id: int, posted_at: float) -> None:
+        """Record a new message from a monitored channel."""
+        activity = self._channels.get(channel_id)
+        if activity is None or message_id <= activity.last_message_id:
+            return
+
+        now = time.monotonic()
+        if activity.last_posted_at is not None:
+            interval = posted_at - activity.last_posted_at
+            if interval > 0:
+                if activity.mean_interval is None:
+                    activity.mean_interval = interval
+                else:
+                    activity.mean_interval += self.SMOOTHING * (
+                        interval - activity.mean_interval
+                    )
+        activity.last_seen = now
+        activity.last_posted_at = posted_at
+        activity.last_message_id = message_id
+        activity.posts += 1
+        self.last_message_at = now
+
+    def heartbeat(self) -> None:
+        """Treat the stream as alive now, e.g. after confirming it is only quiet."""
+        self.last_message_at = time.monotonic()
+
+    def silence(self) -> float:
+        """Seconds since the last message from any monitored channel."""
+        return time.monotonic() - self.last_message_at
+
+    def _trusted(self) -> Iterable[ChannelActivity]:
+        return (a for a in self._channels.values() if a.posts >= self.MIN_POSTS)
+
+    def expected_posts(self) -> float:
+        """Posts a healthy stream would most likely have delivered during the silence."""
+        return self.silence() * sum(a.rate for a in self._trusted())
+
+    def is_suspect(self) -> bool:
+        return (
+            self.silence() >= self.MIN_SILENCE
+            and self.expected_posts() >= self.EXPECTED_POSTS
+        )
+
+    def most_active(self, count: int) -> list[ChannelActivity]:
+        """The trusted channels that post most often."""
+        return heapq.nlargest(count, self._trusted(), key=lambda a: a.rate)
+
+    def statuses(self) -> list[ChannelActivity]:
+        """All monitored channels, most overdue first."""
+        now = time.monotonic()
+        return sorted(self._channels.values(), key=lambda a: -a.overdue(now))
@@ -0,0 +1,93 @@
+"""
+Reminder matching inside the matcher's worker processes.
+
+Each worker keeps its own copy of the reminder groups, by user, at a version.
+Every call carries the version the parent is at plus its latest deltas: the
+worker applies those that follow its own version and rebuilds its index. A
+worker still behind after that (or just started) returns its own version
+and gets called again with the deltas it lacks, or the full snapshot. Kept
+free of services and config so workers start with only what matching needs.
+"""
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from src.database.reminder_index import GroupSource, ReminderIndex
+from src.shared.utils import sanitize_text
+
+# A user's groups in the order the index reports them
+type UserGroups = list[GroupSource]
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotDelta:
+    """Changes from one snapshot version to the next, or a full snapshot."""
+
+    from_version: int
+    to_version: int
+    # Groups of every changed user, an empty list for users without reminders
+    users: dict[int, UserGroups]
+    full: bool = False
+
+
+def group_by_user(index: ReminderIndex) -> dict[int, UserGroups]:
+    """Split an index back into each user's groups."""
+    users: dict[int, UserGroups] = {}
+    for source in index.sources:
+        users.setdefault(source.user_id, []).append(source)
+    return users
+
+
+# Worker process state
+_version = -1
+_users: dict[int, UserGroups] = {}
+_index: ReminderIndex | None = None
+
+
+def _apply(deltas: Iterable[SnapshotDelta]) -> None:
+    global _version, _users, _index
+    changed = False
+    for delta in deltas:
+        if delta.full and delta.to_version > _version:
+            _users = dict(delta.users)
+        elif delta.from_version == _version:
+            for user_id, groups in delta.users.items():
+                if groups:
+                    _users[user_id] = groups
+                else:
+                    _users.pop(user_id, None)
+        else:
+            continue
+        _version = delta.to_version
+        changed = True
+
+    if changed:
+        # Same order as the database load: by user, then by group
+        _index = ReminderIndex(
+            source for user_id in sorted(_users) for source in _users[user_id]
+        )
+
+
+def match_batch(
+    version: int,
+    deltas: list[SnapshotDelta],
+    texts: list[str],
+    channel_ids: list[int | None],
+) -> tuple[list[dict[int, list[str]]], float] | int:
+    """
+    Match raw message texts, from the given channels, against the snapshot at `version`.
+
+    Returns:
+        The matches of each text and the seconds spent matching, or this
+        worker's snapshot version if the deltas don't reach `version` from it
+    """
+    if _version != version:
+        _apply(deltas)
+    if _version != version or _index is None:
+        return _version
+
+    started = time.perf_counter()
+    sanitized = {text: sanitize_text(text) for text in dict.fromkeys(texts)}
+    matches = _index.match_many([sanitized[text] for text in texts], channel_ids)
+    return matches, time.perf_counter() - started
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.database import reminders
+from src.database.reminder_index import ReminderIndex
+from src.services.forwarder.match_worker import (
+    SnapshotDelta,
+    UserGroups,
+    group_by_user,
+    match_batch,
+)
+from src.shared.metrics import metrics
+from src.shared.utils import sanitize_text
+
+logger = logging.getLogger(__name__)
+
+type Matches = dict[int, list[str]]
+
+
+class ReminderMatcher:
+    """
+    Matches messages against reminders on the loop or in a process pool, by cost.
+
+    Matching starts inline, on the matcher's own copy of the reminder index:
+    after a reminder change the new index is loaded on a thread while matches
+    keep using the previous one. The cost of each match is smoothed, and once
+    it goes over `threshold` seconds per message, matching moves to a pool of
+    `workers` processes so the event loop stays responsive. It moves back
+    inline when the cost falls under half the threshold.
+
+    In the pool, messages waiting for a free worker are sent together, up to
+    MAX_BATCH per call. Workers keep their own snapshot of the reminder
+    groups; each call carries the snapshot version and the changes since the
+    previous call. A worker that missed more gets the changes it lacks, out of
+    the last MAX_DELTAS, or the full snapshot, so a reminder change costs one
+    user's groups, not the whole index. With no workers configured, matching
+    always runs inline.
+    """
+
+    MAX_BATCH: int = 64
+    MAX_DELTAS: int = 32
+    SMOOTHING: float = 0.2
+
+    def __init__(self, threshold: float, workers: int) -> None:
+        self.threshold = threshold
+        self.workers = workers
+        self.offloaded = False
+        self._cost = 0.0
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: deque[tuple[str, int | None, asyncio.Future[Matches]]] = deque()
+        self._in_flight = 0
+        self._tasks: set[asyncio.Task[None]] = set()
+
+        # Snapshot matched inline and shipped to the workers
+        self._stale = True
+        self._index: ReminderIndex | None = None
+        self._users: dict[int, UserGroups] = {}
+        self._version = 0
+        self._deltas: deque[SnapshotDelta] = deque(maxlen=self.MAX_DELTAS)
+        # Version the previous pool call carried
+        self._shipped_version = 0
+        self._refresh_lock = asyncio.Lock()
+        reminders.add_invalidation_listener(self._mark_stale)
+
+        metrics.match_offloaded.set_callback(lambda: 1 if self.offloaded else 0)
+
+    def _mark_stale(self) -> None:
+        # May be called from a worker thread, only sets a flag
+        self._stale = True
+
+    def _observe(self, cost: float, mode: str) -> None:
+        """Record the cost of one match in seconds, switching modes if needed."""
+        metrics.match_seconds.labels(mode).observe(cost)
+        self._cost += self.SMOOTHING * (cost - self._cost)
+        if not self.offloaded and self.workers and self._cost > self.threshold:
+            self.offloaded = True
+            logger.info(
+                f"Reminder matching takes {self._cost * 1000:.1f}ms per message, "
+                f"moving it to {self.workers} worker process(es)"
+            )
+        elif self.offloaded and self._cost < self.threshold / 2:
+            self.offloaded = False
+            logger.info(
+                f"Reminder matching takes {self._cost * 1000:.1f}ms per message, "
+                "moving it back to the event loop"
+            )
+
+    async def match(self, text: str, channel_id: int | None = None) -> Matches:
+        """
+        Find users whose reminder groups match a message.
+
+        Args:
+            text: Raw message text, sanitized by the matcher
+            channel_id: Telegram channel the message comes from
+
+        Returns:
+            Dictionary mapping user IDs to lists of matching group names
+        """
+        if not self.offloaded:
+            index = await self._inline_index()
+            started = time.perf_counter()
+            matches = index.match(sanitize_text(text), channel_id)
+            self._observe(time.perf_counter() - started, "inline")
+            return matches
+
+        future: asyncio.Future[Matches] = asyncio.get_running_loop().create_future()
+        self._pending.append((text, channel_id, future))
+        self._dispatch()
+        return await future
+
+    async def _inline_index(self) -> ReminderIndex:
+        """The index to match on the loop, refreshed on a thread after a change."""
+        if self._index is None:
+            await self._refresh()
+        elif self._stale and not self._refresh_lock.locked():
+            # Matches use the previous index until the new one is ready
+            task = asyncio.create_task(self._refresh())
+            self._tasks.add(task)
+            task.add_done_callback(self._refresh_done)
+        assert self._index is not None
+        return self._index
+
+    def _refresh_done(self, task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and (e := task.exception()) is not None:
+            logger.error(f"Failed to refresh the reminder index: {e}", exc_info=e)
+
+    def _dispatch(self) -> None:
+        while self._pending and self._in_flight < self.workers:
+            size = min(self.MAX_BATCH, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(size)]
+            self._in_flight += 1
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self) -> None:
+        """Bring the snapshot up to date with the reminder index."""
+        async with self._refresh_lock:
+            if not self._stale:
+                return
+            # Changes made while loading mark it stale again
+            self._stale = False
+            try:
+                index = await asyncio.to_thread(reminders.get_reminder_index)
+            except BaseException:
+                self._stale = True
+                raise
+            if index is self._index:
+                return
+
+            def diff() -> tuple[dict[int, UserGroups], dict[int, UserGroups]]:
+                users = group_by_user(index)
+                changed = {
+                    user_id: groups
+                    for user_id, groups in users.items()
+                    if self._users.get(user_id) != groups
+                }
+                changed.update(dict.fromkeys(self._users.keys() - users.keys(), []))
+                return users, changed
+
+            users, changed = await asyncio.to_thread(diff)
+            self._deltas.append(
+                SnapshotDelta(self._version, self._version + 1, changed)
+            )
+            self._index = index
+            self._users = users
+            self._version += 1
+
+    async def _match_in_pool(
+        self, texts: list[str], channel_ids: list[int | None]
+    ) -> tuple[list[Matches], float]:
+        # Waits for a refresh already running in another batch
+        await self._refresh()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        pool = self._pool
+
+        loop = asyncio.get_running_loop()
+        version = self._version
+        # Enough for the worker that ran the previous call
+        deltas = self._deltas_since(self._shipped_version)
+        self._shipped_version = version
+        try:
+            result = await loop.run_in_executor(
+                pool, match_batch, version, deltas or [], texts, channel_ids
+            )
+            if isinstance(result, int):
+                # The worker is at an older version, or new if -1. The snapshot
+                # may have moved on in the meantime, match on the latest one.
+                version = self._version
+                deltas = self._deltas_since(result) or [
+                    SnapshotDelta(-1, version, self._users, full=True)
+                ]
+                result = await loop.run_in_executor(
+                    pool, match_batch, version, deltas, texts, channel_ids
+                )
+        except BrokenProcessPool:
+            # Other batches on the same pool fail too, only the first one
+            # shuts it down, never a pool created since
+            if self._pool is pool:
+                logger.error("Reminder matching worker died, restarting the pool")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            raise
+        if isinstance(result, int):
+            raise RuntimeError(f"Worker could not reach snapshot version {version}")
+        return result
+
+    def _deltas_since(self, version: int) -> list[SnapshotDelta] | None:
+        """Deltas from `version` to the current one, None if some were dropped."""
+        deltas = [delta for delta in self._deltas if delta.from_version >= version]
+        if version == self._version:
+            return deltas
+        if not deltas or deltas[0].from_version != version:
+            return None
+        return deltas
+
+    async def _run_batch(
+        self, batch: list[tuple[str, int | None, asyncio.Future[Matches]]]
+    ) -> None:
+        texts = [text for text, _, _ in batch]
+        channel_ids = [channel_id for _, channel_id, _ in batch]
+        metrics.match_batch_size.observe(len(texts))
+        try:
+            try:
+                matches, elapsed = await self._match_in_pool(texts, channel_ids)
+            except BrokenProcessPool:
+                # Matching is expensive right now, keep it off the loop
+                matches = await asyncio.to_thread(
+                    reminders.find_matching_reminders_batch, texts, channel_ids
+                )
+            else:
+                self._observe(elapsed / len(texts), "pool")
+            for (_, _, future), match in zip(batch, matches, strict=True):
+                if not future.done():
+                    future.set_result(match)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._in_flight -= 1
+            self._dispatch()
+
+    def stop(self) -> None:
+        """Stop the worker processes, failing any match still waiting."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        while self._pending:
+            _, _, future = self._pending.popleft()
+            future.cancel()
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Callable
+from contextlib import suppress
+from pathlib import Path
+
+from src.services.forwarder.delivery import Delivery
+from src.services.ipc.protocol import FrameType, encode_delivery, read_frame
+from src.shared.exceptions import ProtocolError
+from src.shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryLink:
+    """
+    Ingestion side of the IPC socket, sending deliveries to the delivery process.
+
+    Deliveries are queued and written by a background task, so Telegram
+    handlers never wait on the socket, and everything queued is written in
+    one go before draining. While the delivery process is down (e.g. being
+    restarted) the link keeps reconnecting and the queue holds the latest
+    QUEUE_SIZE deliveries, dropping the oldest beyond that.
+    """
+
+    QUEUE_SIZE: int = 10_000
+    RECONNECT_DELAY: float = 0.5
+    RECONNECT_DELAY_MAX: float = 10.0
+
+    def __init__(self, path: Path, on_reload_reminders: Callable[[], None]) -> None:
+        self.path = path
+        self._on_reload_reminders = on_reload_reminders
+        self._queue: deque[bytes] = deque()
+        self._pending = asyncio.Event()
+        self.connected = False
+        self._task: asyncio.Task[None] | None = None
+
+        metrics.ipc_queue.set_callback(lambda: len(self._queue))
+        metrics.ipc_connected.set_callback(lambda: 1 if self.connected else 0)
+
+    @classmethod
+    async def create_and_start(
+        cls, path: Path, on_reload_reminders: Callable[[], None]
+    ) -> DeliveryLink:
+        """Create a link and start connecting to the delivery process."""
+        link = cls(path, on_reload_reminders)
+        await link.start()
+        return link
+
+    async def send(self, delivery: Delivery) -> None:
+        """Queue a delivery for the delivery process."""
+        if len(self._queue) >= self.QUEUE_SIZE:
+            self._queue.popleft()
+            metrics.ipc_dropped.inc()
+        self._queue.append(encode_delivery(delivery))
+        self._pending.set()
+
+    async def _write(self, writer: asyncio.StreamWriter) -> None:
+        while True:
+            await self._pending.wait()
+            self._pending.clear()
+            while self._queue:
+                writer.write(self._queue.popleft())
+            await writer.drain()
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            frame_type, _ = await read_frame(reader)
+            if frame_type is FrameType.RELOAD_REMINDERS:
+                self._on_reload_reminders()
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        tasks = [
+            asyncio.create_task(self._write(writer)),
+            asyncio.create_task(self._read(reader)),
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if error := task.exception():
+                    logger.warning(f"Lost connection to the delivery process: {error}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            with suppress(OSError):
+                await writer.wait_closed()
+
+    async def _run(self) -> None:
+        delay = self.RECONNECT_DELAY
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError as e:
+                logger.debug(f"Delivery process not reachable at {self.path}: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.RECONNECT_DELAY_MAX)
+                continue
+
+            delay = self.RECONNECT_DELAY
+            self.connected = True
+            logger.info(f"Connected to the delivery process at {self.path}")
+            # Reminders may have changed while we weren't connected
+            self._on_reload_reminders()
+            self._pending.set()
+            try:
+                await self._serve(reader, writer)
+            except (OSError, ProtocolError, asyncio.IncompleteReadError) as e:
+                logger.warning(f"Lost connection to the delivery process: {e}")
+            finally:
+                self.connected = False
+
+    async def start(self) -> None:
+        """Start connecting and sending in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sending. Deliveries still queued are dropped."""
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._queue:
+            logger.warning(f"Dropping {len(self._queue)} undelivered message(s)")
@@ -0,0 +1,100 @@
+"""
+Binary framing between the ingestion and delivery processes.
+
+Every frame is a 5-byte header (payload length as uint32, frame type as
+uint8) followed by the payload. Integers are big-endian; strings are UTF-8
+prefixed with their byte length. A delivery payload is:
+
+    channel_id int64 | forward uint8 | text uint32+bytes | users uint16
+    then, per user: user_id int64 | groups uint16 | name uint16+bytes ...
+"""
+
+import asyncio
+import struct
+from enum import IntEnum
+
+from src.services.forwarder.delivery import Delivery
+from src.shared.exceptions import ProtocolError
+
+_HEADER = struct.Struct("!IB")
+_DELIVERY = struct.Struct("!qB")
+_USER = struct.Struct("!qH")
+_U32 = struct.Struct("!I")
+_U16 = struct.Struct("!H")
+
+# Far above any Telegram message, keeps a corrupt length from allocating GBs
+MAX_FRAME_SIZE = 1024 * 1024
+
+
+class FrameType(IntEnum):
+    DELIVERY = 1  # Ingestion -> delivery: a message to send
+    RELOAD_REMINDERS = 2  # Delivery -> ingestion: reminders changed
+
+
+def encode_frame(frame_type: FrameType, payload: bytes = b"") -> bytes:
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {len(payload)} bytes is too large")
+    return _HEADER.pack(len(payload), frame_type) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[FrameType, bytes]:
+    """
+    Read the next frame.
+
+    Raises:
+        asyncio.IncompleteReadError: If the connection closed
+        ProtocolError: If the frame is malformed
+    """
+    size, frame_type = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {size} bytes is too large")
+    try:
+        kind = FrameType(frame_type)
+    except ValueError:
+        raise ProtocolError(f"Unknown frame type {frame_type}") from None
+    return kind, await reader.readexactly(size)
+
+
+def encode_delivery(delivery: Delivery) -> bytes:
+    parts = [_DELIVERY.pack(delivery.channel_id, delivery.forward)]
+    text = delivery.text.encode()
+    parts += [_U32.pack(len(text)), text, _U16.pack(len(delivery.reminders))]
+    for user_id, group_names in delivery.reminders.items():
+        parts.append(_USER.pack(user_id, len(group_names)))
+        for name in group_names:
+            encoded = name.encode()
+            parts += [_U16.pack(len(encoded)), encoded]
+    return encode_frame(FrameType.DELIVERY, b"".join(parts))
+
+
+def decode_delivery(payload: bytes) -> Delivery:
+    """
+    Raises:
+        ProtocolError: If the payload is malformed
+    """
+    try:
+        offset = 0
+
+        def take(fmt: struct.Struct) -> tuple:
+            nonlocal offset
+            values = fmt.unpack_from(payload, offset)
+            offset += fmt.size
+            return values
+
+        def take_bytes(length: int) -> str:
+            nonlocal offset
+            if offset + length > len(payload):
+                raise ProtocolError("Truncated string")
+            value = payload[offset : offset + length].decode()
+            offset += length
+            return value
+
+        channel_id, forward = take(_DELIVERY)
+        text = take_bytes(take(_U32)[0])
+        reminders: dict[int, list[str]] = {}
+        for _ in range(take(_U16)[0]):
+            user_id, groups = take(_USER)
+            reminders[user_id] = [take_bytes(take(_U16)[0]) for _ in range(groups)]
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError(f"Malformed delivery frame: {e}") from None
+    return Delivery(channel_id, text, bool(forward), reminders)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from pathlib import Path
+
+from src.services.forwarder.delivery import Delivery
+from src.services.ipc.protocol import (
+    FrameType,
+    decode_delivery,
+    encode_frame,
+    read_frame,
+)
+from src.shared.exceptions import ProtocolError
+from src.shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryServer:
+    """
+    Delivery side of the IPC socket, receiving deliveries from the ingestion process.
+
+    Each delivery is sent to Discord in its own task, like the Telegram
+    handler does in the single process mode, so a slow send never holds up
+    reading the socket.
+    """
+
+    def __init__(
+        self, path: Path, deliver: Callable[[Delivery], Awaitable[None]]
+    ) -> None:
+        self.path = path
+        self._deliver = deliver
+        self._server: asyncio.Server | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @classmethod
+    async def create_and_start(
+        cls, path: Path, deliver: Callable[[Delivery], Awaitable[None]]
+    ) -> DeliveryServer:
+        """
+        Create a delivery server and start listening.
+
+        Raises OSError if the socket can't be created.
+        """
+        server = cls(path, deliver)
+        await server.start()
+        return server
+
+    async def _run_delivery(self, delivery: Delivery) -> None:
+        try:
+            await self._deliver(delivery)
+        except Exception as e:
+            logger.error(f"Failed to deliver message: {e}", exc_info=e)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        logger.info("Ingestion process connected")
+        self._writers.add(writer)
+        try:
+            while True:
+                frame_type, payload = await read_frame(reader)
+                if frame_type is not FrameType.DELIVERY:
+                    continue
+                metrics.ipc_received.inc()
+                task = asyncio.create_task(self._run_delivery(decode_delivery(payload)))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except asyncio.IncompleteReadError:
+            logger.warning("Ingestion process disconnected")
+        except (OSError, ProtocolError) as e:
+            logger.error(f"Dropping connection from the ingestion process: {e}")
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            with suppress(OSError):
+                await writer.wait_closed()
+
+    def _broadcast(self, frame: bytes) -> None:
+        for writer in self._writers:
+            if not writer.is_closing():
+                writer.write(frame)
+
+    def notify_reminders_changed(self) -> None:
+        """Ask the ingestion process to reload reminders. Safe from any thread."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(
+                self._broadcast, encode_frame(FrameType.RELOAD_REMINDERS)
+            )
+
+    async def start(self) -> None:
+        """Start listening on the socket, replacing a stale one."""
+        if self._server is not None:
+            logger.warning("Delivery server is already running")
+            return
+        self._loop = asyncio.get_running_loop()
+        self.path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(
+            self._handle_connection, path=self.path
+        )
+        logger.info(f"Delivery server listening on {self.path}")
+
+    async def stop(self) -> None:
+        """Stop listening and wait for in-flight deliveries."""
+        if self._server:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+            self.path.unlink(missing_ok=True)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from contextlib import suppress
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Delivery first, so the socket is usually listening when ingestion connects
+ROLES = ("delivery", "ingestion")
+
+
+class ProcessSupervisor:
+    """
+    Runs the ingestion and delivery processes and restarts either one on its own.
+
+    Each role runs `script` in a child process with PROCESS_ROLE set. A child
+    that exits is started again after an exponential backoff, which resets
+    once a child has stayed up for STABLE_AFTER seconds. The other child keeps
+    running meanwhile: ingestion queues deliveries until the delivery process
+    is back, and delivery keeps serving commands while ingestion restarts.
+    SIGTERM and SIGINT stop both children.
+    """
+
+    BACKOFF_BASE: float = 1.0
+    BACKOFF_MAX: float = 60.0
+    STABLE_AFTER: float = 60.0
+    STOP_TIMEOUT: float = 15.0
+
+    def __init__(self, script: Path) -> None:
+        self._script = script
+        self._processes: dict[str, asyncio.subprocess.Process] = {}
+        self._stopping = asyncio.Event()
+        self.restarts = dict.fromkeys(ROLES, 0)
+
+    async def _run_role(self, role: str) -> None:
+        attempt = 0
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                str(self._script),
+                env={**os.environ, "PROCESS_ROLE": role},
+            )
+            self._processes[role] = process
+            logger.info(f"Started {role} process (PID {process.pid})")
+            code = await process.wait()
+            if self._stopping.is_set():
+                return
+
+            if time.monotonic() - started >= self.STABLE_AFTER:
+                attempt = 0
+            delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2**attempt)
+            attempt += 1
+            self.restarts[role] += 1
+            logger.error(
+                f"The {role} process exited with code {code}, "
+                f"restarting in {delay:.0f}s"
+            )
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+
+    async def _terminate(self, role: str, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=self.STOP_TIMEOUT)
+        except TimeoutError:
+            logger.warning(f"The {role} process didn't stop in time, killing it")
+            process.kill()
+            await process.wait()
+
+    def stop(self) -> None:
+        """Ask the supervisor to stop both processes."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Run both processes until stop() is called or a signal arrives."""
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self.stop)
+
+        tasks = [asyncio.create_task(self._run_role(role)) for role in ROLES]
+        await self._stopping.wait()
+        logger.info("Stopping ingestion and delivery processes")
+        await asyncio.gather(
+            *(
+                self._terminate(role, process)
+                for role, process in self._processes.items()
+            )
+        )
+        await asyncio.gather(*tasks, return_exceptions=True)
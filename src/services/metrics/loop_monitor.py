@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+
+from src.shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoopStall:
+    """A period in which the event loop did not get back to the monitor in time."""
+
+    started_at: float
+    duration: float
+    task: str | None
+    stacks: list[str] = field(default_factory=list)
+
+
+class LoopMonitor:
+    """
+    Measures event loop scheduling lag and captures stack samples of blocking code.
+
+    A heartbeat coroutine records how late each wake-up is. A daemon thread
+    watches the heartbeat and, when it stops for longer than the threshold,
+    samples the loop thread's stack so the blocking call can be identified.
+    """
+
+    _INTERVAL: float = 0.25
+    _HISTORY_SIZE: int = 2400  # 10 minutes of samples at the default interval
+    _MAX_STACK_SAMPLES: int = 3
+    _MAX_SLOWEST: int = 10
+    # Keeps the watchdog from spinning with a tiny or zero threshold
+    _MIN_POLL: float = 0.01
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self._samples: deque[float] = deque(maxlen=self._HISTORY_SIZE)
+        self._slowest: list[LoopStall] = []
+        self._slowest_lock = threading.Lock()
+        self._last_beat: float = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    @classmethod
+    async def create_and_start(cls, threshold: float) -> LoopMonitor:
+        """Create a loop monitor and start measuring the running loop."""
+        monitor = cls(threshold=threshold)
+        await monitor.start()
+        return monitor
+
+    @property
+    def stalls(self) -> list[LoopStall]:
+        """Slowest stalls seen so far, longest first."""
+        with self._slowest_lock:
+            return list(self._slowest)
+
+    def percentiles(self, *quantiles: float) -> list[float]:
+        """Return lag percentiles (in seconds) over the recent sample window."""
+        ordered = sorted(self._samples)
+        if not ordered:
+            return [0.0 for _ in quantiles]
+        last = len(ordered) - 1
+        return [ordered[min(last, round(q * last))] for q in quantiles]
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self._INTERVAL
+            await asyncio.sleep(self._INTERVAL)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = max(0.0, now - expected)
+            self._samples.append(lag)
+            metrics.event_loop_lag.set(lag)
+
+    def _sample_stack(self) -> str | None:
+        frames = sys._current_frames()
+        frame = frames.get(self._loop_thread_id) if self._loop_thread_id else None
+        if frame is None:
+            return None
+        return "".join(traceback.format_stack(frame))
+
+    def _current_task_name(self) -> str | None:
+        if self._loop is None:
+            return None
+        with suppress(RuntimeError):
+            task = asyncio.current_task(self._loop)
+            if task is not None:
+                return f"{task.get_name()} ({task.get_coro()!r})"
+        return None
+
+    def _record_stall(self, stall: LoopStall) -> None:
+        with self._slowest_lock:
+            self._slowest.append(stall)
+            self._slowest.sort(key=lambda s: s.duration, reverse=True)
+            del self._slowest[self._MAX_SLOWEST :]
+
+        stacks = "\n".join(stall.stacks) or "(no stack captured)"
+        logger.warning(
+            f"Event loop blocked for {stall.duration * 1000:.0f}ms "
+            f"while running {stall.task or 'unknown task'}:\n{stacks}"
+        )
+
+    def _watch(self) -> None:
+        """Runs on the watchdog thread."""
+        poll = max(self.threshold / 2, self._MIN_POLL)
+        stall: LoopStall | None = None
+
+        while not self._stopping.wait(poll):
+            since_beat = time.monotonic() - self._last_beat
+            blocked = since_beat > self.threshold + self._INTERVAL
+
+            if blocked:
+                if stall is None:
+                    stall = LoopStall(
+                        started_at=time.time() - since_beat,
+                        duration=since_beat,
+                        task=self._current_task_name(),
+                    )
+                stall.duration = since_beat
+                if len(stall.stacks) < self._MAX_STACK_SAMPLES:
+                    stack = self._sample_stack()
+                    if stack and stack not in stall.stacks:
+                        stall.stacks.append(stack)
+            elif stall is not None:
+                self._record_stall(stall)
+                stall = None
+
+    async def start(self) -> None:
+        """Start the heartbeat and the watchdog thread."""
+        if self._task is not None:
+            logger.warning("Loop monitor is already running")
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            f"Loop monitor started (stall threshold {self.threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the heartbeat and the watchdog thread."""
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=self.threshold)
+            self._watchdog = None
@@ -0,0 +1,107 @@
+"""
+On-demand CPU and memory profiling of the running process.
+
+Nothing is installed until a capture starts, so there's no overhead outside of
+a capture window. Only one capture runs at a time.
+"""
+
+import asyncio
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+
+from src.shared.exceptions import CaptureInProgressError
+
+_capture_lock = asyncio.Lock()
+
+# Frames from these files are noise in allocation reports
+_IGNORED_ALLOCATION_FILES = ("<frozen importlib._bootstrap>", tracemalloc.__file__)
+
+
+def _header(title: str, seconds: float) -> str:
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
+    return f"{title} - {seconds:.0f}s capture at {timestamp}\n\n"
+
+
+async def profile_cpu(seconds: float, limit: int = 60) -> io.BytesIO:
+    """
+    Profile everything running on the event loop thread for a number of seconds.
+
+    Returns a text report with the top functions sorted by cumulative time,
+    followed by the top functions sorted by internal time.
+
+    Raises CaptureInProgressError if another capture is running.
+    """
+    if _capture_lock.locked():
+        raise CaptureInProgressError("A profiling capture is already running")
+
+    async with _capture_lock:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+
+    output = io.StringIO()
+    output.write(_header("CPU profile", seconds))
+    stats = pstats.Stats(profiler, stream=output)
+    stats.strip_dirs()
+    output.write("=== Sorted by cumulative time ===\n")
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    output.write("\n=== Sorted by internal time ===\n")
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(limit)
+    return io.BytesIO(output.getvalue().encode())
+
+
+async def snapshot_allocations(
+    seconds: float, limit: int = 25, frames: int = 5
+) -> io.BytesIO:
+    """
+    Trace memory allocations for a number of seconds and report the top allocators.
+
+    Returns a text report with the allocation sites holding the most memory at
+    the end of the window, followed by the largest growth during it.
+
+    Raises CaptureInProgressError if another capture is running.
+    """
+    if _capture_lock.locked():
+        raise CaptureInProgressError("A profiling capture is already running")
+
+    async with _capture_lock:
+        # Respect tracing started externally (e.g. PYTHONTRACEMALLOC)
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start(frames)
+        try:
+            start_snapshot = tracemalloc.take_snapshot()
+            await asyncio.sleep(seconds)
+            end_snapshot = tracemalloc.take_snapshot()
+            traced, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not already_tracing:
+                tracemalloc.stop()
+
+    filters = [
+        tracemalloc.Filter(False, filename) for filename in _IGNORED_ALLOCATION_FILES
+    ]
+    start_snapshot = start_snapshot.filter_traces(filters)
+    end_snapshot = end_snapshot.filter_traces(filters)
+
+    output = io.StringIO()
+    output.write(_header("Allocation snapshot", seconds))
+    output.write(f"Traced: {traced / 1024:.1f} KiB, peak: {peak / 1024:.1f} KiB\n\n")
+
+    output.write("=== Top allocations by size ===\n")
+    for index, stat in enumerate(end_snapshot.statistics("traceback")[:limit], 1):
+        output.write(f"#{index}: {stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+        for line in stat.traceback.format(most_recent_first=True):
+            output.write(f"    {line}\n")
+
+    output.write("\n=== Top growth during capture ===\n")
+    for stat in end_snapshot.compare_to(start_snapshot, "lineno")[:limit]:
+        output.write(f"{stat}\n")
+
+    return io.BytesIO(output.getvalue().encode())
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from contextlib import suppress
+
+from src.shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsServer:
+    """Minimal HTTP server exposing metrics in the Prometheus text format."""
+
+    _READ_TIMEOUT: float = 5.0
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+
+    @classmethod
+    async def create_and_start(cls, host: str, port: int) -> MetricsServer:
+        """
+        Create a metrics server and start listening.
+
+        Raises OSError if the address is unavailable.
+        """
+        server = cls(host=host, port=port)
+        await server.start()
+        return server
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request_line = await asyncio.wait_for(
+                reader.readline(), timeout=self._READ_TIMEOUT
+            )
+            # Drain headers, we don't use them
+            while True:
+                line = await asyncio.wait_for(
+                    reader.readline(), timeout=self._READ_TIMEOUT
+                )
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            path = parts[1] if len(parts) >= 2 else ""
+            if len(parts) >= 2 and parts[0] == "GET" and path in ("/", "/metrics"):
+                status = "200 OK"
+                body = metrics.render().encode()
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def start(self) -> None:
+        """Start listening for scrapes."""
+        if self._server is not None:
+            logger.warning("Metrics server is already running")
+            return
+
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        logger.info(f"Metrics server listening on http://{self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Stop listening for scrapes."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            logger.info("Metrics server stopped")
@@ -0,0 +1,361 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import suppress
+from dataclasses import dataclass
+
+import telethon.errors
+from telethon.tl.functions.channels import JoinChannelRequest, LeaveChannelRequest
+from telethon.tl.types import Channel
+
+from src.database import channels as channel_db
+from src.database.channels import TelegramChannel
+from src.services.forwarder.liveness import LivenessTracker
+from src.services.telegram.client import TelegramClient
+from src.services.telegram.sharding import HashRing
+from src.services.telegram.supervisor import ConnectionState, ConnectionSupervisor
+from src.services.telegram.watchdog import LivenessWatchdog
+from src.shared.exceptions import NotAChannelError
+from src.shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TelegramAccount:
+    """A Telegram login used for ingestion and the services watching it."""
+
+    name: str
+    client: TelegramClient
+    supervisor: ConnectionSupervisor | None = None
+    watchdog: LivenessWatchdog | None = None
+
+    @property
+    def connected(self) -> bool:
+        return (
+            self.supervisor is not None
+            and self.supervisor.state is ConnectionState.CONNECTED
+        )
+
+
+class TelegramAccounts:
+    """
+    The Telegram accounts that share the monitored channels.
+
+    One account's update stream and flood limits cap how many channels it can
+    follow, so channels are spread over every available account with a
+    consistent hash ring. The account holding each channel is stored in
+    telegram_channels and is the only one that stays joined to it. When an
+    account logs in, or is gone for longer than ACCOUNT_GRACE, the channels
+    whose owner changed are joined by their new owner and then left by the
+    old one, so no message is lost while they move.
+
+    The first account is the primary one: it serves the Telegram commands and
+    holds the channels stored before sharding (account NULL).
+    """
+
+    REBALANCE_CHECK_INTERVAL: float = 30.0
+    # A short outage shouldn't move every channel of the account
+    ACCOUNT_GRACE: float = 600.0
+
+    def __init__(self, accounts: list[TelegramAccount]) -> None:
+        if not accounts:
+            raise ValueError("At least one Telegram account is required")
+        self._accounts = {account.name: account for account in accounts}
+        self.primary = accounts[0]
+        self._ring = HashRing(self._accounts)
+        self._rebalance_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._on_rebalanced: Callable[[], None] | None = None
+
+    @classmethod
+    async def create_and_connect(
+        cls,
+        names: list[str],
+        api_id: int,
+        api_hash: str,
+        low_memory: bool = False,
+        session_mode: str = "file",
+        session_flush_interval: float = 60.0,
+    ) -> TelegramAccounts:
+        """
+        Create and connect a client for every account, concurrently.
+
+        Raises ValueError if credentials are missing or no account is given.
+        Raises RuntimeError if connection fails.
+        """
+        clients = await asyncio.gather(
+            *(
+                TelegramClient.create_and_connect(
+                    api_id=api_id,
+                    api_hash=api_hash,
+                    low_memory=low_memory,
+                    session_mode=session_mode,
+                    session_flush_interval=session_flush_interval,
+                    account=name,
+                )
+                for name in names
+            )
+        )
+        return cls(
+            [
+                TelegramAccount(name, client)
+                for name, client in zip(names, clients, strict=True)
+            ]
+        )
+
+    def __iter__(self) -> Iterator[TelegramAccount]:
+        return iter(self._accounts.values())
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def get(self, name: str | None) -> TelegramAccount | None:
+        """Get an account by name, None meaning the primary account."""
+        if name is None:
+            return self.primary
+        return self._accounts.get(name)
+
+    def owner_of(self, channel_id: int) -> TelegramAccount:
+        """The account a channel should be joined by."""
+        try:
+            return self._accounts[self._ring.owner(channel_id)]
+        except LookupError:
+            # Nobody is logged in yet
+            return self.primary
+
+    @property
+    def restart_requested(self) -> bool:
+        """Whether a watchdog gave up on its account's update stream."""
+        return any(a.watchdog and a.watchdog.restart_requested for a in self)
+
+    def _available(self) -> frozenset[str]:
+        available = set()
+        for account in self:
+            supervisor = account.supervisor
+            if supervisor is None:
+                continue
+            if supervisor.state is ConnectionState.CONNECTED or (
+                supervisor.state is ConnectionState.RECONNECTING
+                and supervisor.outage < self.ACCOUNT_GRACE
+            ):
+                available.add(account.name)
+        return frozenset(available)
+
+    async def join(self, account: TelegramAccount, username: str) -> Channel:
+        """
+        Join a channel with an account and archive it, unless it's already joined.
+
+        Resolves the channel with the account itself, since access hashes are
+        only valid for the account that received them.
+
+        Returns:
+            The channel entity
+
+        Raises:
+            ValueError: If the channel doesn't exist
+            NotAChannelError: If the username isn't a channel
+            telethon.errors.RPCError: If a request fails
+            TimeoutError: If the scheduler couldn't run a request in time
+        """
+        client = account.client
+        resolved = await client.resolver.resolve(username)
+        channel = await client.resolver.get_channel(resolved)
+        if channel.left:
+            input_channel = resolved.input_channel
+            await client.scheduler.run(
+                "join", lambda: client(JoinChannelRequest(input_channel))
+            )
+            await client.scheduler.run(
+                "folder", lambda: client.edit_folder(resolved.input_peer, 1)
+            )
+        return channel
+
+    async def leave(self, account: TelegramAccount, channel: str | int) -> None:
+        """
+        Leave a channel with an account.
+
+        Args:
+            account: Account joined to the channel
+            channel: Username or ID of the channel
+
+        Raises:
+            ValueError: If the account can't find the channel
+            telethon.errors.RPCError: If the request fails
+            TimeoutError: If the scheduler couldn't run the request in time
+        """
+        client = account.client
+        resolved = await client.resolver.resolve(str(channel))
+        # Leaving a channel we're no longer in is not an error
+        with suppress(telethon.errors.UserNotParticipantError):
+            await client.scheduler.run(
+                "leave", lambda: client(LeaveChannelRequest(resolved.input_channel))
+            )
+
+    async def _move(self, channel: TelegramChannel, owner: TelegramAccount) -> bool:
+        """
+        Hand a channel over to its owner.
+
+        Returns:
+            True if the channel moved from another account
+        """
+        previous = self.get(channel.account)
+        if previous is owner:
+            # Stored before sharding, the primary account is already joined
+            await asyncio.to_thread(
+                channel_db.set_telegram_channel_account, channel.channel_id, owner.name
+            )
+            return False
+
+        try:
+            await self.join(owner, channel.username)
+        except (
+            ValueError,
+            NotAChannelError,
+            telethon.errors.RPCError,
+            ConnectionError,
+            TimeoutError,
+        ) as e:
+            logger.warning(
+                f"Account '{owner.name}' failed to join channel "
+                f"{channel.username}, keeping it on its current account: {e}"
+            )
+            return False
+        await asyncio.to_thread(
+            channel_db.set_telegram_channel_account, channel.channel_id, owner.name
+        )
+
+        # The new owner is already receiving, so the old one can leave. An
+        # account that was removed or is offline stays joined.
+        if previous is not None and previous.connected:
+            try:
+                await self.leave(previous, channel.channel_id)
+            except (
+                ValueError,
+                telethon.errors.RPCError,
+                ConnectionError,
+                TimeoutError,
+            ) as e:
+                logger.warning(
+                    f"Account '{previous.name}' failed to leave channel "
+                    f"{channel.username}: {e}"
+                )
+        return True
+
+    async def rebalance(self) -> int:
+        """
+        Assign every channel to its owner on the ring of the available accounts.
+
+        Returns:
+            Number of channels that moved to another account
+        """
+        async with self._rebalance_lock:
+            available = self._available()
+            if not available:
+                logger.warning("No Telegram account is available, not rebalancing")
+                return 0
+
+            self._ring = HashRing(available)
+            channels = await asyncio.to_thread(channel_db.list_telegram_channels)
+            moved = 0
+            for channel in channels:
+                owner = self.owner_of(channel.channel_id)
+                if channel.account == owner.name:
+                    continue
+                if await self._move(channel, owner):
+                    moved += 1
+
+            counts = dict.fromkeys(self._accounts, 0)
+            for channel in await asyncio.to_thread(channel_db.list_telegram_channels):
+                account = self.get(channel.account)
+                if account is not None:
+                    counts[account.name] += 1
+            for name, count in counts.items():
+                metrics.account_channels.labels(name).set(count)
+
+            if moved:
+                metrics.rebalance_moves.inc(moved)
+                logger.info(
+                    f"Moved {moved} Telegram channel(s) across accounts "
+                    f"{', '.join(sorted(available))}"
+                )
+            if self._on_rebalanced is not None:
+                self._on_rebalanced()
+            return moved
+
+    async def _rebalance_safely(self) -> None:
+        try:
+            await self.rebalance()
+        except Exception as e:
+            # E.g. an RPCError or a failing callback, rebalancing must go on
+            logger.error(f"Telegram account rebalance failed: {e}", exc_info=e)
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.REBALANCE_CHECK_INTERVAL)
+            available = self._available()
+            if available and available != self._ring.accounts:
+                await self._rebalance_safely()
+
+    async def start_supervisors(self) -> None:
+        """Start a connection supervisor for every account."""
+        for account in self:
+            account.supervisor = await ConnectionSupervisor.create_and_start(
+                account.client, account.name
+            )
+
+    async def start_watchdogs(
+        self,
+        trackers: dict[str, LivenessTracker],
+        on_stalled: Callable[[], Awaitable[None]],
+    ) -> None:
+        """Start a liveness watchdog for every account, over its own channels."""
+        for account in self:
+            assert account.supervisor is not None
+            account.watchdog = await LivenessWatchdog.create_and_start(
+                account.client,
+                account.client.scheduler,
+                account.supervisor,
+                trackers[account.name],
+                on_stalled=on_stalled,
+            )
+
+    def start_rebalancing(self, on_rebalanced: Callable[[], None]) -> None:
+        """
+        Rebalance in the background now and whenever the available accounts change.
+
+        Args:
+            on_rebalanced: Called after every rebalance, e.g. to reload assignments
+        """
+        if self._task is not None:
+            return
+        self._on_rebalanced = on_rebalanced
+
+        async def run() -> None:
+            await self._rebalance_safely()
+            await self._watch()
+
+        self._task = asyncio.create_task(run())
+
+    async def stop(self) -> None:
+        """Stop rebalancing and watching. Must run before the clients disconnect."""
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for account in self:
+            if account.watchdog:
+                await account.watchdog.stop()
+            if account.supervisor:
+                await account.supervisor.stop()
+
+    async def disconnect(self) -> None:
+        """Disconnect every client and write in-memory sessions to disk."""
+
+        async def disconnect(account: TelegramAccount) -> None:
+            await account.client.disconnect()
+            # After disconnect, which saves the final update state to the session
+            await account.client.flush_session()
+
+        await asyncio.gather(*(disconnect(account) for account in self))
@@ -2,47 +2,98 @@ import logging
 
 import telethon
 
+from src.services.telegram.resolver import EntityResolver
+from src.services.telegram.scheduler import RequestScheduler
+from src.services.telegram.session import SESSION_NAME, PersistentMemorySession
+
 logger = logging.getLogger(__name__)
 
+# Telethon's default, and a tighter bound for memory-constrained deployments
+DEFAULT_ENTITY_CACHE_LIMIT = 5000
+LOW_MEMORY_ENTITY_CACHE_LIMIT = 500
+
 
 class TelegramClient(telethon.TelegramClient):
     def __init__(
         self,
         api_id: int,
         api_hash: str,
+        entity_cache_limit: int = DEFAULT_ENTITY_CACHE_LIMIT,
+        session: str | telethon.sessions.Session = SESSION_NAME,
+        account: str = SESSION_NAME,
     ) -> None:
-        super().__init__("telegram", api_id, api_hash)
+        super().__init__(
+            session, api_id, api_hash, entity_cache_limit=entity_cache_limit
+        )
         self.api_id = api_id
         self.api_hash = api_hash
+        self.account = account
+        # Paced, FloodWait-aware path for user-triggered requests
+        self.scheduler = RequestScheduler()
+        self.resolver = EntityResolver(
+            self,
+            self.scheduler,
+            cache_prefix="" if account == SESSION_NAME else f"{account}/",
+        )
 
     async def connect(self) -> None:
         await super().connect()
-        logger.info("Telegram client connected")
+        logger.info(f"Telegram client '{self.account}' connected")
 
     async def disconnect(self) -> None:
         await super().disconnect()
-        logger.info("Telegram client disconnected")
+        logger.info(f"Telegram client '{self.account}' disconnected")
+
+    async def flush_session(self) -> None:
+        """Stop flushing an in-memory session and write it to disk, if one is used."""
+        if isinstance(self.session, PersistentMemorySession):
+            await self.session.stop_flushing()
 
     @classmethod
     async def create_and_connect(
         cls,
         api_id: int,
         api_hash: str,
+        low_memory: bool = False,
+        session_mode: str = "file",
+        session_flush_interval: float = 60.0,
+        account: str = SESSION_NAME,
     ) -> TelegramClient:
         """
         Create and connect a Telegram client.
 
+        With session_mode "memory", session state is kept in memory and
+        flushed to disk every session_flush_interval seconds. The session is
+        stored under the account name.
+
         Raises ValueError if credentials are missing.
         Raises RuntimeError if connection fails.
         """
         if not api_id or not api_hash:
             raise ValueError("Telegram API credentials are required")
 
-        client = cls(api_id=api_id, api_hash=api_hash)
+        entity_cache_limit = (
+            LOW_MEMORY_ENTITY_CACHE_LIMIT if low_memory else DEFAULT_ENTITY_CACHE_LIMIT
+        )
+        session: str | PersistentMemorySession = account
+        if session_mode == "memory":
+            session = PersistentMemorySession(account)
+        client = cls(
+            api_id=api_id,
+            api_hash=api_hash,
+            entity_cache_limit=entity_cache_limit,
+            session=session,
+            account=account,
+        )
         await client.connect()
+        if isinstance(session, PersistentMemorySession):
+            session.start_flushing(session_flush_interval)
         user = await client.get_me()
         if user:
-            logger.info(f"Logged in as {user.first_name} (@{user.username})")
+            logger.info(
+                f"Telegram account '{account}' logged in as "
+                f"{user.first_name} (@{user.username})"
+            )
         else:
-            logger.info("Not logged in")
+            logger.info(f"Telegram account '{account}' is not logged in")
         return client
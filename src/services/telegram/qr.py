@@ -5,7 +5,6 @@ import sys
 from collections.abc import Awaitable, Callable
 from contextlib import suppress
 
-import qrcode
 import telethon
 from discord.utils import utcnow
 
@@ -19,6 +18,10 @@ PasswordCallback = Callable[[], Awaitable[str]]
 
 
 def gen_qr_ascii(url: str) -> str:
+    # qrcode (and PIL, for images) is only needed on the rare QR login, so it's
+    # imported on first use to keep it out of startup time and memory
+    import qrcode  # noqa: PLC0415
+
     qr = qrcode.QRCode()
     qr.add_data(url)
     qr.make(fit=True)
@@ -36,6 +39,8 @@ def gen_qr_ascii(url: str) -> str:
 
 
 def gen_qr_image(url: str) -> io.BytesIO:
+    import qrcode  # noqa: PLC0415
+
     qr = qrcode.QRCode()
     qr.add_data(url)
     qr.make(fit=True)
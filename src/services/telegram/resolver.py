@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import telethon
+import telethon.errors
+from telethon import utils
+from telethon.tl.types import Channel, InputChannel, InputPeerChannel, PeerChannel
+
+from src.database import channels as channel_db
+from src.database import entity_cache
+from src.services.telegram.scheduler import RequestScheduler
+from src.shared.exceptions import NotAChannelError
+
+logger = logging.getLogger(__name__)
+
+# How long a resolution stays valid in the persistent cache
+ENTITY_CACHE_TTL = 24 * 60 * 60
+_LRU_SIZE = 1024
+
+_LINK_RE = re.compile(
+    r"^(?:https?://)?(?:www\.)?(?:t\.me|telegram\.me|telegram\.dog)/(?:s/)?([^/?#]+)",
+    re.IGNORECASE,
+)
+_USERNAME_RE = re.compile(r"^[a-z][a-z0-9_]{2,31}$")
+
+
+def normalize_channel_key(raw: str) -> str | None:
+    """
+    Normalize a link, username or ID into a canonical cache key.
+
+    Args:
+        raw: Identifier as typed by the user
+
+    Returns:
+        "id:<channel id>" or "username:<lowercase username>", or None for
+        identifiers that can't be cached (invite links, phone numbers, ...)
+    """
+    value = raw.strip()
+    if match := _LINK_RE.match(value):
+        value = match.group(1)
+    value = value.removeprefix("@")
+
+    if value.lstrip("-").isdigit():
+        number = int(value)
+        if number > 0:
+            return f"id:{number}"
+        channel_id, peer_type = utils.resolve_id(number)
+        return f"id:{channel_id}" if peer_type is PeerChannel else None
+
+    value = value.lower()
+    return f"username:{value}" if _USERNAME_RE.match(value) else None
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedChannel:
+    id: int
+    access_hash: int
+    username: str | None
+    # Full entity, only present when the resolution went to the network
+    entity: Channel | None = field(default=None, compare=False)
+
+    @property
+    def input_channel(self) -> InputChannel:
+        return InputChannel(self.id, self.access_hash)
+
+    @property
+    def input_peer(self) -> InputPeerChannel:
+        return InputPeerChannel(self.id, self.access_hash)
+
+
+class EntityResolver:
+    """
+    Resolves user-supplied channel identifiers, avoiding the network when possible.
+
+    Lookups go through an in-memory LRU, then the stored telegram_channels rows
+    (with the access hash from the Telethon session), then the persistent
+    telegram_entity_cache table. Only misses reach Telegram, through the
+    request scheduler, and their results are written back to both caches.
+
+    Access hashes are only valid for the account that received them, so every
+    account but the primary one stores its cache entries under `cache_prefix`.
+    """
+
+    def __init__(
+        self,
+        client: telethon.TelegramClient,
+        scheduler: RequestScheduler,
+        ttl: float = ENTITY_CACHE_TTL,
+        lru_size: int = _LRU_SIZE,
+        cache_prefix: str = "",
+    ) -> None:
+        self._client = client
+        self._scheduler = scheduler
+        self._cache_prefix = cache_prefix
+        self.ttl = ttl
+        self._lru_size = lru_size
+        self._lru: OrderedDict[str, tuple[float, ResolvedChannel]] = OrderedDict()
+
+    def _lru_get(self, key: str) -> ResolvedChannel | None:
+        cached = self._lru.get(key)
+        if cached is None:
+            return None
+        expires_at, resolved = cached
+        if expires_at < time.monotonic():
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return resolved
+
+    def _remember(self, keys: list[str], resolved: ResolvedChannel) -> None:
+        expires_at = time.monotonic() + self.ttl
+        for key in keys:
+            self._lru[key] = (expires_at, resolved)
+            self._lru.move_to_end(key)
+        while len(self._lru) > self._lru_size:
+            self._lru.popitem(last=False)
+
+    @staticmethod
+    def _keys_for(resolved: ResolvedChannel) -> list[str]:
+        keys = [f"id:{resolved.id}"]
+        if resolved.username:
+            keys.append(f"username:{resolved.username.lower()}")
+        return keys
+
+    def _session_access_hash(self, channel_id: int) -> int | None:
+        try:
+            peer = self._client.session.get_input_entity(
+                utils.get_peer_id(PeerChannel(channel_id))
+            )
+        except ValueError:
+            return None
+        return peer.access_hash if isinstance(peer, InputPeerChannel) else None
+
+    async def _lookup_stored(self, key: str) -> ResolvedChannel | None:
+        kind, _, value = key.partition(":")
+
+        # Channels we already manage: the row has the ID and username, the
+        # session the access hash
+        if kind == "id":
+            row = await asyncio.to_thread(
+                channel_db.get_telegram_channel, channel_id=int(value)
+            )
+        else:
+            row = await asyncio.to_thread(
+                channel_db.get_telegram_channel, username=value
+            )
+        if row is not None:
+            access_hash = self._session_access_hash(row.channel_id)
+            if access_hash is not None:
+                return ResolvedChannel(row.channel_id, access_hash, row.username)
+
+        cached = await asyncio.to_thread(
+            entity_cache.get_cached_entity, self._cache_prefix + key, self.ttl
+        )
+        if cached is not None:
+            return ResolvedChannel(
+                cached.entity_id, cached.access_hash, cached.username
+            )
+        return None
+
+    async def _fetch(self, raw: str, key: str | None) -> Channel:
+        if key is not None and key.startswith("id:"):
+            query: object = PeerChannel(int(key.removeprefix("id:")))
+        else:
+            query = raw
+        entity = await self._scheduler.run(
+            "resolve", lambda: self._client.get_entity(query)
+        )
+        if not isinstance(entity, Channel):
+            raise NotAChannelError(f"{raw} is not a channel")
+
+        resolved = ResolvedChannel(entity.id, entity.access_hash, entity.username)
+        if entity.access_hash is not None and not entity.min:
+            keys = self._keys_for(resolved)
+            if key is not None and key not in keys:
+                keys.append(key)
+            self._remember(keys, resolved)
+            await asyncio.to_thread(
+                entity_cache.store_cached_entity,
+                [self._cache_prefix + k for k in keys],
+                entity_cache.CachedEntity(
+                    entity.id, entity.access_hash, entity.username
+                ),
+            )
+        return entity
+
+    async def resolve(self, raw: str) -> ResolvedChannel:
+        """
+        Resolve a link, username or ID to a channel.
+
+        Args:
+            raw: Identifier as typed by the user
+
+        Returns:
+            The resolved channel. `entity` is only set when Telegram was queried.
+
+        Raises:
+            ValueError: If Telegram doesn't know the identifier
+            NotAChannelError: If the identifier isn't a channel
+            telethon.errors.RPCError: If the request fails
+            TimeoutError: If the scheduler couldn't run the request in time
+        """
+        key = normalize_channel_key(raw)
+        if key is not None:
+            if resolved := self._lru_get(key):
+                return resolved
+            if resolved := await self._lookup_stored(key):
+                self._remember([key], resolved)
+                return resolved
+
+        entity = await self._fetch(raw, key)
+        return ResolvedChannel(entity.id, entity.access_hash, entity.username, entity)
+
+    async def get_channel(self, resolved: ResolvedChannel) -> Channel:
+        """
+        Get the full channel entity for a resolution.
+
+        Uses a cheap lookup by access hash; if the cached hash is no longer
+        valid, the cache entry is dropped and the username is resolved again.
+
+        Raises:
+            ValueError: If the channel no longer exists
+            telethon.errors.RPCError: If the request fails
+            TimeoutError: If the scheduler couldn't run the request in time
+        """
+        if resolved.entity is not None:
+            return resolved.entity
+        try:
+            return await self._scheduler.run(
+                "default", lambda: self._client.get_entity(resolved.input_peer)
+            )
+        except (
+            telethon.errors.ChannelInvalidError,
+            telethon.errors.ChannelPrivateError,
+        ):
+            await self.invalidate(resolved)
+            if not resolved.username:
+                raise
+            return await self._fetch(
+                resolved.username, f"username:{resolved.username.lower()}"
+            )
+
+    async def invalidate(self, resolved: ResolvedChannel) -> None:
+        """Forget every cached key for a channel."""
+        for key in [k for k, (_, r) in self._lru.items() if r.id == resolved.id]:
+            del self._lru[key]
+        # Drops the other accounts' entries too, they get resolved again
+        await asyncio.to_thread(entity_cache.delete_cached_entity, resolved.id)
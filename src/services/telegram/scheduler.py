@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import telethon.errors
+
+from src.shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class BucketConfig:
+    rate: float  # Tokens added per second
+    burst: int  # Maximum tokens stored
+
+
+# Conservative pacing per kind of request, well below Telegram's flood limits
+DEFAULT_BUCKETS: dict[str, BucketConfig] = {
+    "resolve": BucketConfig(rate=1.0, burst=5),
+    "join": BucketConfig(rate=0.2, burst=2),
+    "leave": BucketConfig(rate=0.2, burst=2),
+    "folder": BucketConfig(rate=0.5, burst=3),
+    "default": BucketConfig(rate=5.0, burst=10),
+}
+
+
+class TokenBucket:
+    """FIFO token bucket. Waiters are served in arrival order."""
+
+    def __init__(self, config: BucketConfig) -> None:
+        self.rate = config.rate
+        self.burst = config.burst
+        self._tokens = float(config.burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class RequestScheduler:
+    """
+    Paces Telegram requests per method class and honours FloodWait globally.
+
+    A FloodWaitError from any request pauses every class until the deadline
+    passes, then the request is retried. Callers get a TimeoutError if the
+    request can't complete within their timeout, or the FloodWaitError itself
+    when the wait is already known to exceed it.
+    """
+
+    DEFAULT_TIMEOUT: float = 60.0
+
+    def __init__(self, buckets: dict[str, BucketConfig] | None = None) -> None:
+        configs = buckets or DEFAULT_BUCKETS
+        self._buckets = {name: TokenBucket(cfg) for name, cfg in configs.items()}
+        self._flood_until: float = 0.0
+        self._waiting = metrics.telegram_requests_waiting
+
+    @property
+    def flood_wait_remaining(self) -> float:
+        """Seconds until the current global FloodWait expires (0 if none)."""
+        return max(0.0, self._flood_until - time.monotonic())
+
+    def _bucket(self, method_class: str) -> TokenBucket:
+        bucket = self._buckets.get(method_class)
+        if bucket is None:
+            bucket = self._buckets[method_class] = TokenBucket(
+                DEFAULT_BUCKETS["default"]
+            )
+        return bucket
+
+    async def _wait_for_flood(self, deadline: float | None) -> None:
+        remaining = self.flood_wait_remaining
+        if remaining <= 0:
+            return
+        if deadline is not None and time.monotonic() + remaining > deadline:
+            raise telethon.errors.FloodWaitError(request=None, capture=int(remaining))
+        await asyncio.sleep(remaining)
+
+    async def run[T](
+        self,
+        method_class: str,
+        call: Callable[[], Awaitable[T]],
+        timeout: float | None = DEFAULT_TIMEOUT,
+    ) -> T:
+        """
+        Run a Telegram request through the scheduler.
+
+        Args:
+            method_class: Pacing class ("resolve", "join", "leave", "folder", ...)
+            call: Function starting the request, called once per attempt
+            timeout: Maximum total seconds to wait, including queueing and retries
+
+        Raises:
+            TimeoutError: If the request didn't complete within the timeout
+            telethon.errors.FloodWaitError: If a known FloodWait outlasts the timeout
+        """
+        # The event loop clock is time.monotonic(), so one deadline serves both
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        bucket = self._bucket(method_class)
+        waiting = self._waiting.labels(method_class)
+
+        async with asyncio.timeout_at(deadline):
+            while True:
+                waiting.inc()
+                try:
+                    await self._wait_for_flood(deadline)
+                    await bucket.acquire()
+                    await self._wait_for_flood(deadline)
+                finally:
+                    waiting.dec()
+
+                try:
+                    return await call()
+                except telethon.errors.FloodWaitError as e:
+                    metrics.telegram_flood_waits.labels(method_class).inc()
+                    self._flood_until = max(
+                        self._flood_until, time.monotonic() + e.seconds
+                    )
+                    logger.warning(
+                        f"Telegram FloodWait of {e.seconds}s on '{method_class}' request, "
+                        "pausing all scheduled requests"
+                    )
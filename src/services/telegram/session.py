@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import sqlite3
+from contextlib import closing, suppress
+from pathlib import Path
+
+from telethon import utils
+from telethon.sessions import MemorySession, SQLiteSession
+from telethon.tl.types import PeerChannel, PeerChat, PeerUser
+
+logger = logging.getLogger(__name__)
+
+SESSION_NAME = "telegram"
+SESSION_EXTENSION = ".session"
+
+type _EntityRow = tuple[int, int, str | None, str | None, str | None]
+
+
+class PersistentMemorySession(MemorySession):
+    """
+    Telethon session kept in memory and written to disk periodically.
+
+    Telethon writes entities and update state to its session on every batch of
+    updates. This session keeps them in memory instead and flushes them, only
+    when something changed, to a file in Telethon's own SQLite session format,
+    so switching back to the file-backed session keeps the login. Each flush
+    writes a temporary file and renames it over the old one, so a crash during
+    a flush never leaves a half-written session.
+    """
+
+    def __init__(self, name: str = SESSION_NAME) -> None:
+        super().__init__()
+        self.path = Path(
+            name if name.endswith(SESSION_EXTENSION) else name + SESSION_EXTENSION
+        )
+        # Keyed by marked ID, so updated entities replace their old row and
+        # lookups by ID don't scan every entity
+        self._rows: dict[int, _EntityRow] = {}
+        self._dirty = False
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+
+        stored = SQLiteSession(str(self.path))
+        try:
+            self._dc_id = stored.dc_id
+            self._server_address = stored.server_address
+            self._port = stored.port
+            self._auth_key = stored.auth_key
+            self._takeout_id = stored.takeout_id
+            self._update_states = dict(stored.get_update_states())
+        finally:
+            stored.close()
+
+        with closing(sqlite3.connect(self.path)) as conn:
+            rows = conn.execute(
+                "SELECT id, hash, username, phone, name FROM entities"
+            ).fetchall()
+        self._rows = {row[0]: row for row in rows}
+        logger.info(f"Loaded Telegram session from {self.path} ({len(rows)} entities)")
+
+    # State changes mark the session dirty so the next flush writes it
+
+    def set_dc(self, dc_id: int, server_address: str, port: int) -> None:
+        super().set_dc(dc_id, server_address, port)
+        self._dirty = True
+
+    @MemorySession.auth_key.setter
+    def auth_key(self, value: object) -> None:
+        self._auth_key = value
+        self._dirty = True
+
+    @MemorySession.takeout_id.setter
+    def takeout_id(self, value: int | None) -> None:
+        self._takeout_id = value
+        self._dirty = True
+
+    def set_update_state(self, entity_id: int, state: object) -> None:
+        super().set_update_state(entity_id, state)
+        self._dirty = True
+
+    def process_entities(self, tlo: object) -> None:
+        for row in self._entities_to_rows(tlo):
+            if self._rows.get(row[0]) != row:
+                self._rows[row[0]] = row
+                self._dirty = True
+
+    def delete(self) -> bool:
+        # Called on log out: the stored login must go too
+        self._rows.clear()
+        self._dirty = False
+        with suppress(FileNotFoundError):
+            self.path.unlink()
+        return True
+
+    # Entity lookups over the ID-keyed rows
+
+    def get_entity_rows_by_id(
+        self, id: int, exact: bool = True
+    ) -> tuple[int, int] | None:
+        if exact:
+            candidates: tuple[int, ...] = (id,)
+        else:
+            candidates = (
+                utils.get_peer_id(PeerUser(id)),
+                utils.get_peer_id(PeerChat(id)),
+                utils.get_peer_id(PeerChannel(id)),
+            )
+        for candidate in candidates:
+            if row := self._rows.get(candidate):
+                return row[0], row[1]
+        return None
+
+    def _find_row(self, column: int, value: object) -> tuple[int, int] | None:
+        for row in self._rows.values():
+            if row[column] == value:
+                return row[0], row[1]
+        return None
+
+    def get_entity_rows_by_username(self, username: str) -> tuple[int, int] | None:
+        return self._find_row(2, username)
+
+    def get_entity_rows_by_phone(self, phone: str) -> tuple[int, int] | None:
+        return self._find_row(3, phone)
+
+    def get_entity_rows_by_name(self, name: str) -> tuple[int, int] | None:
+        return self._find_row(4, name)
+
+    # Flushing
+
+    def _write(self, snapshot: tuple) -> None:
+        """Runs on a worker thread. Writes the snapshot and swaps it in atomically."""
+        dc_id, server_address, port, auth_key, takeout_id, states, rows = snapshot
+        tmp_path = self.path.with_name(f"{self.path.stem}.tmp{SESSION_EXTENSION}")
+        tmp_path.unlink(missing_ok=True)
+
+        # Let Telethon create the schema and the sessions/update_state rows
+        session = SQLiteSession(str(tmp_path))
+        try:
+            session.set_dc(dc_id, server_address, port)
+            session.auth_key = auth_key
+            session.takeout_id = takeout_id
+            for entity_id, state in states:
+                session.set_update_state(entity_id, state)
+            session.save()
+        finally:
+            session.close()
+
+        with closing(sqlite3.connect(tmp_path)) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entities (id, hash, username, phone, name) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+
+        os.replace(tmp_path, self.path)
+
+    async def flush(self) -> None:
+        """Write the session to disk if it changed since the last flush."""
+        async with self._flush_lock:
+            if not self._dirty or self._dc_id == 0:
+                return
+
+            # Snapshot on the loop, write on a thread
+            self._dirty = False
+            snapshot = (
+                self._dc_id,
+                self._server_address,
+                self._port,
+                self._auth_key,
+                self._takeout_id,
+                list(self._update_states.items()),
+                list(self._rows.values()),
+            )
+            try:
+                await asyncio.to_thread(self._write, snapshot)
+            except (OSError, sqlite3.Error) as e:
+                self._dirty = True
+                logger.error(f"Failed to flush Telegram session: {e}", exc_info=e)
+
+    async def _flush_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    def start_flushing(self, interval: float) -> None:
+        """Flush the session every `interval` seconds in the background."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically(interval))
+
+    async def stop_flushing(self) -> None:
+        """Stop the periodic flush and write any pending changes."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        await self.flush()
@@ -0,0 +1,46 @@
+import bisect
+import hashlib
+from collections.abc import Iterable
+
+
+class HashRing:
+    """
+    Consistent hash ring assigning channels to Telegram accounts.
+
+    Each account is placed on the ring at REPLICAS pseudo-random points and a
+    channel belongs to the first account point at or after the channel's own
+    hash. Adding or removing an account only moves the channels between its
+    points and their neighbours, about 1/N of them, instead of reshuffling
+    every assignment like `channel_id % N` would.
+    """
+
+    REPLICAS: int = 128
+
+    def __init__(self, accounts: Iterable[str], replicas: int = REPLICAS) -> None:
+        self.accounts = frozenset(accounts)
+        points = sorted(
+            (self._hash(f"{account}#{replica}"), account)
+            for account in self.accounts
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [account for _, account in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        # Stable across processes, unlike hash()
+        return int.from_bytes(
+            hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+        )
+
+    def owner(self, channel_id: int) -> str:
+        """
+        Get the account a channel belongs to.
+
+        Raises:
+            LookupError: If the ring has no accounts
+        """
+        if not self._hashes:
+            raise LookupError("The hash ring has no accounts")
+        index = bisect.bisect_left(self._hashes, self._hash(str(channel_id)))
+        return self._owners[index % len(self._owners)]
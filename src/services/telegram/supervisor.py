@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import suppress
+from datetime import UTC, datetime
+from enum import StrEnum
+
+import telethon
+from telethon import events
+
+from src.services.telegram.exceptions import AUTH_ERRORS
+from src.services.telegram.session import SESSION_NAME
+from src.shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionState(StrEnum):
+    CONNECTED = "connected"
+    RECONNECTING = "reconnecting"
+    UNAUTHORIZED = "unauthorized"  # Connected, but the session was logged out
+    STOPPED = "stopped"
+
+
+class ConnectionSupervisor:
+    """
+    Keeps the Telegram client connected and its update stream flowing.
+
+    Telethon retries a dropped connection a few times on its own and then gives
+    up, and a revoked auth key only shows up as a disconnect. The supervisor
+    notices both, reconnects with jittered exponential backoff and then calls
+    catch_up(), which asks Telegram for the difference since the update state
+    (pts) persisted in the session, so messages sent while we were offline are
+    still forwarded. A stream that has been quiet for too long also gets a
+    catch_up(), which recovers updates lost to an unnoticed gap.
+    """
+
+    CHECK_INTERVAL: float = 5.0
+    STALE_AFTER: float = 300.0
+    BACKOFF_BASE: float = 1.0
+    BACKOFF_MAX: float = 60.0
+
+    def __init__(
+        self, client: telethon.TelegramClient, account: str = SESSION_NAME
+    ) -> None:
+        self._client = client
+        self.account = account
+        self.state = ConnectionState.CONNECTED
+        self.reconnects = 0
+        self.catch_ups = 0
+        self.last_disconnect_at: datetime | None = None
+        self.last_update_at = time.monotonic()
+        self._downtime_total = 0.0
+        self._down_since: float | None = None
+        self._reconnect_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+
+        metrics.telegram_connected.labels(account).set_callback(
+            lambda: 1 if self.state == ConnectionState.CONNECTED else 0
+        )
+        metrics.telegram_downtime.labels(account).set_callback(lambda: self.downtime)
+
+    @classmethod
+    async def create_and_start(
+        cls, client: telethon.TelegramClient, account: str = SESSION_NAME
+    ) -> ConnectionSupervisor:
+        """Create a supervisor, catch up on missed updates and start watching."""
+        supervisor = cls(client, account)
+        await supervisor.start()
+        return supervisor
+
+    @property
+    def downtime(self) -> float:
+        """Total seconds spent disconnected, including the current outage."""
+        if self._down_since is None:
+            return self._downtime_total
+        return self._downtime_total + time.monotonic() - self._down_since
+
+    @property
+    def outage(self) -> float:
+        """Seconds the current outage has lasted, 0 while connected."""
+        if self._down_since is None:
+            return 0.0
+        return time.monotonic() - self._down_since
+
+    async def _on_update(self, _update: object) -> None:
+        self.last_update_at = time.monotonic()
+
+    async def _catch_up(self, reason: str) -> None:
+        logger.info(f"Catching up on Telegram updates of '{self.account}' ({reason})")
+        self.catch_ups += 1
+        metrics.telegram_catch_ups.inc()
+        self.last_update_at = time.monotonic()
+        await self._client.catch_up()
+
+    def _mark_down(self) -> None:
+        if self._down_since is None:
+            self._down_since = time.monotonic()
+            self.last_disconnect_at = datetime.now(UTC)
+
+    def _mark_up(self) -> None:
+        if self._down_since is not None:
+            outage = time.monotonic() - self._down_since
+            self._downtime_total += outage
+            self._down_since = None
+            logger.warning(
+                f"Telegram connection of '{self.account}' restored after {outage:.1f}s"
+            )
+
+    async def reconnect(self, reason: str, force: bool = False) -> bool:
+        """
+        Reconnect until it succeeds, waiting a jittered, growing delay between tries.
+
+        Args:
+            reason: Why the reconnect is happening, for the logs
+            force: Drop the current connection first, even if it looks healthy
+
+        Returns:
+            True if the client is connected and authorized again
+        """
+        async with self._reconnect_lock:
+            if not force and self._client.is_connected():
+                return self.state == ConnectionState.CONNECTED
+
+            logger.warning(f"Reconnecting Telegram account '{self.account}': {reason}")
+            self.state = ConnectionState.RECONNECTING
+            self._mark_down()
+            if force:
+                await self._client.disconnect()
+
+            attempt = 0
+            while True:
+                try:
+                    await self._client.connect()
+                    authorized = await self._client.is_user_authorized()
+                    break
+                except AUTH_ERRORS:
+                    authorized = False
+                    break
+                except (OSError, ConnectionError, TimeoutError) as e:
+                    delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2**attempt)
+                    # Equal jitter: never retry immediately, never in lockstep
+                    delay = random.uniform(delay / 2, delay)
+                    attempt += 1
+                    logger.warning(
+                        f"Telegram reconnect attempt {attempt} of '{self.account}' "
+                        f"failed ({e}), "
+                        f"retrying in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+
+            self.reconnects += 1
+            metrics.telegram_reconnects.inc()
+            if not authorized:
+                self.state = ConnectionState.UNAUTHORIZED
+                logger.error(
+                    f"Telegram session '{self.account}' is no longer authorized, "
+                    f"use /telegram login conta:{self.account}"
+                )
+                return False
+
+            self.state = ConnectionState.CONNECTED
+            self._mark_up()
+            await self._catch_up("reconnected")
+            return True
+
+    async def _check(self) -> None:
+        if self.state == ConnectionState.UNAUTHORIZED:
+            # Waiting for /telegram login; resume once it has happened
+            if self._client.is_connected() and await self._client.is_user_authorized():
+                self.state = ConnectionState.CONNECTED
+                self._mark_up()
+                await self._catch_up("logged in")
+            return
+
+        if not self._client.is_connected():
+            await self.reconnect("connection lost")
+        elif time.monotonic() - self.last_update_at > self.STALE_AFTER:
+            await self._catch_up(f"no updates for {self.STALE_AFTER:.0f}s")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.CHECK_INTERVAL)
+            try:
+                await self._check()
+            except (OSError, ConnectionError, TimeoutError) as e:
+                logger.warning(
+                    f"Telegram supervisor check of '{self.account}' failed: {e}"
+                )
+            except Exception as e:
+                # E.g. an RPCError, the loop must survive it or reconnects stop
+                logger.error(
+                    f"Telegram supervisor check of '{self.account}' failed: {e}",
+                    exc_info=e,
+                )
+
+    async def start(self) -> None:
+        """Register the update hook, catch up and start the watch loop."""
+        if self._task is not None:
+            logger.warning(
+                f"Connection supervisor of '{self.account}' is already running"
+            )
+            return
+
+        self._client.add_event_handler(self._on_update, events.Raw)
+        if await self._client.is_user_authorized():
+            await self._catch_up("startup")
+        else:
+            self.state = ConnectionState.UNAUTHORIZED
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop watching. Must run before the client is disconnected on shutdown."""
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._client.remove_event_handler(self._on_update, events.Raw)
+        self.state = ConnectionState.STOPPED
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from enum import IntEnum
+
+import telethon
+import telethon.errors
+from telethon.tl.types import PeerChannel
+
+from src.services.forwarder.liveness import LivenessTracker
+from src.services.telegram.scheduler import RequestScheduler
+from src.services.telegram.supervisor import ConnectionState, ConnectionSupervisor
+from src.shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class WatchdogLevel(IntEnum):
+    OK = 0
+    STALLED = 1  # Logged and asked for a catch-up
+    RECONNECTED = 2  # Forced a reconnect
+    RESTARTING = 3  # Gave up, the process is exiting
+
+
+class LivenessWatchdog:
+    """
+    Detects an update stream that stopped delivering while the client looks connected.
+
+    One watchdog watches each account, over the channels assigned to it.
+
+    When the liveness tracker finds the silence suspicious, the watchdog asks
+    Telegram for the latest message of the most active channels. Newer messages
+    than the ones we received confirm the stall; otherwise the stream is just
+    quiet. Each consecutive confirmed check escalates one step: log and catch
+    up, force a reconnect, then call `on_stalled` so the process exits and the
+    platform restarts it.
+    """
+
+    CHECK_INTERVAL: float = 60.0
+    PROBE_CHANNELS: int = 3
+
+    def __init__(
+        self,
+        client: telethon.TelegramClient,
+        scheduler: RequestScheduler,
+        supervisor: ConnectionSupervisor,
+        tracker: LivenessTracker,
+        on_stalled: Callable[[], Awaitable[None]],
+    ) -> None:
+        self._client = client
+        self._scheduler = scheduler
+        self._supervisor = supervisor
+        self.tracker = tracker
+        self._on_stalled = on_stalled
+        self.level = WatchdogLevel.OK
+        self.last_probe: str | None = None
+        self.restart_requested = False
+        self._task: asyncio.Task[None] | None = None
+
+        self.account = supervisor.account
+        metrics.stream_silence.labels(self.account).set_callback(self.tracker.silence)
+        metrics.stream_expected_posts.labels(self.account).set_callback(
+            self.tracker.expected_posts
+        )
+        metrics.watchdog_level.labels(self.account).set_callback(lambda: self.level)
+
+    @classmethod
+    async def create_and_start(
+        cls,
+        client: telethon.TelegramClient,
+        scheduler: RequestScheduler,
+        supervisor: ConnectionSupervisor,
+        tracker: LivenessTracker,
+        on_stalled: Callable[[], Awaitable[None]],
+    ) -> LivenessWatchdog:
+        """Create a watchdog and start checking the stream."""
+        watchdog = cls(client, scheduler, supervisor, tracker, on_stalled)
+        await watchdog.start()
+        return watchdog
+
+    async def _latest_message_id(self, channel_id: int) -> int | None:
+        try:
+            messages = await self._scheduler.run(
+                "default",
+                lambda: self._client.get_messages(PeerChannel(channel_id), limit=1),
+            )
+        except (
+            ValueError,
+            telethon.errors.RPCError,
+            ConnectionError,
+            TimeoutError,
+        ) as e:
+            logger.warning(f"Liveness probe of channel {channel_id} failed: {e}")
+            return None
+        return messages[0].id if messages else None
+
+    async def _probe(self) -> bool | None:
+        """
+        Check whether Telegram has messages we never received.
+
+        Returns:
+            True if messages were missed, False if the stream is only quiet,
+            None if no channel could be probed
+        """
+        probed = False
+        for activity in self.tracker.most_active(self.PROBE_CHANNELS):
+            latest = await self._latest_message_id(activity.channel_id)
+            if latest is None:
+                continue
+            probed = True
+            if latest > activity.last_message_id:
+                self.last_probe = (
+                    f"canal {activity.channel_id}: mensagem {latest} no Telegram, "
+                    f"última recebida {activity.last_message_id}"
+                )
+                return True
+        if not probed:
+            return None
+        self.last_probe = "sem mensagens perdidas"
+        return False
+
+    async def _escalate(self) -> None:
+        self.level = WatchdogLevel(min(self.level + 1, WatchdogLevel.RESTARTING))
+        metrics.watchdog_escalations.labels(self.level.name.lower()).inc()
+        silence = self.tracker.silence()
+
+        if self.level is WatchdogLevel.STALLED:
+            logger.warning(
+                f"Telegram update stream of '{self.account}' looks "
+                f"stalled ({silence:.0f}s without messages, {self.last_probe}), "
+                "catching up"
+            )
+            await self._client.catch_up()
+        elif self.level is WatchdogLevel.RECONNECTED:
+            logger.error(
+                f"Telegram update stream of '{self.account}' still "
+                "stalled, forcing a reconnect"
+            )
+            await self._supervisor.reconnect("update stream stalled", force=True)
+        else:
+            logger.critical(
+                f"Telegram update stream of '{self.account}' still "
+                "stalled after reconnecting, exiting so the platform restarts the bot"
+            )
+            self.restart_requested = True
+            await self._on_stalled()
+
+    async def _check(self) -> None:
+        # Outages are the supervisor's job
+        if self._supervisor.state is not ConnectionState.CONNECTED:
+            return
+        if not self.tracker.is_suspect():
+            self.level = WatchdogLevel.OK
+            return
+
+        missed = await self._probe()
+        if missed is False:
+            logger.info(
+                f"Telegram stream of '{self.account}' quiet for "
+                f"{self.tracker.silence():.0f}s, but no messages were missed"
+            )
+            self.tracker.heartbeat()
+            self.level = WatchdogLevel.OK
+        elif missed:
+            await self._escalate()
+
+    async def _run(self) -> None:
+        while self.level is not WatchdogLevel.RESTARTING:
+            await asyncio.sleep(self.CHECK_INTERVAL)
+            try:
+                await self._check()
+            except (OSError, ConnectionError, TimeoutError) as e:
+                logger.warning(f"Liveness check failed: {e}")
+            except Exception as e:
+                # E.g. an RPCError from the probe, the loop must survive it
+                logger.error(f"Liveness check failed: {e}", exc_info=e)
+
+    async def start(self) -> None:
+        """Start checking the stream in the background."""
+        if self._task is not None:
+            logger.warning("Liveness watchdog is already running")
+            return
+        self.tracker.heartbeat()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop checking the stream."""
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
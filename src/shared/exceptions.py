@@ -43,6 +43,12 @@ class ChannelAlreadyExistsError(ChannelError):
     pass
 
 
+class NotAChannelError(ChannelError):
+    """Raised when a Telegram identifier resolves to something that isn't a channel."""
+
+    pass
+
+
 class ReminderGroupNotFoundError(ReminderError):
     """Raised when a reminder group is not found."""
 
@@ -65,3 +71,27 @@ class ReminderLimitReachedError(ReminderError):
     """Raised when trying to exceed reminder limits."""
 
     pass
+
+
+class ReminderExpressionError(ReminderError):
+    """Raised when a reminder expression can't be parsed or would match anything."""
+
+    pass
+
+
+class CaptureInProgressError(ServiceError):
+    """Raised when starting a profiling capture while another one is running."""
+
+    pass
+
+
+class StreamStalledError(ServiceError):
+    """Raised when the Telegram update stream stalled and the bot must restart."""
+
+    pass
+
+
+class ProtocolError(ServiceError):
+    """Raised when a frame between the ingestion and delivery processes is malformed."""
+
+    pass
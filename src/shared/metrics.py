@@ -0,0 +1,459 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Metrics are plain attributes updated without locks. Most updates come from the
+event loop; database timings are also observed from `asyncio.to_thread`
+workers, where two threads updating the same metric at once can rarely lose an
+update. That is tolerated: metrics are for monitoring, not accounting.
+Labelled metrics allocate their child the first time a label value is seen;
+after that an update is a dict lookup on the value as given (no string
+conversion) plus an integer/float add.
+"""
+
+import os
+import sys
+from bisect import bisect_left
+from collections.abc import Callable, Hashable, Iterator
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Default buckets (in seconds) for latency histograms
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonically increasing value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """Value that can go up and down, or be read from a callback at scrape time."""
+
+    __slots__ = ("value", "_callback")
+
+    def __init__(self, callback: Callable[[], float] | None = None) -> None:
+        self.value: float = 0
+        self._callback = callback
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set_callback(self, callback: Callable[[], float] | None) -> None:
+        self._callback = callback
+
+    def read(self) -> float:
+        if self._callback is not None:
+            return self._callback()
+        return self.value
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, preallocated at creation."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Labeled[T: (Counter, Gauge, Histogram)]:
+    """Family of metrics keyed by the value of a single label."""
+
+    __slots__ = ("label", "_factory", "children", "_by_value")
+
+    def __init__(self, label: str, factory: Callable[[], T]) -> None:
+        self.label = label
+        self._factory = factory
+        # One child per rendered label value, so `labels(1)` and `labels("1")`
+        # share a series
+        self.children: dict[str, T] = {}
+        # Children by the raw value as given, so updates skip the conversion
+        self._by_value: dict[Hashable, T] = {}
+
+    def labels(self, value: Hashable) -> T:
+        """Get the child for a label value, creating it on first use."""
+        child = self._by_value.get(value)
+        if child is None:
+            key = str(value)
+            child = self.children.get(key)
+            if child is None:
+                child = self.children[key] = self._factory()
+            self._by_value[value] = child
+        return child
+
+
+type _Source = Counter | Gauge | Histogram | Labeled
+
+
+def _render_series(
+    name: str, labels: str, metric: Counter | Gauge | Histogram
+) -> Iterator[str]:
+    if isinstance(metric, Histogram):
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        bounds = (*metric.buckets, float("inf"))
+        for bound, count in zip(bounds, metric.counts, strict=True):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{_format_value(bound)}"}} {cumulative}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {_format_value(metric.sum)}"
+        yield f"{name}_count{suffix} {metric.count}"
+        return
+
+    value = metric.read() if isinstance(metric, Gauge) else metric.value
+    suffix = f"{{{labels}}}" if labels else ""
+    yield f"{name}{suffix} {_format_value(value)}"
+
+
+def current_rss_bytes() -> int:
+    """Return the resident set size of the current process in bytes."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    # Not on Linux: fall back to the peak RSS (bytes on macOS, KiB elsewhere)
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Metrics:
+    """All application metrics. Access via the module-level `metrics` instance."""
+
+    def __init__(self) -> None:
+        self._families: list[tuple[str, str, str, _Source]] = []
+
+        # Telegram ingestion
+        self.messages_received = self._register(
+            "telegram_messages_received_total",
+            "Messages received from monitored Telegram channels",
+            "counter",
+            Labeled("channel", Counter),
+        )
+        self.messages_forwarded = self._register(
+            "telegram_messages_forwarded_total",
+            "Messages forwarded to Discord channels",
+            "counter",
+            Labeled("channel", Counter),
+        )
+        self.messages_filtered = self._register(
+            "telegram_messages_filtered_total",
+            "Messages dropped by the forwarding filter",
+            "counter",
+            Counter(),
+        )
+        self.messages_duplicate = self._register(
+            "telegram_messages_duplicate_total",
+            "Messages delivered again by a second account and dropped",
+            "counter",
+            Counter(),
+        )
+
+        self.warm_up_buffer = self._register(
+            "forwarder_warm_up_buffer",
+            "Telegram messages buffered while the forwarder warms up",
+            "gauge",
+            Gauge(),
+        )
+        self.warm_up_dropped = self._register(
+            "forwarder_warm_up_dropped_total",
+            "Telegram messages dropped because the warm-up buffer was full",
+            "counter",
+            Counter(),
+        )
+
+        self.telegram_requests_waiting = self._register(
+            "telegram_requests_waiting",
+            "Telegram requests queued in the scheduler, by method class",
+            "gauge",
+            Labeled("method", Gauge),
+        )
+        self.telegram_flood_waits = self._register(
+            "telegram_flood_waits_total",
+            "FloodWait errors returned by Telegram, by method class",
+            "counter",
+            Labeled("method", Counter),
+        )
+
+        self.telegram_connected = self._register(
+            "telegram_connected",
+            "Whether the Telegram client is connected and authorized, by account",
+            "gauge",
+            Labeled("account", Gauge),
+        )
+        self.telegram_reconnects = self._register(
+            "telegram_reconnects_total",
+            "Reconnections made by the Telegram connection supervisor",
+            "counter",
+            Counter(),
+        )
+        self.telegram_downtime = self._register(
+            "telegram_downtime_seconds_total",
+            "Time spent disconnected from Telegram, by account",
+            "counter",
+            Labeled("account", Gauge),
+        )
+        self.telegram_catch_ups = self._register(
+            "telegram_catch_ups_total",
+            "Requests for updates missed while offline or lost to a gap",
+            "counter",
+            Counter(),
+        )
+
+        self.stream_silence = self._register(
+            "telegram_stream_silence_seconds",
+            "Time since the last message from any channel of an account",
+            "gauge",
+            Labeled("account", Gauge),
+        )
+        self.stream_expected_posts = self._register(
+            "telegram_stream_expected_posts",
+            "Posts an account's channels would usually have made during the silence",
+            "gauge",
+            Labeled("account", Gauge),
+        )
+        self.watchdog_level = self._register(
+            "telegram_watchdog_level",
+            "Liveness watchdog escalation level by account (0 ok, 1 stalled, 2 reconnected, 3 restarting)",
+            "gauge",
+            Labeled("account", Gauge),
+        )
+        self.watchdog_escalations = self._register(
+            "telegram_watchdog_escalations_total",
+            "Escalation steps taken by the liveness watchdog, by level reached",
+            "counter",
+            Labeled("level", Counter),
+        )
+
+        self.ipc_queue = self._register(
+            "ipc_queue",
+            "Deliveries queued for the delivery process (split process mode)",
+            "gauge",
+            Gauge(),
+        )
+        self.ipc_connected = self._register(
+            "ipc_connected",
+            "Whether the ingestion process is connected to the delivery process",
+            "gauge",
+            Gauge(),
+        )
+        self.ipc_dropped = self._register(
+            "ipc_dropped_total",
+            "Deliveries dropped because the queue to the delivery process was full",
+            "counter",
+            Counter(),
+        )
+        self.ipc_received = self._register(
+            "ipc_received_total",
+            "Deliveries received from the ingestion process",
+            "counter",
+            Counter(),
+        )
+
+        self.account_channels = self._register(
+            "telegram_account_channels",
+            "Monitored channels assigned to each Telegram account",
+            "gauge",
+            Labeled("account", Gauge),
+        )
+        self.rebalance_moves = self._register(
+            "telegram_rebalance_moves_total",
+            "Channels moved to another Telegram account by a rebalance",
+            "counter",
+            Counter(),
+        )
+
+        # Discord gateway
+        self.gateway_latency = self._register(
+            "discord_gateway_latency_seconds",
+            "Heartbeat latency of each Discord gateway shard",
+            "gauge",
+            Labeled("shard", Gauge),
+        )
+
+        # Reminders and delivery
+        self.reminder_matches = self._register(
+            "reminder_matches_total",
+            "Reminder groups matched by incoming messages",
+            "counter",
+            Counter(),
+        )
+        self.match_seconds = self._register(
+            "reminder_match_seconds",
+            "Time spent matching one message against reminders, by where it ran",
+            "histogram",
+            Labeled("mode", Histogram),
+        )
+        self.match_offloaded = self._register(
+            "reminder_match_offloaded",
+            "Whether reminder matching currently runs in the worker processes",
+            "gauge",
+            Gauge(),
+        )
+        self.match_batch_size = self._register(
+            "reminder_match_batch_size",
+            "Messages sent to a matching worker per call",
+            "histogram",
+            Histogram((1, 2, 4, 8, 16, 32, 64)),
+        )
+        self.dm_sent = self._register(
+            "discord_dm_sent_total",
+            "Direct messages sent to users",
+            "counter",
+            Counter(),
+        )
+        self.dm_suppressed = self._register(
+            "discord_dm_suppressed_total",
+            "Reminder DMs not sent, by reason (quiet_hours, rate_limited, queue_full)",
+            "counter",
+            Labeled("reason", Counter),
+        )
+        self.dm_queued = self._register(
+            "discord_dm_queued",
+            "Reminder DMs waiting for the global DM budget",
+            "gauge",
+            Gauge(),
+        )
+        self.channel_messages_sent = self._register(
+            "discord_channel_messages_sent_total",
+            "Messages sent to Discord channels",
+            "counter",
+            Counter(),
+        )
+        self.send_errors = self._register(
+            "discord_send_errors_total",
+            "Errors while sending messages to Discord, by exception type",
+            "counter",
+            Labeled("error", Counter),
+        )
+        self.pending_sends = self._register(
+            "discord_pending_sends",
+            "Discord sends currently in flight",
+            "gauge",
+            Gauge(),
+        )
+
+        self.destination_skipped = self._register(
+            "discord_destination_skipped_total",
+            "Channel sends skipped because the destination's circuit breaker is open",
+            "counter",
+            Counter(),
+        )
+        self.destinations_open = self._register(
+            "discord_destinations_open",
+            "Discord channels with an open circuit breaker",
+            "gauge",
+            Gauge(),
+        )
+        self.destinations_disabled = self._register(
+            "discord_destinations_disabled",
+            "Discord channels disabled after repeated send failures",
+            "gauge",
+            Gauge(),
+        )
+
+        # Database
+        self.db_query_seconds = self._register(
+            "database_query_seconds",
+            "Time spent executing SQLite queries",
+            "histogram",
+            Labeled("operation", Histogram),
+        )
+
+        # Process
+        self.event_loop_lag = self._register(
+            "event_loop_lag_seconds",
+            "Most recent event loop scheduling lag",
+            "gauge",
+            Gauge(),
+        )
+        self.resident_memory = self._register(
+            "process_resident_memory_bytes",
+            "Resident memory size of the process",
+            "gauge",
+            Gauge(current_rss_bytes),
+        )
+        self.startup_phases = self._register(
+            "startup_phase_seconds",
+            "Duration of each startup phase, or time since process start for milestones",
+            "gauge",
+            Labeled("phase", Gauge),
+        )
+
+    def _register[S: _Source](
+        self, name: str, help_text: str, kind: str, source: S
+    ) -> S:
+        self._families.append((name, help_text, kind, source))
+        return source
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for name, help_text, kind, source in self._families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if isinstance(source, Labeled):
+                for key, child in source.children.items():
+                    labels = f'{source.label}="{_escape_label(key)}"'
+                    lines.extend(_render_series(name, labels, child))
+            else:
+                lines.extend(_render_series(name, "", source))
+        lines.append("")
+        return "\n".join(lines)
+
+
+# Global metrics instance - update metrics via this
+metrics = Metrics()
@@ -3,6 +3,15 @@ from typing import Any
 
 from discord import Interaction, app_commands
 
+from src.shared.exceptions import ServiceNotInitializedError
+from src.shared.services import services
+
+
+class TelegramUnavailableError(app_commands.CheckFailure):
+    """Raised when a Telegram command runs in a process without Telegram clients."""
+
+    pass
+
 
 def admin_only() -> Callable[[Callable[..., Any]], Any]:
     """
@@ -20,3 +29,22 @@ def admin_only() -> Callable[[Callable[..., Any]], Any]:
         return False
 
     return app_commands.check(is_bot_admin)
+
+
+def telegram_required() -> Callable[[Callable[..., Any]], Any]:
+    """
+    Restrict a command to processes connected to Telegram.
+
+    In the split process mode, commands are served by the delivery process,
+    which has no Telegram client.
+    """
+
+    def has_telegram(_interaction: Interaction) -> bool:
+        try:
+            return services.telegram_accounts is not None
+        except ServiceNotInitializedError:
+            raise TelegramUnavailableError(
+                "Telegram is not available in this process"
+            ) from None
+
+    return app_commands.check(has_telegram)
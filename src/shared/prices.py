@@ -0,0 +1,111 @@
+"""
+Prices mentioned in sanitized messages, in reais.
+
+A single precompiled pattern finds, in one pass over the message:
+
+- amounts after a currency sign: `r$ 1.234,56`, `r$99`, `r$ 1,5 mil`
+- amounts after "por": `por 99`, `por apenas r$ 89,90`
+- installments, counted as their total: `12x de r$ 99,90`
+- bare amounts with cents: `1234,90`
+
+Amounts followed by a unit (`por 2 dias`, `10%`) aren't prices. The words
+around each amount then tell the offer price apart from the others: see
+`offer_price`.
+"""
+
+import re
+
+_NUMBER = r"\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?|\d+(?:[.,]\d{1,2})?"
+# Words after a number that make it a quantity, not an amount in reais
+_UNITS = (
+    r"%|x\b|(?:dias?|horas?|h|min|minutos?|semanas?|mes|meses|anos?|unidades?|un"
+    r"|pecas?|itens?|vezes|pessoas?|gb|tb|mb|w|hz|mah|kg|g|ml|l|cm|mm|m|pol"
+    r"|polegadas?)\b"
+)
+
+_PRICE_PATTERN = re.compile(
+    rf"(?:\b(?P<count>\d{{1,2}}) ?x ?(?:de ?(?:r\$ ?)?|r\$ ?)(?P<installment>{_NUMBER})(?!\d)"
+    rf"|(?:(?P<por>\bpor (?:(?:apenas|so|somente) )?)(?:r\$)?|r\$) ?(?P<price>{_NUMBER})(?!\d)"
+    r"|(?<![\d.,])(?P<bare>\d+,\d{2})(?![\d,]))"
+    r"(?P<thousands> ?(?:mil|k)\b)?"
+    rf"(?! ?(?:{_UNITS}))"
+)
+
+# Context right before or after an amount marking it as the price paid...
+_FINAL_BEFORE = re.compile(r"\b(?:a vista|pix|com (?:o )?cupom)(?: por)?:? ?$")
+_FINAL_AFTER = re.compile(r" ?\(?(?:a vista|no pix|via pix|pix|com (?:o )?cupom)\b")
+# ...or as something else: shipping, coupons, cashback, discounts, installments.
+# After an amount, the word must be tied to it (`r$ 20 de frete`, `r$ 50 off`):
+# `r$ 899 frete gratis` or `r$ 199 cashback de r$ 20` name the price first.
+_IGNORED_BEFORE = re.compile(
+    r"\b(?:frete(?! gratis)|cupom|cashback|desconto|economi[az]e?|parcelas?|entrada)"
+    r"(?: (?:de|do|da|com))?:? ?(?:ate )?$"
+)
+_IGNORED_AFTER = re.compile(
+    r" ?(?:(?:de|em) (?:desconto|cashback|frete(?! gratis)|economia)|off|de volta)\b"
+)
+# Characters before an amount searched for context
+_CONTEXT = 24
+
+
+def _parse_number(number: str) -> float:
+    if "," in number:
+        units, _, cents = number.rpartition(",")
+        return float(f"{units.replace('.', '')}.{cents}")
+    if number.count(".") == 1 and len(number.rpartition(".")[2]) < 3:
+        return float(number)
+    # Dots only group thousands
+    return float(number.replace(".", ""))
+
+
+def _amount(found: re.Match[str]) -> float:
+    if found["installment"] is not None:
+        amount = int(found["count"]) * _parse_number(found["installment"])
+    else:
+        amount = _parse_number(found["price"] or found["bare"])
+    if found["thousands"]:
+        amount *= 1000
+    return round(amount, 2)
+
+
+def offer_price(text_sanitized: str) -> float | None:
+    """
+    The price of the offer in an already sanitized text.
+
+    Amounts next to frete, cupom, cashback, desconto and the like are
+    ignored, as are "parcelas de" values. Final prices, after "por" or next
+    to "a vista", "pix" or "com cupom", win over other amounts, and
+    installment totals are only used if nothing else is mentioned. Among
+    amounts of the same kind, the lowest one is the price.
+
+    Returns:
+        The offer price, or None if the text mentions none
+    """
+    final: list[float] = []
+    other: list[float] = []
+    installments: list[float] = []
+    previous_end = 0
+    for found in _PRICE_PATTERN.finditer(text_sanitized):
+        start, end = found.span()
+        before = text_sanitized[max(previous_end, start - _CONTEXT) : start]
+        after = text_sanitized[end : end + _CONTEXT]
+        previous_end = end
+
+        if (
+            found["por"] is not None
+            or _FINAL_BEFORE.search(before)
+            or _FINAL_AFTER.match(after)
+        ):
+            final.append(_amount(found))
+        elif _IGNORED_BEFORE.search(before) or _IGNORED_AFTER.match(after):
+            continue
+        elif found["installment"] is not None:
+            installments.append(_amount(found))
+        else:
+            other.append(_amount(found))
+    return min(final or other or installments, default=None)
+
+
+def format_price(price: float) -> str:
+    """Format a price in reais, e.g. `R$ 1.234,56`."""
+    return "R$ " + f"{price:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
@@ -6,6 +6,11 @@ from src.shared.exceptions import ServiceNotInitializedError
 if TYPE_CHECKING:
     from src.services.discord.bot import Bot
     from src.services.forwarder.forwarder import MessageForwarder
+    from src.services.ipc.link import DeliveryLink
+    from src.services.ipc.server import DeliveryServer
+    from src.services.metrics.loop_monitor import LoopMonitor
+    from src.services.metrics.server import MetricsServer
+    from src.services.telegram.accounts import TelegramAccounts
     from src.services.telegram.client import TelegramClient
 
 
@@ -17,7 +22,17 @@ class ServiceRegistry:
     ensuring they're never None when accessed.
     """
 
-    __slots__ = ("_bot", "_client", "_forwarder", "_database")
+    __slots__ = (
+        "_bot",
+        "_client",
+        "_forwarder",
+        "_database",
+        "_metrics_server",
+        "_loop_monitor",
+        "_telegram_accounts",
+        "_delivery_link",
+        "_delivery_server",
+    )
 
     _instance: ServiceRegistry | None = None
 
@@ -29,6 +44,11 @@ class ServiceRegistry:
             cls._instance._client = None
             cls._instance._forwarder = None
             cls._instance._database = None
+            cls._instance._metrics_server = None
+            cls._instance._loop_monitor = None
+            cls._instance._telegram_accounts = None
+            cls._instance._delivery_link = None
+            cls._instance._delivery_server = None
         return cls._instance
 
     @property
@@ -47,7 +67,7 @@ class ServiceRegistry:
 
     @property
     def client(self) -> TelegramClient:
-        """Get the Telegram client instance. Raises ServiceNotInitializedError if not initialized."""
+        """Get the primary Telegram account's client. Raises ServiceNotInitializedError if not initialized."""
         if self._client is None:
             raise ServiceNotInitializedError(
                 "Telegram client has not been initialized yet"
@@ -91,6 +111,86 @@ class ServiceRegistry:
             raise RuntimeError("Database has already been initialized")
         self._database = value
 
+    @property
+    def metrics_server(self) -> MetricsServer:
+        """Get the metrics server instance. Raises ServiceNotInitializedError if not initialized."""
+        if self._metrics_server is None:
+            raise ServiceNotInitializedError(
+                "Metrics server has not been initialized yet"
+            )
+        return self._metrics_server
+
+    @metrics_server.setter
+    def metrics_server(self, value: MetricsServer) -> None:
+        """Set the metrics server instance."""
+        if self._metrics_server is not None:
+            raise RuntimeError("Metrics server has already been initialized")
+        self._metrics_server = value
+
+    @property
+    def loop_monitor(self) -> LoopMonitor:
+        """Get the event loop monitor. Raises ServiceNotInitializedError if not initialized."""
+        if self._loop_monitor is None:
+            raise ServiceNotInitializedError(
+                "Loop monitor has not been initialized yet"
+            )
+        return self._loop_monitor
+
+    @loop_monitor.setter
+    def loop_monitor(self, value: LoopMonitor) -> None:
+        """Set the event loop monitor."""
+        if self._loop_monitor is not None:
+            raise RuntimeError("Loop monitor has already been initialized")
+        self._loop_monitor = value
+
+    @property
+    def telegram_accounts(self) -> TelegramAccounts:
+        """Get the Telegram accounts. Raises ServiceNotInitializedError if not initialized."""
+        if self._telegram_accounts is None:
+            raise ServiceNotInitializedError(
+                "Telegram accounts have not been initialized yet"
+            )
+        return self._telegram_accounts
+
+    @telegram_accounts.setter
+    def telegram_accounts(self, value: TelegramAccounts) -> None:
+        """Set the Telegram accounts."""
+        if self._telegram_accounts is not None:
+            raise RuntimeError("Telegram accounts have already been initialized")
+        self._telegram_accounts = value
+
+    @property
+    def delivery_link(self) -> DeliveryLink:
+        """Get the link to the delivery process. Raises ServiceNotInitializedError if not initialized."""
+        if self._delivery_link is None:
+            raise ServiceNotInitializedError(
+                "Delivery link has not been initialized yet"
+            )
+        return self._delivery_link
+
+    @delivery_link.setter
+    def delivery_link(self, value: DeliveryLink) -> None:
+        """Set the link to the delivery process."""
+        if self._delivery_link is not None:
+            raise RuntimeError("Delivery link has already been initialized")
+        self._delivery_link = value
+
+    @property
+    def delivery_server(self) -> DeliveryServer:
+        """Get the delivery server. Raises ServiceNotInitializedError if not initialized."""
+        if self._delivery_server is None:
+            raise ServiceNotInitializedError(
+                "Delivery server has not been initialized yet"
+            )
+        return self._delivery_server
+
+    @delivery_server.setter
+    def delivery_server(self, value: DeliveryServer) -> None:
+        """Set the delivery server."""
+        if self._delivery_server is not None:
+            raise RuntimeError("Delivery server has already been initialized")
+        self._delivery_server = value
+
 
 # Global registry instance - access services via this
 services = ServiceRegistry()
@@ -0,0 +1,60 @@
+"""Startup timing, so restart-to-first-forward time can be tracked per phase."""
+
+import logging
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+
+from src.shared.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Records how long each startup phase takes and when milestones are reached."""
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.milestones: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a startup phase. Phases may overlap when run concurrently."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            self.phases[name] = duration
+            metrics.startup_phases.labels(name).set(duration)
+            logger.info(f"Startup phase '{name}' took {duration * 1000:.0f}ms")
+
+    async def track[T](self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await something as a named startup phase."""
+        with self.phase(name):
+            return await awaitable
+
+    def mark(self, name: str) -> None:
+        """Record a milestone (time since process start). Only the first call counts."""
+        if name in self.milestones:
+            return
+        elapsed = time.perf_counter() - self.started_at
+        self.milestones[name] = elapsed
+        metrics.startup_phases.labels(name).set(elapsed)
+        logger.info(f"Startup milestone '{name}' reached after {elapsed:.2f}s")
+
+    def report(self) -> list[str]:
+        """Human-readable lines for every phase and milestone."""
+        lines = [
+            f"{name}: {duration * 1000:.0f}ms" for name, duration in self.phases.items()
+        ]
+        lines.extend(
+            f"{name}: {elapsed:.2f}s desde o início"
+            for name, elapsed in self.milestones.items()
+        )
+        return lines
+
+
+# Global startup timer - created when the application starts importing
+startup_timer = StartupTimer()